@@ -0,0 +1,121 @@
+"""
+Analysis Context Module
+Per-email text and derived forms shared by every medical analyzer
+"""
+
+import re
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class AnalysisContext:
+    """
+    Text of one email plus everything derived from it, computed once
+
+    Built once per email and passed to EnhancedMedicalAnalyzer,
+    MedicalPriorityClassifier and GmailToMedicalTransformer. It holds the
+    full text and lazily computes and memoizes:
+
+    - lowercase forms (of the full text or any section an analyzer looks at)
+    - regex searches, keyed by pattern, flags and text
+    - analyzer results (e.g. the enhanced medical analysis), so a second
+      analyzer asking for the same analysis reuses the first result
+    """
+
+    def __init__(self, text: str):
+        """
+        Initialize analysis context
+
+        Args:
+            text: Full text of the email (subject, body and attachment text)
+        """
+        self.text = text or ''
+        self._lowercase = {}
+        self._searches = {}
+        self._results = {}
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'AnalysisContext':
+        """
+        Build a context from a professional email record
+
+        Args:
+            record: Professional email record
+
+        Returns:
+            AnalysisContext: Context over subject, body and attachment text
+        """
+        text_parts = []
+
+        try:
+            content_analysis = record.get('content_analysis', {})
+            subject_info = content_analysis.get('subject_information', {})
+            if subject_info.get('subject_line'):
+                text_parts.append(subject_info['subject_line'])
+
+            body_content = content_analysis.get('body_content', {})
+            if body_content.get('plain_text_content'):
+                text_parts.append(body_content['plain_text_content'])
+
+            extracted_text = record.get('extracted_text_data', {})
+            if extracted_text.get('email_body'):
+                text_parts.append(extracted_text['email_body'])
+
+            for att in extracted_text.get('attachments') or []:
+                if att.get('text'):
+                    text_parts.append(att['text'])
+
+        except Exception as e:
+            logger.warning(f"Error collecting text for analysis context: {str(e)}")
+
+        return cls(' '.join(filter(None, text_parts)))
+
+    @property
+    def lower(self) -> str:
+        """Lowercase form of the full text"""
+        return self.lowercase(self.text)
+
+    def lowercase(self, text: str) -> str:
+        """
+        Lowercase form of a text, computed once per distinct text
+
+        Args:
+            text: Full text or a section of it
+
+        Returns:
+            str: text.lower()
+        """
+        lowered = self._lowercase.get(text)
+        if lowered is None:
+            lowered = text.lower()
+            self._lowercase[text] = lowered
+        return lowered
+
+    def search(self, pattern: str, text: Optional[str] = None, flags: int = re.IGNORECASE):
+        """
+        Memoized re.search
+
+        Args:
+            pattern: Regex pattern
+            text: Text to search (defaults to the full text)
+            flags: re flags
+
+        Returns:
+            re.Match or None
+        """
+        text = self.text if text is None else text
+        key = (pattern, flags, text)
+
+        if key not in self._searches:
+            self._searches[key] = re.search(pattern, text, flags)
+
+        return self._searches[key]
+
+    def get_result(self, name: str) -> Optional[Any]:
+        """Get an analyzer result stored earlier for this email"""
+        return self._results.get(name)
+
+    def set_result(self, name: str, result: Any):
+        """Store an analyzer result for reuse by later analyzers"""
+        self._results[name] = result
@@ -0,0 +1,230 @@
+"""
+Attachment Blob Store Module
+Content-addressed storage of attachment bytes with per-email hardlinks
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class AttachmentBlobStore:
+    """
+    Stores each distinct attachment once, keyed by its SHA-256
+
+    Per-email paths under Archivos/ and Imagenes/ remain, but they are
+    hardlinks to the shared blob (or plain copies where the filesystem
+    cannot link). A SQLite index keeps one reference per linked path and a
+    refcount per blob, so a blob is deleted when its last reference is released.
+    """
+
+    def __init__(self, base_path: str, blob_path: Optional[str] = None):
+        """
+        Initialize blob store
+
+        Args:
+            base_path: Base path for the ia folder
+            blob_path: Blob directory (defaults to <base_path>/Blobs)
+        """
+        self.base_path = base_path
+        self.blob_path = blob_path or os.path.join(base_path, "Blobs")
+        os.makedirs(self.blob_path, exist_ok=True)
+
+        self.db_path = os.path.join(self.blob_path, "blob_index.db")
+        self.lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self):
+        """Create the blob and reference tables"""
+        with self.lock:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS blobs (
+                    blob_hash TEXT PRIMARY KEY,
+                    size_bytes INTEGER,
+                    refcount INTEGER,
+                    created_at TEXT
+                )
+            ''')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS blob_refs (
+                    file_path TEXT PRIMARY KEY,
+                    blob_hash TEXT,
+                    linked INTEGER,
+                    created_at TEXT
+                )
+            ''')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS idx_refs_blob ON blob_refs(blob_hash)')
+            self._connection.commit()
+
+    def get_blob_path(self, blob_hash: str) -> str:
+        """Get the on-disk path of a blob (fanned out by hash prefix)"""
+        return os.path.join(self.blob_path, blob_hash[:2], blob_hash)
+
+    def store(self, document, dest_path: str) -> Dict[str, Any]:
+        """
+        Store an attachment and materialize it at dest_path
+
+        Args:
+            document: AttachmentDocument with the attachment bytes
+            dest_path: Per-email path the attachment should appear at
+
+        Returns:
+            Dict: blob_hash, new_blob (first copy of these bytes) and
+                  linked (False when a copy had to be made)
+        """
+        blob_hash = document.sha256
+        blob_file = self.get_blob_path(blob_hash)
+        abs_path = os.path.abspath(dest_path)
+        now = datetime.now().isoformat()
+
+        with self.lock:
+            row = self._connection.execute(
+                'SELECT blob_hash, linked FROM blob_refs WHERE file_path = ?', (abs_path,)
+            ).fetchone()
+
+            if row and row[0] == blob_hash and os.path.exists(abs_path):
+                # Same bytes already stored at this path: nothing to add
+                return {'blob_hash': blob_hash, 'new_blob': False, 'linked': bool(row[1])}
+
+            if row and row[0] != blob_hash:
+                # The path is re-pointed at other bytes: drop its old reference first
+                self._release_unlocked(abs_path, row[0])
+                row = None
+
+            new_blob = not os.path.exists(blob_file)
+            if new_blob:
+                os.makedirs(os.path.dirname(blob_file), exist_ok=True)
+                tmp_file = f"{blob_file}.tmp{threading.get_ident()}"
+                with open(tmp_file, 'wb') as f:
+                    f.write(document.data)
+                os.replace(tmp_file, blob_file)
+
+            linked = self._materialize(blob_file, abs_path)
+
+            if row is None:
+                self._connection.execute(
+                    '''INSERT INTO blobs VALUES (?, ?, 1, ?)
+                       ON CONFLICT(blob_hash) DO UPDATE SET refcount = refcount + 1''',
+                    (blob_hash, document.size, now)
+                )
+            self._connection.execute(
+                'INSERT OR REPLACE INTO blob_refs VALUES (?, ?, ?, ?)',
+                (abs_path, blob_hash, int(linked), now)
+            )
+            self._connection.commit()
+
+        if not new_blob:
+            logger.debug(f"Reused stored blob {blob_hash[:12]} for {os.path.basename(dest_path)}")
+
+        return {'blob_hash': blob_hash, 'new_blob': new_blob, 'linked': linked}
+
+    @staticmethod
+    def _materialize(blob_file: str, dest_path: str) -> bool:
+        """
+        Hardlink a blob at dest_path, replacing any file already there
+
+        Returns:
+            bool: False when a private copy had to be made instead of a link
+        """
+        try:
+            os.link(blob_file, dest_path)
+            return True
+        except FileExistsError:
+            # A stale file occupies the path: link beside it and swap it in
+            tmp_path = f"{dest_path}.tmp{threading.get_ident()}"
+            try:
+                os.link(blob_file, tmp_path)
+                os.replace(tmp_path, dest_path)
+                return True
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except OSError:
+            pass
+
+        # Cross-device or no hardlink support: fall back to a private copy.
+        # The copy is a new file, so incremental backups pick it up; linked
+        # paths are left alone because touching them would touch the shared inode.
+        shutil.copyfile(blob_file, dest_path)
+        return False
+
+    def release(self, file_path: str) -> bool:
+        """
+        Drop the reference held by a per-email path and remove that path
+
+        The blob itself is deleted once no path references it.
+
+        Args:
+            file_path: Path previously passed to store()
+
+        Returns:
+            bool: True if a reference was released
+        """
+        abs_path = os.path.abspath(file_path)
+
+        try:
+            with self.lock:
+                row = self._connection.execute(
+                    'SELECT blob_hash FROM blob_refs WHERE file_path = ?', (abs_path,)
+                ).fetchone()
+                if not row:
+                    return False
+
+                self._release_unlocked(abs_path, row[0])
+                self._connection.commit()
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error releasing blob reference {file_path}: {str(e)}")
+            return False
+
+    def _release_unlocked(self, abs_path: str, blob_hash: str):
+        """Drop one reference of a blob and remove its path (caller holds the lock and commits)"""
+        self._connection.execute('DELETE FROM blob_refs WHERE file_path = ?', (abs_path,))
+        self._connection.execute(
+            'UPDATE blobs SET refcount = refcount - 1 WHERE blob_hash = ?', (blob_hash,)
+        )
+        refcount = self._connection.execute(
+            'SELECT refcount FROM blobs WHERE blob_hash = ?', (blob_hash,)
+        ).fetchone()
+
+        if os.path.exists(abs_path):
+            os.remove(abs_path)
+
+        if refcount is None or refcount[0] <= 0:
+            self._connection.execute('DELETE FROM blobs WHERE blob_hash = ?', (blob_hash,))
+            blob_file = self.get_blob_path(blob_hash)
+            if os.path.exists(blob_file):
+                os.remove(blob_file)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get blob store statistics"""
+        with self.lock:
+            blob_count, stored_bytes, reference_count, logical_bytes = self._connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(refcount), 0), '
+                'COALESCE(SUM(size_bytes * refcount), 0) FROM blobs'
+            ).fetchone()
+
+        return {
+            'blob_count': blob_count,
+            'reference_count': reference_count,
+            'stored_bytes': stored_bytes,
+            'logical_bytes': logical_bytes,
+            'saved_bytes': logical_bytes - stored_bytes
+        }
+
+    def close(self):
+        """Close the index database"""
+        if self._connection:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
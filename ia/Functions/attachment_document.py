@@ -0,0 +1,129 @@
+"""
+Attachment Document Module
+In-memory view of an attachment shared by every analysis step
+"""
+
+import io
+import os
+import hashlib
+import logging
+from typing import Optional, Any
+
+logger = logging.getLogger(__name__)
+
+class AttachmentDocument:
+    """
+    Decoded attachment bytes plus lazily parsed representations
+
+    Hashing, signature checks, encryption checks, metadata extraction and
+    text extraction all read from the same object, so the payload is
+    decoded once and each format parser (PDF, image, DOCX) runs at most once.
+    """
+
+    def __init__(self, data: bytes, filename: str, content_type: str = '', file_path: Optional[str] = None):
+        """
+        Initialize attachment document
+
+        Args:
+            data: Decoded attachment bytes
+            filename: File name (its extension selects the parsers)
+            content_type: MIME content type
+            file_path: Where the bytes were saved, if anywhere
+        """
+        self.data = data or b''
+        self.filename = filename
+        self.content_type = content_type
+        self.file_path = file_path
+        self.extension = os.path.splitext(filename.lower())[1]
+        self.size = len(self.data)
+        self.md5 = hashlib.md5(self.data).hexdigest()
+        self.text = None
+        self.pdf_stats = None
+
+        self._sha256 = None
+        self._parsed = {}
+
+    @classmethod
+    def from_file(cls, file_path: str, content_type: str = '') -> 'AttachmentDocument':
+        """
+        Load a document from disk (one read)
+
+        Args:
+            file_path: Path to attachment file
+            content_type: MIME content type
+
+        Returns:
+            AttachmentDocument: Document over the file contents
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+
+        return cls(data, os.path.basename(file_path), content_type, file_path=file_path)
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 of the bytes, the content address used for storage and caching"""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    @property
+    def header(self) -> bytes:
+        """Leading bytes used for file signature detection"""
+        return self.data[:16]
+
+    def stream(self) -> io.BytesIO:
+        """Get a fresh file-like object over the bytes"""
+        return io.BytesIO(self.data)
+
+    def _parse(self, kind: str, parser) -> Optional[Any]:
+        """Run a parser once and cache its result (None when unavailable or failing)"""
+        if kind not in self._parsed:
+            try:
+                self._parsed[kind] = parser()
+            except ImportError:
+                self._parsed[kind] = None
+            except Exception as e:
+                logger.warning(f"Error parsing {self.filename} as {kind}: {str(e)}")
+                self._parsed[kind] = None
+
+        return self._parsed[kind]
+
+    @property
+    def pdf_reader(self):
+        """PyPDF2 reader over the bytes, or None"""
+        def parse():
+            import PyPDF2
+            return PyPDF2.PdfReader(self.stream())
+
+        return self._parse('pdf', parse)
+
+    @property
+    def image(self):
+        """PIL image over the bytes, or None"""
+        def parse():
+            from PIL import Image
+            return Image.open(self.stream())
+
+        return self._parse('image', parse)
+
+    @property
+    def docx_document(self):
+        """python-docx document over the bytes, or None"""
+        def parse():
+            import docx
+            return docx.Document(self.stream())
+
+        return self._parse('docx', parse)
+
+    def release(self):
+        """Drop the bytes and parsed objects once every consumer is done"""
+        image = self._parsed.get('image')
+        if image is not None:
+            try:
+                image.close()
+            except Exception:
+                pass
+
+        self._parsed = {}
+        self.data = b''
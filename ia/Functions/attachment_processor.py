@@ -13,6 +13,9 @@ import logging
 import hashlib
 import shutil
 import datetime
+import zipfile
+
+from attachment_document import AttachmentDocument
 
 logger = logging.getLogger(__name__)
 
@@ -21,14 +24,17 @@ class AttachmentProcessor:
     Processes and organizes email attachments
     """
     
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, blob_store=None):
         """
         Initialize attachment processor
         
         Args:
             base_path: Base path for the ia folder
+            blob_store: Optional AttachmentBlobStore; identical attachments are
+                        then stored once and hardlinked into each email folder
         """
         self.base_path = base_path
+        self.blob_store = blob_store
         self.archivos_path = os.path.join(base_path, "Archivos")
         self.imagenes_path = os.path.join(base_path, "Imagenes")
         
@@ -145,17 +151,62 @@ class AttachmentProcessor:
         
         email_folder = os.path.join(base_folder, unique_id)
         os.makedirs(email_folder, exist_ok=True)
-        
+
         return email_folder
-    
-    def save_attachment(self, part: Message, unique_id: str, attachment_index: int) -> Dict[str, Any]:
+
+    def clear_email_attachments(self, unique_id: str) -> int:
+        """
+        Remove attachments saved for an email by an earlier, unfinished attempt
+
+        Blob references held by the files are released so a retry neither
+        leaves name_1.pdf style duplicates behind nor inflates refcounts.
+
+        Args:
+            unique_id: Unique email identifier
+
+        Returns:
+            int: Number of files removed
+        """
+        removed = 0
+
+        for base_folder in (self.archivos_path, self.imagenes_path):
+            email_folder = os.path.join(base_folder, unique_id)
+            if not os.path.isdir(email_folder):
+                continue
+
+            try:
+                for entry in os.scandir(email_folder):
+                    if not entry.is_file():
+                        continue
+                    if self.blob_store is None or not self.blob_store.release(entry.path):
+                        if os.path.exists(entry.path):
+                            os.remove(entry.path)
+                    removed += 1
+
+                shutil.rmtree(email_folder, ignore_errors=True)
+
+            except Exception as e:
+                logger.error(f"Error clearing attachments of {unique_id}: {str(e)}")
+
+        if removed:
+            logger.info(f"Cleared {removed} attachments left by an earlier attempt of {unique_id}")
+
+        return removed
+
+    def save_attachment(self, part: Message, unique_id: str, attachment_index: int, text_extractor=None) -> Dict[str, Any]:
         """
         Save individual attachment
         
+        The payload is decoded once into an AttachmentDocument that feeds the
+        hash, security analysis, metadata and (optionally) text extraction.
+        
         Args:
             part: Email part containing attachment
             unique_id: Unique email identifier
             attachment_index: Index of attachment in email
+            text_extractor: Optional TextExtractor; when given, the text is
+                            extracted from the same parsed document and stored
+                            under 'extracted_text'
             
         Returns:
             Dict: Attachment information
@@ -191,24 +242,30 @@ class AttachmentProcessor:
             # Full file path
             file_path = os.path.join(email_folder, final_filename)
             
-            # Get attachment data
-            attachment_data = part.get_payload(decode=True)
+            # Get attachment data (hashed once on load)
+            document = AttachmentDocument(
+                part.get_payload(decode=True), final_filename, content_type, file_path=file_path
+            )
             
-            # Save file
-            with open(file_path, 'wb') as f:
-                f.write(attachment_data)
+            # Save file (through the content-addressed store when enabled)
+            blob_info = None
+            if self.blob_store is not None:
+                blob_info = self.blob_store.store(document, file_path)
+            else:
+                with open(file_path, 'wb') as f:
+                    f.write(document.data)
             
-            # Calculate file hash for integrity
-            file_hash = hashlib.md5(attachment_data).hexdigest()
+            # File hash for integrity
+            file_hash = document.md5
             
             # Get file size
-            file_size = len(attachment_data)
+            file_size = document.size
             
             # Perform security analysis
-            security_analysis = self.analyze_attachment_security(file_path, content_type)
+            security_analysis = self.analyze_attachment_security(file_path, content_type, document=document)
 
             # Extract file metadata
-            file_metadata = self.extract_attachment_metadata(file_path)
+            file_metadata = self.extract_attachment_metadata(file_path, document=document)
 
             attachment_info = {
                 'original_filename': filename,
@@ -227,6 +284,19 @@ class AttachmentProcessor:
                 'processing_timestamp': datetime.datetime.now().isoformat()
             }
             
+            if blob_info is not None:
+                attachment_info['blob_hash'] = blob_info['blob_hash']
+                attachment_info['deduplicated'] = not blob_info['new_blob']
+            
+            if text_extractor is not None:
+                attachment_info['extracted_text'] = text_extractor.extract_from_document(document)
+                if document.pdf_stats is not None:
+                    attachment_info['text_extraction'] = {
+                        key: value for key, value in document.pdf_stats.items() if key != 'text'
+                    }
+            
+            document.release()
+            
             logger.info(f"Saved attachment: {final_filename} ({self.format_file_size(file_size)})")
             return attachment_info
             
@@ -271,13 +341,15 @@ class AttachmentProcessor:
         
         return f"{size:.1f} {size_names[i]}"
     
-    def process_email_attachments(self, email_message: Message, unique_id: str) -> List[Dict[str, Any]]:
+    def process_email_attachments(self, email_message: Message, unique_id: str, text_extractor=None) -> List[Dict[str, Any]]:
         """
         Process all attachments in an email
         
         Args:
             email_message: Email message object
             unique_id: Unique email identifier
+            text_extractor: Optional TextExtractor to extract attachment text
+                            in the same pass (see save_attachment)
             
         Returns:
             List[Dict]: List of attachment information
@@ -296,13 +368,13 @@ class AttachmentProcessor:
             
             # Check if it's an attachment
             if part.get_content_disposition() == 'attachment':
-                attachment_info = self.save_attachment(part, unique_id, attachment_index)
+                attachment_info = self.save_attachment(part, unique_id, attachment_index, text_extractor)
                 attachments.append(attachment_info)
                 attachment_index += 1
             
             # Also check for inline attachments (like embedded images)
             elif part.get_content_disposition() == 'inline' and part.get_filename():
-                attachment_info = self.save_attachment(part, unique_id, attachment_index)
+                attachment_info = self.save_attachment(part, unique_id, attachment_index, text_extractor)
                 attachment_info['disposition'] = 'inline'
                 attachments.append(attachment_info)
                 attachment_index += 1
@@ -310,13 +382,19 @@ class AttachmentProcessor:
         logger.info(f"Processed {len(attachments)} attachments for email {unique_id}")
         return attachments
 
-    def analyze_attachment_security(self, file_path: str, content_type: str) -> Dict[str, Any]:
+    def analyze_attachment_security(
+        self,
+        file_path: str,
+        content_type: str,
+        document: Optional[AttachmentDocument] = None
+    ) -> Dict[str, Any]:
         """
         Analyze attachment for potential security risks
 
         Args:
             file_path: Path to attachment file
             content_type: MIME content type
+            document: Already loaded document (the file is read when omitted)
 
         Returns:
             Dict: Security analysis results
@@ -330,8 +408,10 @@ class AttachmentProcessor:
             'macro_enabled': False
         }
 
-        if not os.path.exists(file_path):
-            return security_analysis
+        if document is None:
+            if not os.path.exists(file_path):
+                return security_analysis
+            document = AttachmentDocument.from_file(file_path, content_type)
 
         filename = os.path.basename(file_path)
         ext = os.path.splitext(filename.lower())[1]
@@ -357,8 +437,7 @@ class AttachmentProcessor:
 
         # Check file signature (magic bytes)
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(16)
+            header = document.header
 
             # Common file signatures
             signatures = {
@@ -395,18 +474,18 @@ class AttachmentProcessor:
 
         # Check for password-protected/encrypted files
         if ext in ['.zip', '.rar', '.7z']:
-            security_analysis['encrypted'] = self._check_archive_encryption(file_path)
+            security_analysis['encrypted'] = self._check_archive_encryption(file_path, document)
         elif ext in ['.pdf']:
-            security_analysis['encrypted'] = self._check_pdf_encryption(file_path)
+            security_analysis['encrypted'] = self._check_pdf_encryption(file_path, document)
 
         return security_analysis
 
-    def _check_archive_encryption(self, file_path: str) -> bool:
+    def _check_archive_encryption(self, file_path: str, document: Optional[AttachmentDocument] = None) -> bool:
         """Check if archive is password protected"""
         try:
-            import zipfile
             if file_path.endswith('.zip'):
-                with zipfile.ZipFile(file_path, 'r') as zip_file:
+                source = document.stream() if document is not None else file_path
+                with zipfile.ZipFile(source, 'r') as zip_file:
                     for info in zip_file.infolist():
                         if info.flag_bits & 0x1:  # Encrypted flag
                             return True
@@ -414,22 +493,26 @@ class AttachmentProcessor:
         except:
             return False
 
-    def _check_pdf_encryption(self, file_path: str) -> bool:
+    def _check_pdf_encryption(self, file_path: str, document: Optional[AttachmentDocument] = None) -> bool:
         """Check if PDF is encrypted"""
         try:
-            import PyPDF2
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                return pdf_reader.is_encrypted
+            document = document or AttachmentDocument.from_file(file_path)
+            pdf_reader = document.pdf_reader
+            return bool(pdf_reader and pdf_reader.is_encrypted)
         except:
             return False
 
-    def extract_attachment_metadata(self, file_path: str) -> Dict[str, Any]:
+    def extract_attachment_metadata(
+        self,
+        file_path: str,
+        document: Optional[AttachmentDocument] = None
+    ) -> Dict[str, Any]:
         """
         Extract detailed metadata from attachment file
 
         Args:
             file_path: Path to attachment file
+            document: Already loaded document (the file is read when omitted)
 
         Returns:
             Dict: File metadata
@@ -463,70 +546,77 @@ class AttachmentProcessor:
             # Extract embedded metadata based on file type
             ext = os.path.splitext(file_path.lower())[1]
 
+            if ext in ['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.docx'] and document is None:
+                document = AttachmentDocument.from_file(file_path)
+
             if ext == '.pdf':
-                metadata['embedded_metadata'] = self._extract_pdf_metadata(file_path)
+                metadata['embedded_metadata'] = self._extract_pdf_metadata(file_path, document)
             elif ext in ['.jpg', '.jpeg', '.png', '.tiff']:
-                metadata['embedded_metadata'] = self._extract_image_metadata(file_path)
+                metadata['embedded_metadata'] = self._extract_image_metadata(file_path, document)
             elif ext in ['.docx', '.xlsx', '.pptx']:
-                metadata['embedded_metadata'] = self._extract_office_metadata(file_path)
+                metadata['embedded_metadata'] = self._extract_office_metadata(file_path, document)
 
         except Exception as e:
             logger.warning(f"Error extracting file metadata: {str(e)}")
 
         return metadata
 
-    def _extract_pdf_metadata(self, file_path: str) -> Dict[str, Any]:
+    def _extract_pdf_metadata(self, file_path: str, document: Optional[AttachmentDocument] = None) -> Dict[str, Any]:
         """Extract PDF metadata"""
         try:
-            import PyPDF2
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                if pdf_reader.metadata:
-                    return {
-                        'title': pdf_reader.metadata.get('/Title', ''),
-                        'author': pdf_reader.metadata.get('/Author', ''),
-                        'subject': pdf_reader.metadata.get('/Subject', ''),
-                        'creator': pdf_reader.metadata.get('/Creator', ''),
-                        'producer': pdf_reader.metadata.get('/Producer', ''),
-                        'creation_date': pdf_reader.metadata.get('/CreationDate', ''),
-                        'modification_date': pdf_reader.metadata.get('/ModDate', ''),
-                        'pages': len(pdf_reader.pages)
-                    }
+            document = document or AttachmentDocument.from_file(file_path)
+            pdf_reader = document.pdf_reader
+            if pdf_reader is not None and pdf_reader.metadata:
+                return {
+                    'title': pdf_reader.metadata.get('/Title', ''),
+                    'author': pdf_reader.metadata.get('/Author', ''),
+                    'subject': pdf_reader.metadata.get('/Subject', ''),
+                    'creator': pdf_reader.metadata.get('/Creator', ''),
+                    'producer': pdf_reader.metadata.get('/Producer', ''),
+                    'creation_date': pdf_reader.metadata.get('/CreationDate', ''),
+                    'modification_date': pdf_reader.metadata.get('/ModDate', ''),
+                    'pages': len(pdf_reader.pages)
+                }
         except:
             pass
         return {}
 
-    def _extract_image_metadata(self, file_path: str) -> Dict[str, Any]:
+    def _extract_image_metadata(self, file_path: str, document: Optional[AttachmentDocument] = None) -> Dict[str, Any]:
         """Extract image EXIF metadata"""
         try:
-            from PIL import Image
             from PIL.ExifTags import TAGS
 
-            with Image.open(file_path) as img:
-                metadata = {
-                    'format': img.format,
-                    'mode': img.mode,
-                    'size': img.size,
-                    'exif': {}
-                }
+            document = document or AttachmentDocument.from_file(file_path)
+            img = document.image
+            if img is None:
+                return {}
+
+            metadata = {
+                'format': img.format,
+                'mode': img.mode,
+                'size': img.size,
+                'exif': {}
+            }
 
-                exif_data = img._getexif()
-                if exif_data:
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        metadata['exif'][tag] = str(value)
+            exif_data = img._getexif() if hasattr(img, '_getexif') else None
+            if exif_data:
+                for tag_id, value in exif_data.items():
+                    tag = TAGS.get(tag_id, tag_id)
+                    metadata['exif'][tag] = str(value)
 
-                return metadata
+            return metadata
         except:
             pass
         return {}
 
-    def _extract_office_metadata(self, file_path: str) -> Dict[str, Any]:
+    def _extract_office_metadata(self, file_path: str, document: Optional[AttachmentDocument] = None) -> Dict[str, Any]:
         """Extract Office document metadata"""
         try:
             if file_path.endswith('.docx'):
-                import docx
-                doc = docx.Document(file_path)
+                document = document or AttachmentDocument.from_file(file_path)
+                doc = document.docx_document
+                if doc is None:
+                    return {}
                 props = doc.core_properties
                 return {
                     'title': props.title or '',
@@ -20,6 +20,9 @@ class BackupManager:
     Manages backup operations for processed email data
     """
     
+    # Archive member mapping deduplicated attachment paths to the stored copy
+    LINK_MANIFEST = "attachment_links.json"
+    
     def __init__(self, base_path: str, backup_path: str = None):
         """
         Initialize backup manager
@@ -107,11 +110,15 @@ class BackupManager:
             'email_count': 0,
             'total_size_bytes': 0,
             'files_backed_up': 0,
+            'files_deduplicated': 0,
             'error': None
         }
         
         try:
             with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                seen_files = {}
+                links = {}
+                
                 # Backup JSON files
                 json_path = os.path.join(self.base_path, "Json")
                 if os.path.exists(json_path):
@@ -142,8 +149,11 @@ class BackupManager:
                                 for file in files:
                                     file_path = os.path.join(root, file)
                                     arcname = os.path.relpath(file_path, self.base_path)
-                                    zipf.write(file_path, arcname)
+                                    self._write_attachment(zipf, file_path, arcname, seen_files, links)
                                     result['files_backed_up'] += 1
+                
+                self._write_link_manifest(zipf, links)
+                result['files_deduplicated'] = len(links)
             
             # Calculate backup statistics
             result['total_size_bytes'] = os.path.getsize(backup_file)
@@ -192,6 +202,7 @@ class BackupManager:
             'email_count': 0,
             'total_size_bytes': 0,
             'files_backed_up': 0,
+            'files_deduplicated': 0,
             'since_date': since_date.isoformat(),
             'error': None
         }
@@ -200,6 +211,9 @@ class BackupManager:
             since_timestamp = since_date.timestamp()
             
             with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                seen_files = {}
+                links = {}
+                
                 # Check all directories for modified files
                 for folder in ["Json", "Text", "Archivos", "Imagenes"]:
                     folder_path = os.path.join(self.base_path, folder)
@@ -211,8 +225,14 @@ class BackupManager:
                                 
                                 if file_mtime > since_timestamp:
                                     arcname = os.path.relpath(file_path, self.base_path)
-                                    zipf.write(file_path, arcname)
+                                    if folder in ("Archivos", "Imagenes"):
+                                        self._write_attachment(zipf, file_path, arcname, seen_files, links)
+                                    else:
+                                        zipf.write(file_path, arcname)
                                     result['files_backed_up'] += 1
+                
+                self._write_link_manifest(zipf, links)
+                result['files_deduplicated'] = len(links)
             
             if result['files_backed_up'] > 0:
                 result['total_size_bytes'] = os.path.getsize(backup_file)
@@ -282,8 +302,13 @@ class BackupManager:
             restore_base = restore_path or self.base_path
             
             with zipfile.ZipFile(backup_file, 'r') as zipf:
-                zipf.extractall(restore_base)
-                result['files_restored'] = len(zipf.namelist())
+                members = [name for name in zipf.namelist() if name != self.LINK_MANIFEST]
+                zipf.extractall(restore_base, members)
+                result['files_restored'] = len(members)
+                
+                if self.LINK_MANIFEST in zipf.namelist():
+                    links = json.loads(zipf.read(self.LINK_MANIFEST).decode('utf-8'))
+                    result['files_restored'] += self._restore_links(restore_base, links)
             
             result['success'] = True
             logger.info(f"Backup {backup_id} restored to {restore_base}")
@@ -294,6 +319,51 @@ class BackupManager:
         
         return result
     
+    def _write_attachment(self, zipf: zipfile.ZipFile, file_path: str, arcname: str,
+                          seen_files: Dict[tuple, str], links: Dict[str, str]):
+        """
+        Add an attachment to the archive once per underlying file
+        
+        Attachments hardlinked to the same blob share an inode; only the first
+        path is stored and the others are recorded in the link manifest.
+        """
+        stat_info = os.stat(file_path)
+        file_key = (stat_info.st_dev, stat_info.st_ino)
+        
+        if stat_info.st_nlink > 1 and file_key in seen_files:
+            links[arcname.replace(os.sep, '/')] = seen_files[file_key]
+            return
+        
+        zipf.write(file_path, arcname)
+        seen_files[file_key] = arcname.replace(os.sep, '/')
+    
+    def _write_link_manifest(self, zipf: zipfile.ZipFile, links: Dict[str, str]):
+        """Store the duplicate-path manifest in the archive"""
+        if links:
+            zipf.writestr(self.LINK_MANIFEST, json.dumps(links, indent=2))
+    
+    def _restore_links(self, restore_base: str, links: Dict[str, str]) -> int:
+        """Recreate deduplicated attachment paths from the link manifest"""
+        restored = 0
+        
+        for arcname, source_arcname in links.items():
+            source = os.path.join(restore_base, *source_arcname.split('/'))
+            target = os.path.join(restore_base, *arcname.split('/'))
+            
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if os.path.exists(target):
+                    os.remove(target)
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copyfile(source, target)
+                restored += 1
+            except Exception as e:
+                logger.error(f"Error restoring {arcname}: {str(e)}")
+        
+        return restored
+    
     def list_backups(self) -> List[Dict[str, Any]]:
         """
         List all available backups
@@ -560,6 +630,19 @@ class RecoveryManager:
                             shutil.copyfileobj(source, target)
                         
                         extracted_files.append(extract_path)
+                
+                # Attachments stored once under another email's path
+                if BackupManager.LINK_MANIFEST in zipf.namelist():
+                    links = json.loads(zipf.read(BackupManager.LINK_MANIFEST).decode('utf-8'))
+                    for arcname, source_arcname in links.items():
+                        if unique_id in arcname:
+                            extract_path = os.path.join(self.base_path, arcname)
+                            os.makedirs(os.path.dirname(extract_path), exist_ok=True)
+                            
+                            with zipf.open(source_arcname) as source, open(extract_path, 'wb') as target:
+                                shutil.copyfileobj(source, target)
+                            
+                            extracted_files.append(extract_path)
         
         except Exception as e:
             logger.error(f"Error extracting email from backup: {str(e)}")
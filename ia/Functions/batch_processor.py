@@ -11,8 +11,8 @@ import threading
 import queue
 import gc
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import psutil
 
 logger = logging.getLogger(__name__)
@@ -28,23 +28,49 @@ class BatchProcessor:
         batch_size: int = 50,
         max_workers: int = 4,
         memory_limit_mb: int = 2048,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        fetch_chunk_size: int = 0,
+        queue_size: Optional[int] = None,
+        extraction_processes: int = 0,
+        use_uids: bool = False,
+        journal=None,
+        dedup_index=None
     ):
         """
         Initialize batch processor
         
         Args:
             base_path: Base path for processing
-            batch_size: Number of emails to process in each batch
+            batch_size: Number of completed emails between checkpoints
+                        (memory check, progress callback)
             max_workers: Maximum number of worker threads
             memory_limit_mb: Memory limit in MB
             progress_callback: Optional callback for progress updates
+            fetch_chunk_size: When > 0, fetch emails with multi-message
+                              FETCH commands of this size instead of one per email
+            queue_size: Maximum emails queued or in flight at once
+                        (defaults to twice max_workers)
+            extraction_processes: When > 0, run CPU-bound attachment extraction
+                                  on a process pool of this size; it is handed to
+                                  processing functions as processors['extraction_pool']
+            use_uids: Email ids are UIDs (UID FETCH) rather than sequence numbers
+            journal: Optional ProcessingJournal recording per-email progress;
+                     retried emails keep the unique_id of their first attempt
+            dedup_index: Optional ProcessedEmailIndex; emails whose Message-ID was
+                         already processed are skipped after a header-only fetch,
+                         before the full message is downloaded or parsed
         """
         self.base_path = base_path
         self.batch_size = batch_size
         self.max_workers = max_workers
         self.memory_limit_mb = memory_limit_mb
         self.progress_callback = progress_callback
+        self.fetch_chunk_size = fetch_chunk_size
+        self.queue_size = queue_size or max(1, max_workers * 2)
+        self.extraction_processes = extraction_processes
+        self.use_uids = use_uids
+        self.journal = journal
+        self.dedup_index = dedup_index
         
         # Processing statistics
         self.stats = {
@@ -59,7 +85,10 @@ class BatchProcessor:
             'memory_usage_mb': 0,
             'peak_memory_mb': 0,
             'batches_processed': 0,
-            'current_batch': 0
+            'current_batch': 0,
+            'total_attachments': 0,
+            'total_size_bytes': 0,
+            'duplicates_skipped': 0
         }
         
         # Thread-safe queue for results
@@ -69,79 +98,156 @@ class BatchProcessor:
         # Memory monitoring
         self.memory_monitor = MemoryMonitor(self.memory_limit_mb)
         
+        # Serializes fetches when workers share a single (non thread-safe) IMAP connector
+        self._fetch_lock = threading.Lock()
+        
+        # Emails skipped as duplicates and dedup keys seen during the current run
+        self._skipped_ids = set()
+        self._seen_keys = set()
+        
+        # Error of the failed bulk FETCH chunk, per email id, during the current run
+        self._fetch_errors = {}
+        
     def process_email_batch(
         self,
         email_ids: List[str],
         gmail_connector,
         processors: Dict[str, Any],
-        processing_function: Callable
+        processing_function: Callable,
+        result_callback: Optional[Callable] = None,
+        collect_results: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Process a batch of emails with optimized performance
         
         Args:
             email_ids: List of email IDs to process
-            gmail_connector: Gmail connection object
+            gmail_connector: GmailConnectionPool (one session per worker) or a
+                             single GmailConnector (fetches are serialized)
             processors: Dictionary of processor objects
             processing_function: Function to process individual emails
+            result_callback: Optional callback invoked with each result as it completes
+            collect_results: Keep every result in the returned list; disable for
+                             large backfills and consume results through the callback
             
         Returns:
-            List[Dict]: Processing results
+            List[Dict]: Processing results (empty when collect_results is False)
+        """
+        
+        all_results = []
+        
+        for result in self.iter_email_results(email_ids, gmail_connector, processors, processing_function):
+            if result_callback:
+                try:
+                    result_callback(result)
+                except Exception as e:
+                    logger.error(f"Error in result callback: {str(e)}")
+            
+            if collect_results:
+                all_results.append(result)
+        
+        return all_results
+    
+    def iter_email_results(
+        self,
+        email_ids: List[str],
+        gmail_connector,
+        processors: Dict[str, Any],
+        processing_function: Callable
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process emails and yield each result as soon as it completes
+        
+        A single executor lives for the whole run and is fed through a bounded
+        queue: a new email is submitted whenever one finishes, so a slow email
+        never holds the other workers back. Batches only mark checkpoints
+        (memory check and progress callback every batch_size results).
+        Statistics are kept up to date incrementally.
+        
+        Args:
+            email_ids: List of email IDs to process
+            gmail_connector: GmailConnectionPool or GmailConnector
+            processors: Dictionary of processor objects
+            processing_function: Function to process individual emails
+            
+        Yields:
+            Dict: Per-email processing result
         """
         
         self.stats['total_emails'] = len(email_ids)
         self.stats['start_time'] = time.time()
+        self.stats['batches_processed'] = (len(email_ids) + self.batch_size - 1) // self.batch_size
         
         logger.info(f"Starting batch processing of {len(email_ids)} emails")
-        logger.info(f"Batch size: {self.batch_size}, Workers: {self.max_workers}")
+        logger.info(f"Batch size: {self.batch_size}, Workers: {self.max_workers}, Queue size: {self.queue_size}")
         
-        # Split emails into batches
-        batches = self._create_batches(email_ids)
-        self.stats['batches_processed'] = len(batches)
+        future_to_email = {}
+        submitted_ids = set()
+        self._skipped_ids = set()
+        self._seen_keys = set()
+        self._fetch_errors = {}
+        memory_exhausted = False
+        extraction_pool = None
         
-        all_results = []
+        if self.extraction_processes > 0:
+            extraction_pool = ProcessPoolExecutor(max_workers=self.extraction_processes)
+            processors = {**processors, 'extraction_pool': extraction_pool}
+            logger.info(f"Extraction process pool: {self.extraction_processes} processes")
+        
+        if self.journal is not None:
+            processors = {**processors, 'progress_journal': self.journal}
+        
+        tasks = self._iter_tasks(email_ids, gmail_connector)
         
         try:
-            # Process batches sequentially to manage memory
-            for batch_num, batch in enumerate(batches, 1):
-                self.stats['current_batch'] = batch_num
-                
-                logger.info(f"Processing batch {batch_num}/{len(batches)} ({len(batch)} emails)")
-                
-                # Check memory before processing batch
-                if not self.memory_monitor.check_memory_available():
-                    logger.warning("Memory limit approaching, forcing garbage collection")
-                    gc.collect()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for email_id, task, args in tasks:
+                    # Backpressure: wait for a slot before queueing more work
+                    while len(future_to_email) >= self.queue_size:
+                        for result in self._drain_completed(future_to_email):
+                            yield result
+                            memory_exhausted = self._checkpoint() or memory_exhausted
                     
-                    if not self.memory_monitor.check_memory_available():
+                    if memory_exhausted:
                         logger.error("Insufficient memory to continue processing")
                         break
+                    
+                    submitted_ids.add(str(email_id))
+                    future = executor.submit(task, *args, processors, processing_function)
+                    future_to_email[future] = email_id
                 
-                # Process batch with threading
-                batch_results = self._process_batch_threaded(
-                    batch, gmail_connector, processors, processing_function
-                )
-                
-                all_results.extend(batch_results)
-                
-                # Update statistics
-                self._update_batch_stats(batch_results)
-                
-                # Progress callback
-                if self.progress_callback:
-                    progress = (batch_num / len(batches)) * 100
-                    self.progress_callback(progress, self.stats)
-                
-                # Memory cleanup between batches
-                gc.collect()
+                # Drain whatever is still in flight
+                while future_to_email:
+                    for result in self._drain_completed(future_to_email):
+                        yield result
+                        self._checkpoint()
+            
+            # With bulk fetching, anything the server did not return counts as a fetch failure
+            if not memory_exhausted:
+                for email_id in email_ids:
+                    if str(email_id) not in submitted_ids and str(email_id) not in self._skipped_ids:
+                        result = {
+                            'unique_id': f"fetch_error_{email_id}",
+                            'success': False,
+                            'error': self._fetch_errors.get(str(email_id), 'Failed to fetch email'),
+                            'email_id': email_id
+                        }
+                        self._update_result_stats(result)
+                        yield result
+                        self._checkpoint()
                 
-                # Brief pause to allow system recovery
-                time.sleep(0.1)
+                self._checkpoint(final=True)
         
         except Exception as e:
             logger.error(f"Critical error in batch processing: {str(e)}")
             
         finally:
+            # Stops any bulk fetch still in progress and returns its session to the pool
+            tasks.close()
+            
+            if extraction_pool is not None:
+                extraction_pool.shutdown(wait=True)
+            
             self.stats['end_time'] = time.time()
             self.stats['processing_time'] = self.stats['end_time'] - self.stats['start_time']
             
@@ -151,56 +257,153 @@ class BatchProcessor:
                 )
             
             self._log_final_statistics()
-        
-        return all_results
     
-    def _create_batches(self, email_ids: List[str]) -> List[List[str]]:
-        """Create batches from email IDs"""
-        batches = []
-        for i in range(0, len(email_ids), self.batch_size):
-            batch = email_ids[i:i + self.batch_size]
-            batches.append(batch)
-        return batches
+    def _iter_tasks(self, email_ids: List[str], gmail_connector) -> Iterator[tuple]:
+        """Yield (email_id, worker function, leading args) for every email to submit"""
+        
+        if self.dedup_index is not None and hasattr(gmail_connector, 'fetch_headers_bulk'):
+            chunk_size = self.fetch_chunk_size or self.batch_size
+            for start in range(0, len(email_ids), chunk_size):
+                chunk_ids = self._skip_duplicates(email_ids[start:start + chunk_size], gmail_connector, chunk_size)
+                for item in self._iter_fetch_tasks(chunk_ids, gmail_connector):
+                    yield item
+        else:
+            for item in self._iter_fetch_tasks(email_ids, gmail_connector):
+                yield item
     
-    def _process_batch_threaded(
-        self,
-        batch: List[str],
-        gmail_connector,
-        processors: Dict[str, Any],
-        processing_function: Callable
-    ) -> List[Dict[str, Any]]:
-        """Process a batch using thread pool"""
-        
-        batch_results = []
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all emails in batch
-            future_to_email = {
-                executor.submit(
-                    self._process_single_email_safe,
-                    email_id,
-                    gmail_connector,
-                    processors,
-                    processing_function
-                ): email_id for email_id in batch
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_email):
-                email_id = future_to_email[future]
+    def _iter_fetch_tasks(self, email_ids: List[str], gmail_connector) -> Iterator[tuple]:
+        """Yield fetch-and-process tasks, bulk fetching when configured"""
+        
+        if self.fetch_chunk_size > 0 and hasattr(gmail_connector, 'fetch_emails_bulk'):
+            # Messages arrive one FETCH chunk at a time; only the parsing work is queued
+            for start in range(0, len(email_ids), self.fetch_chunk_size):
+                chunk_ids = email_ids[start:start + self.fetch_chunk_size]
+                fetched = None
+                
                 try:
-                    result = future.result(timeout=300)  # 5 minute timeout per email
-                    batch_results.append(result)
+                    fetched = gmail_connector.fetch_emails_bulk(
+                        chunk_ids, chunk=self.fetch_chunk_size, by_uid=self.use_uids
+                    )
+                    for email_id, email_msg in fetched:
+                        yield email_id, self._process_fetched_email_safe, (email_id, email_msg)
                 except Exception as e:
-                    logger.error(f"Error processing email {email_id}: {str(e)}")
-                    batch_results.append({
-                        'unique_id': f"error_{email_id}",
-                        'success': False,
-                        'error': str(e),
-                        'email_id': email_id
-                    })
-        
-        return batch_results
+                    # Ids of this chunk that were not submitted are reported as fetch failures
+                    logger.error(f"Error bulk fetching chunk of {len(chunk_ids)} emails: {str(e)}")
+                    for email_id in chunk_ids:
+                        self._fetch_errors[str(email_id)] = str(e)
+                finally:
+                    # Releases the pooled session when the run stops early
+                    if fetched is not None:
+                        fetched.close()
+        else:
+            for email_id in email_ids:
+                yield email_id, self._process_single_email_safe, (email_id, gmail_connector)
+    
+    def _skip_duplicates(self, email_ids: List[str], gmail_connector, chunk_size: int) -> List[str]:
+        """
+        Drop emails already in the deduplication index using a header-only fetch
+        
+        Args:
+            email_ids: Email IDs of one chunk
+            gmail_connector: GmailConnectionPool or GmailConnector
+            chunk_size: Maximum number of messages per FETCH command
+            
+        Returns:
+            List[str]: Email IDs that still need processing
+        """
+        if not email_ids:
+            return []
+        
+        try:
+            if hasattr(gmail_connector, 'acquire'):
+                headers = list(gmail_connector.fetch_headers_bulk(email_ids, chunk=chunk_size, by_uid=self.use_uids))
+            else:
+                with self._fetch_lock:
+                    headers = list(gmail_connector.fetch_headers_bulk(email_ids, chunk=chunk_size, by_uid=self.use_uids))
+        except Exception as e:
+            logger.error(f"Error prefetching headers for deduplication: {str(e)}")
+            return list(email_ids)
+        
+        duplicates = set()
+        for email_id, header_msg, _ in headers:
+            dedup_key = self.dedup_index.key_for_message(header_msg)
+            # Also catches the same message listed twice in one run (e.g. under two labels)
+            if self.dedup_index.contains(dedup_key) or dedup_key in self._seen_keys:
+                duplicates.add(str(email_id))
+            self._seen_keys.add(dedup_key)
+        
+        for email_id in duplicates:
+            self._record_duplicate(email_id)
+        
+        return [email_id for email_id in email_ids if str(email_id) not in duplicates]
+    
+    def _record_duplicate(self, email_id: str):
+        """Count an email skipped as already processed"""
+        
+        self._skipped_ids.add(str(email_id))
+        self.stats['duplicates_skipped'] += 1
+        
+        if self.journal is not None:
+            try:
+                self.journal.mark(email_id, self.journal.STATE_SAVED)
+            except Exception as e:
+                logger.error(f"Error updating processing journal: {str(e)}")
+    
+    def _drain_completed(self, future_to_email: Dict[Any, str]) -> Iterator[Dict[str, Any]]:
+        """Wait for at least one future to finish, then pop and yield every finished result"""
+        
+        done, _ = wait(list(future_to_email), return_when=FIRST_COMPLETED)
+        
+        for future in done:
+            email_id = future_to_email.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error processing email {email_id}: {str(e)}")
+                result = {
+                    'unique_id': f"error_{email_id}",
+                    'success': False,
+                    'error': str(e),
+                    'email_id': email_id
+                }
+            
+            self._update_result_stats(result)
+            yield result
+    
+    def _checkpoint(self, final: bool = False) -> bool:
+        """
+        Run batch-boundary bookkeeping every batch_size results
+        
+        Returns:
+            bool: True if memory is exhausted and no more work should be queued
+        """
+        processed = self.stats['processed_emails']
+        at_boundary = processed > 0 and processed % self.batch_size == 0
+        
+        # The final call only covers a trailing partial batch
+        if at_boundary == final or processed == 0:
+            return False
+        
+        self.stats['current_batch'] = (processed + self.batch_size - 1) // self.batch_size
+        
+        self._sample_memory()
+        
+        # Progress callback
+        if self.progress_callback:
+            done = processed + self.stats['duplicates_skipped']
+            progress = (done / max(1, self.stats['total_emails'])) * 100
+            self.progress_callback(progress, self.stats)
+        
+        if final:
+            return False
+        
+        # Check memory at the checkpoint
+        if not self.memory_monitor.check_memory_available():
+            logger.warning("Memory limit approaching, forcing garbage collection")
+            gc.collect()
+            return not self.memory_monitor.check_memory_available()
+        
+        return False
     
     def _process_single_email_safe(
         self,
@@ -213,7 +416,7 @@ class BatchProcessor:
         
         try:
             # Fetch email with timeout
-            email_msg = gmail_connector.fetch_email(email_id)
+            email_msg = self._fetch_email(gmail_connector, email_id)
             if not email_msg:
                 return {
                     'unique_id': f"fetch_error_{email_id}",
@@ -222,13 +425,51 @@ class BatchProcessor:
                     'email_id': email_id
                 }
             
-            # Generate unique ID
-            unique_id = f"email_{email_id}_{int(time.time() * 1000)}"
+            return self._process_fetched_email_safe(
+                email_id, email_msg, processors, processing_function
+            )
+            
+        except Exception as e:
+            logger.error(f"Error in safe email processing for {email_id}: {str(e)}")
+            return {
+                'unique_id': f"process_error_{email_id}",
+                'success': False,
+                'error': str(e),
+                'email_id': email_id
+            }
+    
+    def _process_fetched_email_safe(
+        self,
+        email_id: str,
+        email_msg,
+        processors: Dict[str, Any],
+        processing_function: Callable
+    ) -> Dict[str, Any]:
+        """Safely process an already fetched email"""
+        
+        try:
+            # Generate unique ID (reused from the journal when this email is retried)
+            unique_id = self.journal.get_unique_id(email_id) if self.journal is not None else None
+
+            # A retried email starts from a clean attachment folder
+            if unique_id and processors.get('attachment_processor') is not None:
+                processors['attachment_processor'].clear_email_attachments(unique_id)
+
+            unique_id = unique_id or f"email_{email_id}_{int(time.time() * 1000)}"
+            
+            if self.journal is not None:
+                self.journal.mark(email_id, self.journal.STATE_FETCHED, unique_id=unique_id)
             
             # Process email
             result = processing_function(email_msg, unique_id, processors, logger)
             result['email_id'] = email_id
             
+            if self.dedup_index is not None and result.get('success', False):
+                try:
+                    self.dedup_index.add(email_msg, result.get('unique_id', unique_id), result.get('json_file'))
+                except Exception as e:
+                    logger.error(f"Error updating deduplication index: {str(e)}")
+            
             return result
             
         except Exception as e:
@@ -240,16 +481,37 @@ class BatchProcessor:
                 'email_id': email_id
             }
     
-    def _update_batch_stats(self, batch_results: List[Dict[str, Any]]):
-        """Update processing statistics"""
+    def _fetch_email(self, gmail_connector, email_id: str):
+        """Fetch on a pooled session, or under a lock for a shared connector"""
+        if hasattr(gmail_connector, 'acquire'):
+            return gmail_connector.fetch_email(email_id, by_uid=self.use_uids)
         
-        for result in batch_results:
-            self.stats['processed_emails'] += 1
-            
-            if result.get('success', False):
-                self.stats['successful_emails'] += 1
-            else:
-                self.stats['failed_emails'] += 1
+        with self._fetch_lock:
+            return gmail_connector.fetch_email(email_id, by_uid=self.use_uids)
+    
+    def _update_result_stats(self, result: Dict[str, Any]):
+        """Fold a single result into the running statistics"""
+        
+        self.stats['processed_emails'] += 1
+        
+        if result.get('success', False):
+            self.stats['successful_emails'] += 1
+            self.stats['total_attachments'] += result.get('attachment_count', 0)
+            self.stats['total_size_bytes'] += result.get('total_size_bytes', 0)
+        else:
+            self.stats['failed_emails'] += 1
+        
+        if self.journal is not None and result.get('email_id') is not None:
+            try:
+                if result.get('success', False):
+                    self.journal.mark(result['email_id'], self.journal.STATE_SAVED)
+                else:
+                    self.journal.mark(result['email_id'], self.journal.STATE_FAILED, error=result.get('error'))
+            except Exception as e:
+                logger.error(f"Error updating processing journal: {str(e)}")
+    
+    def _sample_memory(self):
+        """Record current and peak memory usage"""
         
         # Update memory usage
         current_memory = psutil.Process().memory_info().rss / 1024 / 1024
@@ -268,6 +530,7 @@ class BatchProcessor:
         logger.info(f"Processed: {self.stats['processed_emails']}")
         logger.info(f"Successful: {self.stats['successful_emails']}")
         logger.info(f"Failed: {self.stats['failed_emails']}")
+        logger.info(f"Duplicates skipped: {self.stats['duplicates_skipped']}")
         logger.info(f"Success rate: {(self.stats['successful_emails']/max(1,self.stats['processed_emails'])*100):.1f}%")
         logger.info(f"Total time: {self.stats['processing_time']:.2f} seconds")
         logger.info(f"Average time per email: {self.stats['average_time_per_email']:.2f} seconds")
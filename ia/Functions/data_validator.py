@@ -308,9 +308,12 @@ class DataValidator:
             if not file_path or not expected_hash:
                 return False
             
-            # Calculate actual hash
+            # Calculate actual hash, streaming the file
+            md5 = hashlib.md5()
             with open(file_path, 'rb') as f:
-                actual_hash = hashlib.md5(f.read()).hexdigest()
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    md5.update(block)
+            actual_hash = md5.hexdigest()
             
             return actual_hash == expected_hash
             
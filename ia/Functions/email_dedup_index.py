@@ -0,0 +1,156 @@
+"""
+Email Deduplication Index Module
+On-disk index of already processed emails keyed by Message-ID / header hash
+"""
+
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+from email.message import Message
+
+logger = logging.getLogger(__name__)
+
+class ProcessedEmailIndex:
+    """
+    Content-addressed index of processed emails
+
+    The key only depends on headers (Message-ID, or Date/From/Subject when
+    there is none), so it can be computed from a header-only prefetch and
+    duplicates are skipped before the full message is downloaded or parsed.
+    Keys are mirrored in memory for O(1) membership checks.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize deduplication index
+        
+        Args:
+            db_path: Path of the SQLite index file
+        """
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_database()
+        self._keys = self._load_keys()
+    
+    def _init_database(self):
+        """Create the index table"""
+        with self.lock:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS processed_emails (
+                    dedup_key TEXT PRIMARY KEY,
+                    message_id TEXT,
+                    unique_id TEXT,
+                    json_file TEXT,
+                    processed_at TEXT
+                )
+            ''')
+            self._connection.commit()
+    
+    def _load_keys(self) -> set:
+        """Load all known keys into memory"""
+        with self.lock:
+            rows = self._connection.execute('SELECT dedup_key FROM processed_emails').fetchall()
+        return {row[0] for row in rows}
+    
+    @staticmethod
+    def key_for_message(email_message: Message) -> str:
+        """
+        Compute the deduplication key of a message
+        
+        Works on full messages and on header-only prefetches alike.
+        
+        Args:
+            email_message: Email message object
+            
+        Returns:
+            str: SHA-256 hex digest identifying the message
+        """
+        message_id = re.sub(r'\s+', '', str(email_message.get('Message-ID', '') or '')).lower()
+        
+        if message_id:
+            basis = f"mid:{message_id}"
+        else:
+            basis = "hdr:" + "|".join(
+                re.sub(r'\s+', ' ', str(email_message.get(header, '') or '')).strip()
+                for header in ('Date', 'From', 'To', 'Subject')
+            )
+        
+        return hashlib.sha256(basis.encode('utf-8', errors='replace')).hexdigest()
+    
+    def contains(self, dedup_key: str) -> bool:
+        """
+        Check whether a key was already processed
+        
+        Args:
+            dedup_key: Key from key_for_message
+            
+        Returns:
+            bool: True if the email was processed before
+        """
+        return dedup_key in self._keys
+    
+    def is_processed(self, email_message: Message) -> bool:
+        """Check whether a (possibly header-only) message was already processed"""
+        return self.contains(self.key_for_message(email_message))
+    
+    def add(self, email_message: Message, unique_id: str, json_file: Optional[str] = None) -> str:
+        """
+        Record a processed message
+        
+        Args:
+            email_message: Email message object
+            unique_id: unique_id its outputs were written under
+            json_file: Path of its JSON record
+            
+        Returns:
+            str: The deduplication key
+        """
+        dedup_key = self.key_for_message(email_message)
+        
+        with self.lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO processed_emails VALUES (?, ?, ?, ?, ?)',
+                (dedup_key, str(email_message.get('Message-ID', '') or ''), unique_id,
+                 json_file, datetime.now().isoformat())
+            )
+            self._connection.commit()
+            self._keys.add(dedup_key)
+        
+        return dedup_key
+    
+    def get_entry(self, dedup_key: str) -> Optional[Dict[str, Any]]:
+        """Get the stored entry for a key"""
+        with self.lock:
+            row = self._connection.execute(
+                'SELECT dedup_key, message_id, unique_id, json_file, processed_at '
+                'FROM processed_emails WHERE dedup_key = ?',
+                (dedup_key,)
+            ).fetchone()
+        
+        if not row:
+            return None
+        
+        return dict(zip(('dedup_key', 'message_id', 'unique_id', 'json_file', 'processed_at'), row))
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def close(self):
+        """Close the index database"""
+        if self._connection:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
@@ -0,0 +1,154 @@
+"""
+Email Record Index Module
+Compact on-disk index of processed email records and their medical screening result
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class EmailRecordIndex:
+    """
+    Side index of the JSON records in Json/ and Professional_Email_Records/
+
+    One small row per record file: its mtime and size, a few header fields
+    and whether it passed the medical screening (with the key of the keyword
+    set that produced the result). A record whose file and screening key are
+    unchanged never has to be opened again to know it is not medical.
+    Freshness data is mirrored in memory; writes are batched until flush().
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize record index
+
+        Args:
+            db_path: Path of the SQLite index file
+        """
+        self.db_path = db_path
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._pending = 0
+        self._init_database()
+        self._entries = self._load_entries()
+
+    def _init_database(self):
+        """Create the index table"""
+        with self.lock:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS email_records (
+                    record_file TEXT PRIMARY KEY,
+                    source_type TEXT,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    unique_id TEXT,
+                    subject TEXT,
+                    sent_at TEXT,
+                    is_medical INTEGER,
+                    screening_key TEXT,
+                    indexed_at TEXT
+                )
+            ''')
+            self._connection.commit()
+
+    def _load_entries(self) -> Dict[str, tuple]:
+        """Load (mtime_ns, size, is_medical, screening_key) of every record into memory"""
+        with self.lock:
+            rows = self._connection.execute(
+                'SELECT record_file, mtime_ns, size, is_medical, screening_key FROM email_records'
+            ).fetchall()
+        return {row[0]: (row[1], row[2], bool(row[3]), row[4]) for row in rows}
+
+    def get_screening(self, record_file: str, mtime_ns: int, size: int, screening_key: str) -> Optional[bool]:
+        """
+        Get the stored screening result of a record if it is still valid
+
+        Args:
+            record_file: Path of the record file
+            mtime_ns: Current modification time of the file
+            size: Current size of the file
+            screening_key: Key of the current medical keyword set
+
+        Returns:
+            Optional[bool]: Stored result, or None if the record is new, changed
+            or was screened with other keywords
+        """
+        entry = self._entries.get(record_file)
+        if entry is None or entry[0] != mtime_ns or entry[1] != size or entry[3] != screening_key:
+            return None
+        return entry[2]
+
+    def update(
+        self,
+        record_file: str,
+        source_type: str,
+        mtime_ns: int,
+        size: int,
+        header: Dict[str, str],
+        is_medical: bool,
+        screening_key: str
+    ):
+        """
+        Store the screening result of a record (written on the next flush)
+
+        Args:
+            record_file: Path of the record file
+            source_type: 'traditional' or 'professional'
+            mtime_ns: Modification time the record was read at
+            size: Size the record was read at
+            header: unique_id, subject and sent_at of the email
+            is_medical: Screening result
+            screening_key: Key of the medical keyword set used
+        """
+        with self.lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO email_records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (record_file, source_type, mtime_ns, size, header.get('unique_id', ''),
+                 header.get('subject', ''), header.get('sent_at', ''), int(is_medical),
+                 screening_key, datetime.now().isoformat())
+            )
+            self._entries[record_file] = (mtime_ns, size, bool(is_medical), screening_key)
+            self._pending += 1
+
+    def get_entry(self, record_file: str) -> Optional[Dict[str, Any]]:
+        """Get the stored row of a record file"""
+        columns = ('record_file', 'source_type', 'mtime_ns', 'size', 'unique_id',
+                   'subject', 'sent_at', 'is_medical', 'screening_key', 'indexed_at')
+
+        with self.lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(columns)} FROM email_records WHERE record_file = ?",
+                (record_file,)
+            ).fetchone()
+
+        return dict(zip(columns, row)) if row else None
+
+    def flush(self):
+        """Commit pending updates"""
+        with self.lock:
+            if self._pending:
+                self._connection.commit()
+                self._pending = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        """Flush and close the index database"""
+        if self._connection:
+            try:
+                self.flush()
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
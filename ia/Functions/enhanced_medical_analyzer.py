@@ -8,8 +8,9 @@ import json
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import spacy
-from spacy.matcher import Matcher
+
+from nlp_models import get_spacy_model, SPANISH_MODEL
+from analysis_context import AnalysisContext
 
 logger = logging.getLogger(__name__)
 
@@ -18,17 +19,41 @@ class EnhancedMedicalAnalyzer:
     Enhanced medical text analyzer with advanced clinical data extraction
     """
     
+    # Fields of analyze_medical_text, in output order
+    ANALYSIS_FIELDS = (
+        'patient_info', 'clinical_data', 'vital_signs', 'medications', 'procedures',
+        'diagnoses', 'specialty', 'urgency_score', 'priority_level', 'referral_type',
+        'institution_info', 'temporal_info', 'clinical_context', 'confidence_scores'
+    )
+    
+    # Fields computed from other fields
+    FIELD_DEPENDENCIES = {
+        'priority_level': ('urgency_score',),
+        'confidence_scores': ('patient_info', 'clinical_data', 'vital_signs')
+    }
+    
+    # Fields needed to triage a referral
+    TRIAGE_FIELDS = ('specialty', 'urgency_score', 'priority_level', 'referral_type')
+    
     def __init__(self):
         """Initialize the enhanced medical analyzer"""
-        try:
-            # Load Spanish language model
-            self.nlp = spacy.load("es_core_news_sm")
-        except OSError:
-            logger.warning("Spanish spaCy model not found, using basic patterns")
-            self.nlp = None
+        # Token matcher, built with the shared spaCy model on first use
+        self._matcher = None
         
-        self.matcher = Matcher(self.nlp.vocab) if self.nlp else None
-        self._setup_patterns()
+        # Extractors taking (text, text_lower), by analysis field
+        self._field_extractors = {
+            'patient_info': self._extract_patient_info,
+            'clinical_data': self._extract_clinical_data,
+            'vital_signs': self._extract_vital_signs,
+            'medications': self._extract_medications,
+            'procedures': self._extract_procedures,
+            'diagnoses': self._extract_diagnoses,
+            'specialty': self._detect_specialty,
+            'urgency_score': self._calculate_urgency_score,
+            'referral_type': self._detect_referral_type,
+            'temporal_info': self._extract_temporal_info,
+            'clinical_context': self._extract_clinical_context
+        }
         
         # Medical specialties mapping
         self.specialties_mapping = {
@@ -125,9 +150,24 @@ class EnhancedMedicalAnalyzer:
             'unconscious': 8
         }
     
+    @property
+    def nlp(self):
+        """Shared Spanish spaCy pipeline (tokenizer and vocab only), loaded on first use"""
+        return get_spacy_model(SPANISH_MODEL, components=())
+    
+    @property
+    def matcher(self):
+        """spaCy token matcher with the medical entity patterns (None if spaCy is unavailable)"""
+        if self._matcher is None and self.nlp is not None:
+            from spacy.matcher import Matcher
+            self._matcher = Matcher(self.nlp.vocab)
+            self._setup_patterns()
+        
+        return self._matcher
+    
     def _setup_patterns(self):
         """Setup spaCy patterns for medical entity extraction"""
-        if not self.matcher:
+        if not self._matcher:
             return
         
         # Patient identification patterns
@@ -135,14 +175,14 @@ class EnhancedMedicalAnalyzer:
             [{"LOWER": {"IN": ["paciente", "patient"]}}, {"IS_ALPHA": True}, {"IS_ALPHA": True}],
             [{"LOWER": {"IN": ["nombre", "name"]}}, {"TEXT": ":"}, {"IS_ALPHA": True}, {"IS_ALPHA": True}]
         ]
-        self.matcher.add("PATIENT_NAME", patient_patterns)
+        self._matcher.add("PATIENT_NAME", patient_patterns)
         
         # Age patterns
         age_patterns = [
             [{"LOWER": {"IN": ["edad", "age"]}}, {"TEXT": ":"}, {"LIKE_NUM": True}],
             [{"LIKE_NUM": True}, {"LOWER": {"IN": ["años", "years", "año"]}}]
         ]
-        self.matcher.add("AGE", age_patterns)
+        self._matcher.add("AGE", age_patterns)
         
         # Vital signs patterns
         vital_patterns = [
@@ -150,37 +190,69 @@ class EnhancedMedicalAnalyzer:
             [{"LOWER": {"IN": ["fr", "frecuencia"]}}, {"LOWER": {"IN": ["respiratoria", "respiratory"]}}, {"TEXT": ":"}, {"LIKE_NUM": True}],
             [{"LOWER": {"IN": ["ta", "tension", "blood"]}}, {"LOWER": {"IN": ["arterial", "pressure"]}}, {"TEXT": ":"}, {"LIKE_NUM": True}]
         ]
-        self.matcher.add("VITAL_SIGNS", vital_patterns)
+        self._matcher.add("VITAL_SIGNS", vital_patterns)
     
-    def analyze_medical_text(self, text: str) -> Dict[str, Any]:
+    def analyze_medical_text(
+        self,
+        text: str,
+        context: Optional[AnalysisContext] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Comprehensive medical text analysis
         
         Args:
-            text: Medical text to analyze
+            text: Medical text to analyze (ignored when a context is given)
+            context: Shared analysis context of the email; the analysis is run
+                     once per context and reused by later callers
+            fields: Analysis fields to compute (see ANALYSIS_FIELDS, e.g.
+                    TRIAGE_FIELDS). Only these extractors and the ones they
+                    depend on run; None computes everything
             
         Returns:
-            Dict: Comprehensive analysis results
+            Dict: Analysis results (only the requested fields when fields is given)
         """
+        if fields is not None:
+            unknown = [field for field in fields if field not in self.ANALYSIS_FIELDS]
+            if unknown:
+                logger.warning(f"Ignoring unknown analysis fields: {', '.join(unknown)}")
+            fields = [field for field in fields if field in self.ANALYSIS_FIELDS]
+        
+        if context is not None:
+            cached = context.get_result('enhanced_medical_analysis')
+            if cached is not None:
+                if fields is None or 'error' in cached:
+                    return cached
+                return {field: cached[field] for field in fields}
+            text = context.text
+        
         try:
-            analysis = {
-                'patient_info': self._extract_patient_info(text),
-                'clinical_data': self._extract_clinical_data(text),
-                'vital_signs': self._extract_vital_signs(text),
-                'medications': self._extract_medications(text),
-                'procedures': self._extract_procedures(text),
-                'diagnoses': self._extract_diagnoses(text),
-                'specialty': self._detect_specialty(text),
-                'urgency_score': self._calculate_urgency_score(text),
-                'priority_level': self._determine_priority_level(text),
-                'referral_type': self._detect_referral_type(text),
-                'institution_info': self._extract_institution_info(text),
-                'temporal_info': self._extract_temporal_info(text),
-                'clinical_context': self._extract_clinical_context(text)
-            }
+            # Lowercase view computed once and shared by every extractor
+            text_lower = context.lower if context is not None else text.lower()
+            
+            needed = set(self.ANALYSIS_FIELDS if fields is None else fields)
+            for field in list(needed):
+                needed.update(self.FIELD_DEPENDENCIES.get(field, ()))
+            
+            analysis = {}
+            for field in self.ANALYSIS_FIELDS:
+                if field not in needed:
+                    continue
+                
+                if field == 'priority_level':
+                    analysis[field] = self._determine_priority_level(text, text_lower, analysis['urgency_score'])
+                elif field == 'institution_info':
+                    analysis[field] = self._extract_institution_info(text)
+                elif field == 'confidence_scores':
+                    analysis[field] = self._calculate_confidence_scores(analysis)
+                else:
+                    analysis[field] = self._field_extractors[field](text, text_lower)
+            
+            if fields is not None:
+                return {field: analysis[field] for field in fields}
             
-            # Add confidence scores
-            analysis['confidence_scores'] = self._calculate_confidence_scores(analysis)
+            if context is not None:
+                context.set_result('enhanced_medical_analysis', analysis)
             
             return analysis
             
@@ -188,7 +260,7 @@ class EnhancedMedicalAnalyzer:
             logger.error(f"Error in medical text analysis: {str(e)}")
             return {'error': str(e)}
     
-    def _extract_patient_info(self, text: str) -> Dict[str, Any]:
+    def _extract_patient_info(self, text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
         """Extract patient demographic information"""
         patient_info = {
             'name': None,
@@ -199,7 +271,7 @@ class EnhancedMedicalAnalyzer:
         }
         
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Extract patient name
             name_patterns = [
@@ -265,7 +337,7 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting patient info: {str(e)}")
             return patient_info
     
-    def _extract_vital_signs(self, text: str) -> Dict[str, Any]:
+    def _extract_vital_signs(self, text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
         """Extract vital signs from text"""
         vital_signs = {
             'heart_rate': None,
@@ -278,7 +350,7 @@ class EnhancedMedicalAnalyzer:
         }
         
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Heart rate
             hr_patterns = [
@@ -372,7 +444,7 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting vital signs: {str(e)}")
             return vital_signs
     
-    def _extract_clinical_data(self, text: str) -> Dict[str, Any]:
+    def _extract_clinical_data(self, text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
         """Extract clinical information"""
         clinical_data = {
             'chief_complaint': None,
@@ -383,7 +455,7 @@ class EnhancedMedicalAnalyzer:
         }
         
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Chief complaint
             complaint_patterns = [
@@ -427,11 +499,11 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting clinical data: {str(e)}")
             return clinical_data
     
-    def _extract_medications(self, text: str) -> List[str]:
+    def _extract_medications(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract medications from text"""
         try:
             medications = []
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Common medication patterns
             med_patterns = [
@@ -456,7 +528,7 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting medications: {str(e)}")
             return []
     
-    def _extract_diagnoses(self, text: str) -> Dict[str, Any]:
+    def _extract_diagnoses(self, text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
         """Extract diagnoses from text"""
         diagnoses = {
             'primary': None,
@@ -465,7 +537,7 @@ class EnhancedMedicalAnalyzer:
         }
         
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Primary diagnosis
             primary_patterns = [
@@ -498,10 +570,10 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting diagnoses: {str(e)}")
             return diagnoses
     
-    def _detect_specialty(self, text: str) -> Optional[str]:
+    def _detect_specialty(self, text: str, text_lower: Optional[str] = None) -> Optional[str]:
         """Detect medical specialty from text"""
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             for specialty_key, specialty_name in self.specialties_mapping.items():
                 if specialty_key in text_lower:
@@ -513,10 +585,10 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error detecting specialty: {str(e)}")
             return None
     
-    def _calculate_urgency_score(self, text: str) -> float:
+    def _calculate_urgency_score(self, text: str, text_lower: Optional[str] = None) -> float:
         """Calculate urgency score based on keywords"""
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             total_score = 0
             
             for keyword, score in self.urgency_keywords.items():
@@ -533,11 +605,12 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error calculating urgency score: {str(e)}")
             return 0.0
     
-    def _determine_priority_level(self, text: str) -> str:
+    def _determine_priority_level(self, text: str, text_lower: Optional[str] = None, urgency_score: Optional[float] = None) -> str:
         """Determine priority level based on urgency score and keywords"""
         try:
-            urgency_score = self._calculate_urgency_score(text)
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
+            if urgency_score is None:
+                urgency_score = self._calculate_urgency_score(text, text_lower)
             
             # High priority indicators
             high_priority_keywords = [
@@ -556,10 +629,10 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error determining priority level: {str(e)}")
             return 'Media'
     
-    def _detect_referral_type(self, text: str) -> str:
+    def _detect_referral_type(self, text: str, text_lower: Optional[str] = None) -> str:
         """Detect type of medical referral"""
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             if any(word in text_lower for word in ['hospitalizacion', 'hospitalización', 'internacion', 'internación', 'admission']):
                 return 'hospitalizacion'
@@ -613,7 +686,7 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting institution info: {str(e)}")
             return institution_info
     
-    def _extract_temporal_info(self, text: str) -> Dict[str, Any]:
+    def _extract_temporal_info(self, text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
         """Extract temporal information from text"""
         temporal_info = {
             'symptom_duration': None,
@@ -622,7 +695,7 @@ class EnhancedMedicalAnalyzer:
         }
         
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Duration patterns
             duration_patterns = [
@@ -642,7 +715,7 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting temporal info: {str(e)}")
             return temporal_info
     
-    def _extract_clinical_context(self, text: str) -> Dict[str, Any]:
+    def _extract_clinical_context(self, text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
         """Extract clinical context and reasoning"""
         context = {
             'reason_for_referral': None,
@@ -652,7 +725,7 @@ class EnhancedMedicalAnalyzer:
         }
         
         try:
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Reason for referral
             referral_patterns = [
@@ -676,11 +749,11 @@ class EnhancedMedicalAnalyzer:
             logger.warning(f"Error extracting clinical context: {str(e)}")
             return context
     
-    def _extract_procedures(self, text: str) -> List[str]:
+    def _extract_procedures(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract medical procedures from text"""
         try:
             procedures = []
-            text_lower = text.lower()
+            text_lower = text.lower() if text_lower is None else text_lower
             
             # Common procedure keywords
             procedure_keywords = [
@@ -7,14 +7,20 @@ Provides unlimited Gmail data extraction capabilities
 import imaplib
 import email
 import ssl
+import select
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
 from email.header import decode_header
 from email.utils import parsedate_tz, mktime_tz
 from email.message import Message
 import datetime
 import hashlib
 import os
+import re
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,7 +31,14 @@ class GmailConnector:
     Gmail IMAP connector for unlimited email extraction
     """
     
-    def __init__(self, email_address: str, password: str, imap_server: str = "imap.gmail.com", port: int = 993):
+    def __init__(
+        self,
+        email_address: str,
+        password: str,
+        imap_server: str = "imap.gmail.com",
+        port: int = 993,
+        use_ssl: bool = True
+    ):
         """
         Initialize Gmail connector
         
@@ -34,12 +47,16 @@ class GmailConnector:
             password: App password (not regular password)
             imap_server: IMAP server address
             port: IMAP port (993 for SSL)
+            use_ssl: Connect over SSL (disable only for local test servers)
         """
         self.email_address = email_address
         self.password = password
         self.imap_server = imap_server
         self.port = port
+        self.use_ssl = use_ssl
         self.connection = None
+        self.selected_folder = None
+        self.last_used = None
         
     def connect(self) -> bool:
         """
@@ -49,15 +66,17 @@ class GmailConnector:
             bool: True if connection successful, False otherwise
         """
         try:
-            # Create SSL context
-            context = ssl.create_default_context()
-            
             # Connect to server
-            self.connection = imaplib.IMAP4_SSL(self.imap_server, self.port, ssl_context=context)
+            if self.use_ssl:
+                context = ssl.create_default_context()
+                self.connection = imaplib.IMAP4_SSL(self.imap_server, self.port, ssl_context=context)
+            else:
+                self.connection = imaplib.IMAP4(self.imap_server, self.port)
             
             # Login
             self.connection.login(self.email_address, self.password)
             
+            self.last_used = time.time()
             logger.info(f"Successfully connected to Gmail for {self.email_address}")
             return True
             
@@ -76,7 +95,172 @@ class GmailConnector:
                 logger.info("Disconnected from Gmail")
             except Exception as e:
                 logger.error(f"Error disconnecting: {str(e)}")
+            finally:
+                self.connection = None
+
+    def is_alive(self) -> bool:
+        """
+        Check that the IMAP session still answers (NOOP round trip)
+
+        Returns:
+            bool: True if the server answered OK
+        """
+        if not self.connection:
+            return False
+
+        try:
+            status, _ = self.connection.noop()
+            if status == 'OK':
+                self.last_used = time.time()
+                return True
+            return False
+        except Exception as e:
+            logger.warning(f"IMAP health check failed: {str(e)}")
+            return False
+
+    def reconnect(self) -> bool:
+        """
+        Drop the current session and log in again, restoring the selected folder
+
+        Returns:
+            bool: True if the new session is ready
+        """
+        folder = self.selected_folder
+
+        if self.connection:
+            try:
+                self.connection.logout()
+            except Exception:
+                pass
+            self.connection = None
+
+        if not self.connect():
+            return False
+
+        if folder:
+            return self.select_folder(folder)
+
+        return True
     
+    def supports_idle(self) -> bool:
+        """
+        Check whether the server advertises the IDLE extension (RFC 2177)
+
+        Returns:
+            bool: True if IDLE can be used
+        """
+        if not self.connection:
+            return False
+        return 'IDLE' in self.connection.capabilities
+
+    def idle(self, timeout: float = 300) -> List[str]:
+        """
+        Wait in IMAP IDLE until the server pushes a mailbox change or the timeout expires
+
+        A folder must be selected. The session is usable for normal commands
+        again when this returns.
+
+        Args:
+            timeout: Maximum seconds to stay idle (keep below the server's
+                     ~29 minute IDLE limit)
+
+        Returns:
+            List[str]: Untagged updates received (e.g. "12 EXISTS"); empty on timeout
+
+        Raises:
+            ConnectionError: If the server rejects IDLE or the session breaks
+        """
+        if not self.connection:
+            raise ConnectionError("No active connection")
+
+        connection = self.connection
+        # _new_tag() registers the tag in tagged_commands; it is popped in the
+        # finally below because IDLE bypasses imaplib's own command handling
+        tag = connection._new_tag()
+        updates = []
+
+        try:
+            connection.send(tag + b' IDLE\r\n')
+            response = connection.readline()
+            if not response.startswith(b'+'):
+                raise ConnectionError(f"Server refused IDLE: {response.decode(errors='replace').strip()}")
+
+            deadline = time.time() + timeout
+            sock = connection.socket()
+
+            while not updates:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+
+                # Bytes already buffered by imaplib or SSL are invisible to select()
+                if not self._has_buffered_input(connection, sock):
+                    readable, _, _ = select.select([sock], [], [], remaining)
+                    if not readable:
+                        break
+
+                line = connection.readline()
+                if not line:
+                    raise ConnectionError("Connection closed during IDLE")
+
+                line = line.decode(errors='replace').strip()
+                if re.match(r'^\* \d+ (EXISTS|RECENT|EXPUNGE)$', line):
+                    updates.append(line[2:])
+
+            # Leave IDLE and wait for the tagged completion
+            connection.send(b'DONE\r\n')
+            while True:
+                line = connection.readline()
+                if not line:
+                    raise ConnectionError("Connection closed while leaving IDLE")
+                if line.startswith(tag):
+                    if b' OK' not in line:
+                        raise ConnectionError(f"IDLE ended with error: {line.decode(errors='replace').strip()}")
+                    break
+                decoded = line.decode(errors='replace').strip()
+                if re.match(r'^\* \d+ (EXISTS|RECENT|EXPUNGE)$', decoded):
+                    updates.append(decoded[2:])
+
+            self.last_used = time.time()
+            return updates
+
+        except ConnectionError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"IDLE failed: {str(e)}")
+        finally:
+            connection.tagged_commands.pop(tag, None)
+
+    @staticmethod
+    def _has_buffered_input(connection, sock) -> bool:
+        """
+        Check whether unread response bytes are already buffered client-side
+
+        imaplib reads through a buffered file object, so a line that arrived
+        in the same packet as an earlier one (e.g. "* 3 EXISTS" right after
+        "+ idling") sits in that buffer. SSL sockets may also hold decrypted
+        bytes. select() on the socket sees neither.
+
+        Args:
+            connection: imaplib.IMAP4 connection
+            sock: Its underlying socket
+
+        Returns:
+            bool: True if a read would return data without waiting on the network
+        """
+        if getattr(sock, 'pending', lambda: 0)():
+            return True
+
+        # Non-blocking peek: returns buffered bytes, or b'' instead of waiting
+        timeout = sock.gettimeout()
+        try:
+            sock.setblocking(False)
+            return bool(connection.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(timeout)
+
     def list_folders(self) -> List[str]:
         """
         List all available folders/labels
@@ -120,6 +304,7 @@ class GmailConnector:
         try:
             status, messages = self.connection.select(folder_name)
             if status == 'OK':
+                self.selected_folder = folder_name
                 logger.info(f"Selected folder: {folder_name}")
                 return True
             else:
@@ -151,6 +336,7 @@ class GmailConnector:
             if status != 'OK':
                 logger.error(f"Failed to select folder: {folder}")
                 return []
+            self.selected_folder = folder
 
             # Search for emails
             status, messages = self.connection.search(None, criteria)
@@ -165,12 +351,88 @@ class GmailConnector:
             logger.error(f"Error searching emails: {str(e)}")
             return []
     
-    def fetch_email(self, email_id: str) -> Optional[Message]:
+    def get_uid_validity(self, folder: str = "INBOX") -> Optional[int]:
+        """
+        Get the UIDVALIDITY of a folder
+
+        Args:
+            folder: Folder name
+
+        Returns:
+            Optional[int]: UIDVALIDITY value or None if unavailable
+        """
+        if not self.connection:
+            logger.error("No active connection")
+            return None
+
+        try:
+            status, data = self.connection.status(folder, '(UIDVALIDITY)')
+            if status == 'OK' and data:
+                match = re.search(r'UIDVALIDITY (\d+)', data[0].decode())
+                if match:
+                    return int(match.group(1))
+            return None
+
+        except Exception as e:
+            logger.error(f"Error getting UIDVALIDITY for {folder}: {str(e)}")
+            return None
+
+    def search_uids(self, criteria: str = "ALL", folder: str = "INBOX") -> List[str]:
+        """
+        Search for emails and return their UIDs (stable across sessions)
+
+        Args:
+            criteria: Search criteria (e.g., "ALL", "SINCE 01-Jan-2025")
+            folder: Email folder to search in
+
+        Returns:
+            List[str]: List of UIDs in ascending order
+        """
+        if not self.connection:
+            logger.error("No active connection")
+            return []
+
+        try:
+            if self.selected_folder != folder and not self.select_folder(folder):
+                return []
+
+            status, messages = self.connection.uid('SEARCH', None, criteria)
+            if status == 'OK':
+                uids = [uid.decode() for uid in messages[0].split()]
+                return sorted(uids, key=int)
+            else:
+                logger.error(f"UID search failed with criteria: {criteria}")
+                return []
+
+        except Exception as e:
+            logger.error(f"Error searching UIDs: {str(e)}")
+            return []
+
+    def search_uids_after(self, last_uid: int, folder: str = "INBOX") -> List[str]:
+        """
+        Get UIDs strictly greater than a high-water mark
+
+        Args:
+            last_uid: Last processed UID
+            folder: Email folder to search in
+
+        Returns:
+            List[str]: New UIDs in ascending order
+        """
+        uids = self.search_uids(f'UID {last_uid + 1}:*', folder)
+
+        # "n:*" always matches the highest UID, even when it is below n
+        return [uid for uid in uids if int(uid) > last_uid]
+
+    def fetch_email(self, email_id: str, by_uid: bool = False, raise_connection_errors: bool = False) -> Optional[Message]:
         """
         Fetch a specific email by ID
         
         Args:
             email_id: Email UID
+            by_uid: Treat the id as a UID (UID FETCH) instead of a sequence number
+            raise_connection_errors: Re-raise imaplib.IMAP4.abort / OSError instead of
+                                     returning None, so callers can reconnect
             
         Returns:
             EmailMessage object or None if failed
@@ -180,8 +442,12 @@ class GmailConnector:
             return None
         
         try:
-            status, msg_data = self.connection.fetch(email_id, '(RFC822)')
-            if status == 'OK':
+            if by_uid:
+                status, msg_data = self.connection.uid('FETCH', email_id, '(RFC822)')
+            else:
+                status, msg_data = self.connection.fetch(email_id, '(RFC822)')
+            self.last_used = time.time()
+            if status == 'OK' and msg_data and isinstance(msg_data[0], tuple):
                 email_body = msg_data[0][1]
                 email_message = email.message_from_bytes(email_body)
                 return email_message
@@ -189,10 +455,138 @@ class GmailConnector:
                 logger.error(f"Failed to fetch email {email_id}")
                 return None
                 
+        except (imaplib.IMAP4.abort, OSError) as e:
+            if raise_connection_errors:
+                raise
+            logger.error(f"Error fetching email {email_id}: {str(e)}")
+            return None
         except Exception as e:
             logger.error(f"Error fetching email {email_id}: {str(e)}")
             return None
     
+    def fetch_emails_bulk(
+        self,
+        email_ids: Iterable[str],
+        chunk: int = 200,
+        by_uid: bool = False
+    ) -> Iterator[Tuple[str, Message]]:
+        """
+        Fetch many emails with one FETCH round trip per chunk
+
+        Consecutive ids are collapsed into ranges (e.g. "1:200") so each
+        chunk is a single message-set command instead of one command per email.
+
+        Args:
+            email_ids: Email UIDs to fetch
+            chunk: Maximum number of messages per FETCH command
+            by_uid: Treat ids as UIDs (UID FETCH) instead of sequence numbers
+
+        Yields:
+            Tuple[str, Message]: (email_id, parsed message) as each chunk arrives
+        """
+        if not self.connection:
+            logger.error("No active connection")
+            return
+
+        email_ids = [str(email_id) for email_id in email_ids]
+        chunk = max(1, chunk)
+
+        for start in range(0, len(email_ids), chunk):
+            chunk_ids = email_ids[start:start + chunk]
+            message_set = build_message_set(chunk_ids)
+
+            try:
+                if by_uid:
+                    status, msg_data = self.connection.uid('FETCH', message_set, '(UID RFC822)')
+                else:
+                    status, msg_data = self.connection.fetch(message_set, '(RFC822)')
+                self.last_used = time.time()
+            except Exception as e:
+                logger.error(f"Error bulk fetching emails {message_set}: {str(e)}")
+                continue
+
+            if status != 'OK':
+                logger.error(f"Failed to bulk fetch emails {message_set}")
+                continue
+
+            for fetched_id, _, payload in parse_fetch_response(msg_data, by_uid=by_uid):
+                try:
+                    yield fetched_id, email.message_from_bytes(payload)
+                except Exception as e:
+                    logger.error(f"Error parsing email {fetched_id}: {str(e)}")
+
+    def fetch_headers_bulk(
+        self,
+        email_ids: Iterable[str],
+        chunk: int = 200,
+        by_uid: bool = False,
+        preview_bytes: int = 0
+    ) -> Iterator[Tuple[str, Message, Dict[str, Any]]]:
+        """
+        Fetch only headers and MIME structure, without downloading bodies or attachments
+
+        Uses BODY.PEEK so the \\Seen flag is left untouched.
+
+        Args:
+            email_ids: Email UIDs to fetch
+            chunk: Maximum number of messages per FETCH command
+            by_uid: Treat ids as UIDs (UID FETCH) instead of sequence numbers
+            preview_bytes: Also fetch the first N bytes of the body text (0 disables)
+
+        Yields:
+            Tuple[str, Message, Dict]: (email_id, header-only message, info) where
+            info holds size_bytes, bodystructure, attachment_count and preview
+        """
+        if not self.connection:
+            logger.error("No active connection")
+            return
+
+        items = 'UID RFC822.SIZE BODYSTRUCTURE BODY.PEEK[HEADER]'
+        if preview_bytes > 0:
+            items += f' BODY.PEEK[TEXT]<0.{preview_bytes}>'
+
+        email_ids = [str(email_id) for email_id in email_ids]
+        chunk = max(1, chunk)
+
+        for start in range(0, len(email_ids), chunk):
+            message_set = build_message_set(email_ids[start:start + chunk])
+
+            try:
+                if by_uid:
+                    status, msg_data = self.connection.uid('FETCH', message_set, f'({items})')
+                else:
+                    status, msg_data = self.connection.fetch(message_set, f'({items})')
+                self.last_used = time.time()
+            except Exception as e:
+                logger.error(f"Error fetching headers {message_set}: {str(e)}")
+                continue
+
+            if status != 'OK':
+                logger.error(f"Failed to fetch headers {message_set}")
+                continue
+
+            for fetched in parse_fetch_sections(msg_data, by_uid=by_uid):
+                header_bytes = fetched['sections'].get('HEADER')
+                if header_bytes is None:
+                    continue
+
+                meta = fetched['meta'].decode('utf-8', errors='replace')
+                size_match = re.search(r'RFC822\.SIZE (\d+)', meta)
+                bodystructure = extract_bodystructure(meta)
+                preview = fetched['sections'].get('TEXT', b'')
+
+                info = {
+                    'size_bytes': int(size_match.group(1)) if size_match else 0,
+                    'bodystructure': bodystructure,
+                    'attachment_count': len(re.findall(r'"attachment"', bodystructure, re.IGNORECASE)),
+                    'preview': preview.decode('utf-8', errors='replace')
+                }
+
+                try:
+                    yield fetched['id'], email.message_from_bytes(header_bytes), info
+                except Exception as e:
+                    logger.error(f"Error parsing headers of email {fetched['id']}: {str(e)}")
+
     def generate_unique_id(self, email_message: Message) -> str:
         """
         Generate unique ID for email message
@@ -439,3 +833,400 @@ class GmailConnector:
         search_criteria = ' '.join(search_parts) if search_parts else 'ALL'
 
         return self.search_emails(search_criteria)
+
+
+
+def build_message_set(email_ids: Iterable[str]) -> str:
+    """
+    Build a compact IMAP message set from ids
+
+    Args:
+        email_ids: Email ids (sequence numbers or UIDs)
+
+    Returns:
+        str: Message set such as "1:5,9,12:14"
+    """
+    numbers = sorted({int(email_id) for email_id in email_ids})
+    if not numbers:
+        return ''
+
+    parts = []
+    range_start = previous = numbers[0]
+
+    for number in numbers[1:]:
+        if number == previous + 1:
+            previous = number
+            continue
+        parts.append(f"{range_start}:{previous}" if previous != range_start else str(range_start))
+        range_start = previous = number
+
+    parts.append(f"{range_start}:{previous}" if previous != range_start else str(range_start))
+    return ','.join(parts)
+
+
+def parse_fetch_response(msg_data: List[Any], by_uid: bool = False) -> List[Tuple[str, bytes, bytes]]:
+    """
+    Split an imaplib FETCH response into per-message parts
+
+    Args:
+        msg_data: Data list returned by IMAP4.fetch / IMAP4.uid('FETCH')
+        by_uid: The ids must be UIDs; messages whose response carries no UID are skipped
+
+    Returns:
+        List[Tuple[str, bytes, bytes]]: (id, non-literal response bytes, first literal);
+        the id is the UID when the response carries one, else the sequence number
+    """
+    return [
+        (message['id'], message['meta'], message['literals'][0])
+        for message in parse_fetch_sections(msg_data, by_uid=by_uid)
+        if message['literals']
+    ]
+
+
+def extract_bodystructure(meta: str) -> str:
+    """
+    Cut the balanced BODYSTRUCTURE (...) list out of a FETCH response
+
+    Args:
+        meta: Decoded non-literal part of a FETCH response
+
+    Returns:
+        str: Parenthesized body structure, or '' if absent
+    """
+    start = meta.find('BODYSTRUCTURE (')
+    if start < 0:
+        return ''
+
+    start += len('BODYSTRUCTURE ')
+    depth = 0
+    in_quotes = False
+
+    for index in range(start, len(meta)):
+        char = meta[index]
+        if char == '"' and meta[index - 1] != '\\':
+            in_quotes = not in_quotes
+        elif not in_quotes and char == '(':
+            depth += 1
+        elif not in_quotes and char == ')':
+            depth -= 1
+            if depth == 0:
+                return meta[start:index + 1]
+
+    return meta[start:]
+
+
+def parse_fetch_sections(msg_data: List[Any], by_uid: bool = False) -> List[Dict[str, Any]]:
+    """
+    Split a multi-item FETCH response into per-message sections
+
+    Handles responses carrying several literals per message, e.g.
+    BODY[HEADER] followed by BODY[TEXT]<0>, and a UID sent after the
+    literals (in the trailing b' UID n)' item).
+
+    Args:
+        msg_data: Data list returned by IMAP4.fetch / IMAP4.uid('FETCH')
+        by_uid: The ids must be UIDs; messages whose response carries no UID are skipped
+
+    Returns:
+        List[Dict]: One entry per message with 'id' (UID when present),
+        'meta' (all non-literal response bytes), 'sections' (name -> literal)
+        and 'literals' (every literal in response order)
+    """
+    messages = []
+    current = None
+
+    for item in msg_data or []:
+        if isinstance(item, tuple) and len(item) >= 2:
+            header = item[0]
+
+            # "<seq> (" opens a new message; anything else continues the current one
+            if re.match(rb'^\d+ \(', header) or current is None:
+                current = {'id': header.split(b' ', 1)[0].decode(), 'meta': b'', 'sections': {}, 'literals': []}
+                messages.append(current)
+
+            current['meta'] += header
+            current['literals'].append(item[1])
+            section_match = re.search(rb'BODY\[([A-Z0-9.]*)\](?:<\d+>)? \{\d+\}$', header)
+            if section_match:
+                current['sections'][section_match.group(1).decode()] = item[1]
+
+        elif isinstance(item, bytes) and current is not None:
+            current['meta'] += item
+
+    parsed = []
+    for message in messages:
+        uid_match = re.search(rb'UID (\d+)', message['meta'])
+        if uid_match:
+            message['id'] = uid_match.group(1).decode()
+        elif by_uid:
+            logger.warning(f"FETCH response for message {message['id']} carries no UID, skipping it")
+            continue
+        parsed.append(message)
+
+    return parsed
+
+
+class GmailConnectionPool:
+    """
+    Pool of authenticated Gmail IMAP sessions
+
+    imaplib connections are not thread-safe, so every worker thread borrows
+    its own session from the pool instead of sharing a single connector.
+    """
+
+    def __init__(
+        self,
+        email_address: str,
+        password: str,
+        imap_server: str = "imap.gmail.com",
+        port: int = 993,
+        size: int = 4,
+        folder: str = "INBOX",
+        idle_timeout: int = 300,
+        acquire_timeout: int = 60,
+        max_retries: int = 2,
+        use_ssl: bool = True
+    ):
+        """
+        Initialize connection pool
+
+        Args:
+            email_address: Gmail email address
+            password: App password (not regular password)
+            imap_server: IMAP server address
+            port: IMAP port (993 for SSL)
+            size: Number of sessions (one per worker)
+            folder: Folder every session keeps selected
+            idle_timeout: Seconds a session may sit unused before it is health-checked
+            acquire_timeout: Seconds to wait for a free session
+            max_retries: Reconnect attempts when a fetch fails
+            use_ssl: Connect over SSL (disable only for local test servers)
+        """
+        self.email_address = email_address
+        self.password = password
+        self.imap_server = imap_server
+        self.port = port
+        self.size = max(1, size)
+        self.folder = folder
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.max_retries = max_retries
+        self.use_ssl = use_ssl
+
+        self._available = queue.Queue()
+        self._connectors = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.stats = {
+            'connections_opened': 0,
+            'reconnects': 0,
+            'health_checks': 0,
+            'failed_health_checks': 0,
+            'fetches': 0,
+            'fetch_errors': 0
+        }
+
+    @classmethod
+    def from_connector(cls, connector: GmailConnector, size: int = 4, **kwargs) -> 'GmailConnectionPool':
+        """
+        Build a pool with the same credentials and folder as an existing connector
+
+        Args:
+            connector: Configured GmailConnector
+            size: Number of sessions
+
+        Returns:
+            GmailConnectionPool: New pool (sessions are opened lazily)
+        """
+        kwargs.setdefault('folder', connector.selected_folder or "INBOX")
+        return cls(
+            connector.email_address,
+            connector.password,
+            imap_server=connector.imap_server,
+            port=connector.port,
+            size=size,
+            use_ssl=connector.use_ssl,
+            **kwargs
+        )
+
+    def _open_connector(self) -> Optional[GmailConnector]:
+        """Open and authenticate a new session with the pool folder selected"""
+        connector = GmailConnector(self.email_address, self.password, self.imap_server, self.port, self.use_ssl)
+        if not connector.connect():
+            return None
+
+        if self.folder and not connector.select_folder(self.folder):
+            connector.disconnect()
+            return None
+
+        self.stats['connections_opened'] += 1
+        return connector
+
+    def _ensure_healthy(self, connector: GmailConnector) -> bool:
+        """Health-check idle sessions and reconnect broken ones"""
+        if connector.connection is None:
+            self.stats['reconnects'] += 1
+            return connector.reconnect()
+
+        idle_for = time.time() - (connector.last_used or 0)
+        if idle_for < self.idle_timeout:
+            return True
+
+        self.stats['health_checks'] += 1
+        if connector.is_alive():
+            return True
+
+        self.stats['failed_health_checks'] += 1
+        self.stats['reconnects'] += 1
+        logger.info("Idle IMAP session went stale, reconnecting")
+        return connector.reconnect()
+
+    @contextmanager
+    def acquire(self):
+        """
+        Borrow a healthy session for the duration of a with-block
+
+        Yields:
+            GmailConnector: Session owned exclusively by the caller
+        """
+        if self._closed:
+            raise ConnectionError("Connection pool is closed")
+
+        connector = None
+
+        with self._lock:
+            if self._available.empty() and len(self._connectors) < self.size:
+                connector = self._open_connector()
+                if connector is None:
+                    raise ConnectionError("Failed to open pooled Gmail connection")
+                self._connectors.append(connector)
+
+        if connector is None:
+            try:
+                connector = self._available.get(timeout=self.acquire_timeout)
+            except queue.Empty:
+                raise ConnectionError("Timed out waiting for a pooled Gmail connection")
+
+        try:
+            if not self._ensure_healthy(connector):
+                raise ConnectionError("Pooled Gmail connection could not be restored")
+            yield connector
+        finally:
+            self._available.put(connector)
+
+    def fetch_email(self, email_id: str, by_uid: bool = False) -> Optional[Message]:
+        """
+        Fetch a specific email on a pooled session, reconnecting on failure
+
+        Args:
+            email_id: Email UID
+            by_uid: Treat the id as a UID (UID FETCH) instead of a sequence number
+
+        Returns:
+            EmailMessage object or None if failed
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.acquire() as connector:
+                    try:
+                        email_message = connector.fetch_email(email_id, by_uid=by_uid, raise_connection_errors=True)
+                    except (imaplib.IMAP4.abort, OSError) as e:
+                        # Only a broken session is worth a fresh one and another attempt
+                        logger.warning(f"Connection lost fetching email {email_id}: {str(e)}")
+                        if attempt < self.max_retries:
+                            self.stats['reconnects'] += 1
+                            connector.reconnect()
+                        continue
+
+                    self.stats['fetches'] += 1
+                    if email_message is not None:
+                        return email_message
+
+                    # NO or empty response: the message is not there, retrying will not help
+                    break
+
+            except ConnectionError as e:
+                logger.error(f"Connection pool error fetching email {email_id}: {str(e)}")
+
+        self.stats['fetch_errors'] += 1
+        return None
+
+    def fetch_emails_bulk(
+        self,
+        email_ids: Iterable[str],
+        chunk: int = 200,
+        by_uid: bool = False
+    ) -> Iterator[Tuple[str, Message]]:
+        """
+        Bulk fetch on a single pooled session
+
+        Args:
+            email_ids: Email UIDs to fetch
+            chunk: Maximum number of messages per FETCH command
+            by_uid: Treat ids as UIDs (UID FETCH) instead of sequence numbers
+
+        Yields:
+            Tuple[str, Message]: (email_id, parsed message)
+        """
+        with self.acquire() as connector:
+            for email_id, email_message in connector.fetch_emails_bulk(email_ids, chunk=chunk, by_uid=by_uid):
+                self.stats['fetches'] += 1
+                yield email_id, email_message
+
+    def fetch_headers_bulk(
+        self,
+        email_ids: Iterable[str],
+        chunk: int = 200,
+        by_uid: bool = False,
+        preview_bytes: int = 0
+    ) -> Iterator[Tuple[str, Message, Dict[str, Any]]]:
+        """
+        Header-only bulk fetch on a single pooled session
+
+        Args:
+            email_ids: Email UIDs to fetch
+            chunk: Maximum number of messages per FETCH command
+            by_uid: Treat ids as UIDs (UID FETCH) instead of sequence numbers
+            preview_bytes: Also fetch the first N bytes of the body text (0 disables)
+
+        Yields:
+            Tuple[str, Message, Dict]: (email_id, header-only message, info)
+        """
+        with self.acquire() as connector:
+            for item in connector.fetch_headers_bulk(
+                email_ids, chunk=chunk, by_uid=by_uid, preview_bytes=preview_bytes
+            ):
+                yield item
+
+    def close_all(self):
+        """
+        Log out every pooled session
+        """
+        self._closed = True
+
+        with self._lock:
+            for connector in self._connectors:
+                connector.disconnect()
+            self._connectors = []
+
+        while not self._available.empty():
+            try:
+                self._available.get_nowait()
+            except queue.Empty:
+                break
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get pool usage statistics"""
+        stats = self.stats.copy()
+        stats['pool_size'] = self.size
+        stats['open_connections'] = len(self._connectors)
+        return stats
+
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close_all()
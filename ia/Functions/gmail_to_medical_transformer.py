@@ -6,12 +6,28 @@ Convierte emails procesados de Gmail en casos médicos para las vistas del front
 import os
 import json
 import re
+import hashlib
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 import logging
 
+from analysis_context import AnalysisContext
+from email_record_index import EmailRecordIndex
+
 logger = logging.getLogger(__name__)
 
+# Cambiar cuando cambie la transformación para que el modo incremental regenere todos los casos
+MANIFEST_VERSION = "1"
+
+# Campos de un registro (rutas con puntos) que usan la detección y la transformación
+# en casos médicos; el resto (encabezados completos, texto de adjuntos, análisis) se descarta al leer
+CASE_FIELDS = (
+    'metadata.unique_id', 'metadata.subject', 'metadata.from', 'metadata.date',
+    'content.text', 'attachments',
+    'document_identification', 'communication_metadata', 'attachment_information',
+    'content_analysis.subject_information', 'content_analysis.body_content.plain_text_content'
+)
+
 class GmailToMedicalTransformer:
     """
     Transforma datos de Gmail procesados en casos médicos para el frontend
@@ -28,6 +44,14 @@ class GmailToMedicalTransformer:
         self.json_path = os.path.join(base_path, "Json")
         self.professional_path = os.path.join(base_path, "Professional_Email_Records")
 
+        # Manifiesto del modo incremental: mtime, tamaño y caso por archivo de registro
+        self.manifest_path = os.path.join(base_path, "cache", "medical_cases_manifest.json")
+        self.incremental_stats = {}
+
+        # Índice lateral con el resultado de la detección médica por registro (se abre al usarlo)
+        self.record_index_path = os.path.join(base_path, "cache", "email_record_index.db")
+        self._record_index = None
+
         # Patrones para identificar emails médicos - Expandido
         self.medical_keywords = [
             # Términos básicos médicos
@@ -71,6 +95,9 @@ class GmailToMedicalTransformer:
             'laboratories', 'imágenes', 'images', 'estudios', 'studies'
         ]
 
+        # Palabras clave médicas necesarias para considerar un email como médico
+        self.min_medical_keywords = 2
+
         # Especialidades médicas
         self.medical_specialties = {
             'cardiología': ['corazón', 'cardíaco', 'infarto', 'arritmia', 'hipertensión', 'ecg'],
@@ -95,34 +122,8 @@ class GmailToMedicalTransformer:
         Returns:
             List[Dict]: Lista de emails procesados
         """
-        processed_emails = []
-
         try:
-            # Buscar en carpeta JSON tradicional
-            if os.path.exists(self.json_path):
-                for email_folder in os.listdir(self.json_path):
-                    email_folder_path = os.path.join(self.json_path, email_folder)
-                    if os.path.isdir(email_folder_path):
-                        email_data_file = os.path.join(email_folder_path, "email_data.json")
-                        if os.path.exists(email_data_file):
-                            with open(email_data_file, 'r', encoding='utf-8') as f:
-                                email_data = json.load(f)
-                                email_data['source_type'] = 'traditional'
-                                email_data['source_path'] = email_folder_path
-                                processed_emails.append(email_data)
-
-            # Buscar en carpeta Professional_Email_Records
-            if os.path.exists(self.professional_path):
-                for email_folder in os.listdir(self.professional_path):
-                    email_folder_path = os.path.join(self.professional_path, email_folder)
-                    if os.path.isdir(email_folder_path):
-                        comprehensive_file = os.path.join(email_folder_path, "comprehensive_email_record.json")
-                        if os.path.exists(comprehensive_file):
-                            with open(comprehensive_file, 'r', encoding='utf-8') as f:
-                                email_data = json.load(f)
-                                email_data['source_type'] = 'professional'
-                                email_data['source_path'] = email_folder_path
-                                processed_emails.append(email_data)
+            processed_emails = list(self.iter_processed_emails())
 
             logger.info(f"Loaded {len(processed_emails)} processed emails")
             return processed_emails
@@ -131,6 +132,166 @@ class GmailToMedicalTransformer:
             logger.error(f"Error loading processed emails: {str(e)}")
             return []
 
+    def iter_processed_emails(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        medical_only: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los emails procesados de uno en uno, sin cargarlos todos en memoria
+
+        Cada registro se lee, se reduce a los campos pedidos y se entrega antes
+        de leer el siguiente, así que la memoria no crece con el archivo. Con
+        medical_only, el índice lateral recuerda qué registros no son médicos y
+        esos archivos no se vuelven a abrir mientras no cambien.
+
+        Args:
+            fields: Rutas con puntos de los campos a conservar, p. ej. CASE_FIELDS
+                    (None conserva el registro completo)
+            medical_only: Entrega solo los emails que pasan is_medical_email
+
+        Yields:
+            Dict: Email procesado (con source_type y source_path)
+        """
+        fields = None if fields is None else tuple(fields)
+        if medical_only and fields is not None:
+            # La detección y el índice necesitan asunto, cuerpo y encabezados
+            fields += tuple(field for field in CASE_FIELDS if field not in fields)
+
+        index = self.record_index if medical_only else None
+        screening_key = self._get_screening_key() if medical_only else None
+        stats = {'records': 0, 'skipped_by_index': 0, 'screened': 0}
+
+        try:
+            for record_file, source_type, email_folder_path in self._list_record_files():
+                stats['records'] += 1
+
+                try:
+                    is_medical = None
+                    if index is not None:
+                        file_stat = os.stat(record_file)
+                        is_medical = index.get_screening(
+                            record_file, file_stat.st_mtime_ns, file_stat.st_size, screening_key
+                        )
+                        if is_medical is False:
+                            stats['skipped_by_index'] += 1
+                            continue
+
+                    email_data = self._load_record(record_file, source_type, email_folder_path, fields)
+
+                    if index is not None and is_medical is None:
+                        stats['screened'] += 1
+                        is_medical = self.is_medical_email(email_data)
+                        index.update(
+                            record_file, source_type, file_stat.st_mtime_ns, file_stat.st_size,
+                            self._get_record_header(email_data), is_medical, screening_key
+                        )
+                        if not is_medical:
+                            continue
+
+                except Exception as e:
+                    logger.error(f"Error loading record {record_file}: {str(e)}")
+                    continue
+
+                yield email_data
+
+        finally:
+            if index is not None:
+                index.flush()
+                logger.info(
+                    f"Scanned {stats['records']} records: {stats['skipped_by_index']} skipped by index, "
+                    f"{stats['screened']} screened"
+                )
+
+    @property
+    def record_index(self) -> EmailRecordIndex:
+        """Índice lateral de registros, abierto en el primer uso"""
+        if self._record_index is None:
+            self._record_index = EmailRecordIndex(self.record_index_path)
+        return self._record_index
+
+    def _get_screening_key(self) -> str:
+        """Clave de las palabras clave médicas y el umbral; si cambian, el índice vuelve a evaluar todo"""
+        basis = json.dumps([self.medical_keywords, self.min_medical_keywords], ensure_ascii=False)
+        return hashlib.sha256(basis.encode('utf-8')).hexdigest()[:16]
+
+    def _get_record_header(self, email_data: Dict[str, Any]) -> Dict[str, str]:
+        """unique_id, asunto y fecha de un registro para el índice lateral"""
+        if email_data.get('source_type') == 'professional':
+            return {
+                'unique_id': email_data.get('document_identification', {}).get('unique_identifier', ''),
+                'subject': email_data.get('content_analysis', {}).get('subject_information', {}).get('subject_line', ''),
+                'sent_at': email_data.get('communication_metadata', {}).get('temporal_information', {}).get('sent_datetime', '')
+            }
+
+        metadata = email_data.get('metadata', {})
+        return {
+            'unique_id': metadata.get('unique_id', ''),
+            'subject': metadata.get('subject', ''),
+            'sent_at': metadata.get('date', '')
+        }
+
+    def _list_record_files(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Lista los archivos de registro de ambas carpetas sin leerlos
+
+        Yields:
+            tuple: (archivo de registro, source_type, carpeta del email)
+        """
+        # Carpeta JSON tradicional y carpeta Professional_Email_Records
+        for root_path, file_name, source_type in (
+            (self.json_path, "email_data.json", 'traditional'),
+            (self.professional_path, "comprehensive_email_record.json", 'professional')
+        ):
+            if not os.path.exists(root_path):
+                continue
+
+            for email_folder in os.listdir(root_path):
+                email_folder_path = os.path.join(root_path, email_folder)
+                if os.path.isdir(email_folder_path):
+                    record_file = os.path.join(email_folder_path, file_name)
+                    if os.path.exists(record_file):
+                        yield record_file, source_type, email_folder_path
+
+    def _load_record(
+        self,
+        record_file: str,
+        source_type: str,
+        email_folder_path: str,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """Lee un archivo de registro, lo reduce a los campos pedidos y le agrega su origen"""
+        with open(record_file, 'r', encoding='utf-8') as f:
+            email_data = json.load(f)
+
+        if fields is not None:
+            email_data = self._project_fields(email_data, fields)
+
+        email_data['source_type'] = source_type
+        email_data['source_path'] = email_folder_path
+        return email_data
+
+    @staticmethod
+    def _project_fields(record: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+        """Copia solo las rutas con puntos pedidas; lo demás se libera al salir"""
+        projected = {}
+
+        for field in fields:
+            keys = field.split('.')
+            source = record
+            target = projected
+
+            for depth, key in enumerate(keys):
+                if not isinstance(source, dict) or key not in source:
+                    break
+                if depth == len(keys) - 1:
+                    target[key] = source[key]
+                else:
+                    source = source[key]
+                    target = target.setdefault(key, {})
+
+        return projected
+
     def is_medical_email(self, email_data: Dict[str, Any]) -> bool:
         """
         Determina si un email es relacionado con medicina
@@ -166,18 +327,19 @@ class GmailToMedicalTransformer:
                     medical_score += 1
 
             # Considerar médico si tiene al menos 2 palabras clave médicas
-            return medical_score >= 2
+            return medical_score >= self.min_medical_keywords
 
         except Exception as e:
             logger.warning(f"Error checking if email is medical: {str(e)}")
             return False
 
-    def extract_patient_info(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
+    def extract_patient_info(self, email_data: Dict[str, Any], context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """
         Extrae información del paciente del email
 
         Args:
             email_data: Datos del email
+            context: Contexto de análisis compartido del email (memoiza las búsquedas)
 
         Returns:
             Dict: Información del paciente
@@ -194,12 +356,12 @@ class GmailToMedicalTransformer:
 
             # Patrones para extraer información
             patient_info = {
-                'name': self._extract_patient_name(text_content),
-                'age': self._extract_age(text_content),
-                'gender': self._extract_gender(text_content),
-                'id': self._extract_patient_id(text_content),
-                'phone': self._extract_phone(text_content),
-                'diagnosis': self._extract_diagnosis(text_content)
+                'name': self._extract_patient_name(text_content, context),
+                'age': self._extract_age(text_content, context),
+                'gender': self._extract_gender(text_content, context),
+                'id': self._extract_patient_id(text_content, context),
+                'phone': self._extract_phone(text_content, context),
+                'diagnosis': self._extract_diagnosis(text_content, context)
             }
 
             return patient_info
@@ -215,7 +377,17 @@ class GmailToMedicalTransformer:
                 'diagnosis': 'Diagnóstico pendiente'
             }
 
-    def _extract_patient_name(self, text: str) -> str:
+    def _search(self, pattern: str, text: str, context: Optional[AnalysisContext] = None):
+        """re.search sin distinguir mayúsculas, memoizado en el contexto si existe"""
+        if context is not None:
+            return context.search(pattern, text)
+        return re.search(pattern, text, re.IGNORECASE)
+
+    def _lower(self, text: str, context: Optional[AnalysisContext] = None) -> str:
+        """Texto en minúsculas, calculado una sola vez por contexto"""
+        return context.lowercase(text) if context is not None else text.lower()
+
+    def _extract_patient_name(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extrae el nombre del paciente del texto"""
         patterns = [
             r'paciente:?\s*([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+)',
@@ -224,13 +396,13 @@ class GmailToMedicalTransformer:
         ]
 
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = self._search(pattern, text, context)
             if match:
                 return match.group(1).strip()
 
         return f"Paciente {datetime.now().strftime('%Y%m%d%H%M')}"
 
-    def _extract_age(self, text: str) -> int:
+    def _extract_age(self, text: str, context: Optional[AnalysisContext] = None) -> int:
         """Extrae la edad del paciente"""
         patterns = [
             r'(\d{1,3})\s*años?',
@@ -239,7 +411,7 @@ class GmailToMedicalTransformer:
         ]
 
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = self._search(pattern, text, context)
             if match:
                 age = int(match.group(1))
                 if 0 <= age <= 120:
@@ -247,15 +419,15 @@ class GmailToMedicalTransformer:
 
         return 45  # Edad por defecto
 
-    def _extract_gender(self, text: str) -> str:
+    def _extract_gender(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extrae el género del paciente"""
-        if re.search(r'\b(femenino|mujer|femenina|female)\b', text, re.IGNORECASE):
+        if self._search(r'\b(femenino|mujer|femenina|female)\b', text, context):
             return 'Femenino'
-        elif re.search(r'\b(masculino|hombre|masculino|male)\b', text, re.IGNORECASE):
+        elif self._search(r'\b(masculino|hombre|masculino|male)\b', text, context):
             return 'Masculino'
         return 'No especificado'
 
-    def _extract_patient_id(self, text: str) -> str:
+    def _extract_patient_id(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extrae el ID del paciente"""
         patterns = [
             r'id:?\s*([A-Z0-9]{6,})',
@@ -264,13 +436,13 @@ class GmailToMedicalTransformer:
         ]
 
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = self._search(pattern, text, context)
             if match:
                 return match.group(1)
 
         return f"P{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-    def _extract_phone(self, text: str) -> str:
+    def _extract_phone(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extrae el teléfono del paciente"""
         patterns = [
             r'(\+57\s*[0-9]{3}\s*[0-9]{3}\s*[0-9]{4})',
@@ -279,13 +451,13 @@ class GmailToMedicalTransformer:
         ]
 
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = self._search(pattern, text, context)
             if match:
                 return match.group(1).strip()
 
         return '+57 300 000 0000'
 
-    def _extract_diagnosis(self, text: str) -> str:
+    def _extract_diagnosis(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extrae el diagnóstico del texto"""
         patterns = [
             r'diagnóstico:?\s*([^.\n]{10,100})',
@@ -294,15 +466,15 @@ class GmailToMedicalTransformer:
         ]
 
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = self._search(pattern, text, context)
             if match:
                 return match.group(1).strip()
 
         return 'Diagnóstico por determinar'
 
-    def determine_specialty(self, text: str) -> str:
+    def determine_specialty(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Determina la especialidad médica basada en el contenido"""
-        text_lower = text.lower()
+        text_lower = self._lower(text, context)
 
         for specialty, keywords in self.medical_specialties.items():
             score = sum(1 for keyword in keywords if keyword in text_lower)
@@ -311,9 +483,9 @@ class GmailToMedicalTransformer:
 
         return 'Medicina General'
 
-    def determine_priority(self, text: str) -> str:
+    def determine_priority(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Determina la prioridad del caso"""
-        text_lower = text.lower()
+        text_lower = self._lower(text, context)
 
         for priority, keywords in self.priority_keywords.items():
             if any(keyword in text_lower for keyword in keywords):
@@ -321,12 +493,13 @@ class GmailToMedicalTransformer:
 
         return 'Media'  # Prioridad por defecto
 
-    def transform_email_to_medical_case(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
+    def transform_email_to_medical_case(self, email_data: Dict[str, Any], context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """
         Transforma un email en un caso médico para el frontend
 
         Args:
             email_data: Datos del email procesado
+            context: Contexto de análisis compartido del email (opcional)
 
         Returns:
             Dict: Caso médico formateado para el frontend
@@ -357,29 +530,15 @@ class GmailToMedicalTransformer:
                 text_content = content.get('text', '')
 
             # Extraer información del paciente
-            patient_info = self.extract_patient_info(email_data)
+            patient_info = self.extract_patient_info(email_data, context)
 
             # Determinar especialidad y prioridad
             full_text = f"{subject} {text_content}"
-            specialty = self.determine_specialty(full_text)
-            priority = self.determine_priority(full_text)
+            specialty = self.determine_specialty(full_text, context)
+            priority = self.determine_priority(full_text, context)
 
             # Calcular tiempo transcurrido
-            try:
-                if date_info:
-                    email_date = datetime.fromisoformat(date_info.replace('Z', '+00:00'))
-                    time_elapsed = datetime.now() - email_date.replace(tzinfo=None)
-
-                    if time_elapsed.days > 0:
-                        time_elapsed_str = f"{time_elapsed.days}d {time_elapsed.seconds//3600}h"
-                    else:
-                        hours = time_elapsed.seconds // 3600
-                        minutes = (time_elapsed.seconds % 3600) // 60
-                        time_elapsed_str = f"{hours}h {minutes}min"
-                else:
-                    time_elapsed_str = "Tiempo desconocido"
-            except:
-                time_elapsed_str = "Tiempo desconocido"
+            time_elapsed_str = self._format_time_elapsed(date_info)
 
             # Crear caso médico
             medical_case = {
@@ -411,7 +570,7 @@ class GmailToMedicalTransformer:
                     'phone': patient_info['phone'],
                     'email': sender_info.get('email', '')
                 },
-                'urgencyScore': self._calculate_urgency_score(priority, full_text),
+                'urgencyScore': self._calculate_urgency_score(priority, full_text, context),
                 'aiConfidence': 85,  # Confianza base del AI
                 'estimatedCost': '$1,500,000',
                 'emailSource': {
@@ -429,6 +588,24 @@ class GmailToMedicalTransformer:
             logger.error(f"Error transforming email to medical case: {str(e)}")
             return self._create_fallback_case(email_data)
 
+    def _format_time_elapsed(self, date_info: str) -> str:
+        """Tiempo transcurrido desde la fecha del email, p. ej. '2d 3h' o '5h 12min'"""
+        try:
+            if date_info:
+                email_date = datetime.fromisoformat(date_info.replace('Z', '+00:00'))
+                time_elapsed = datetime.now() - email_date.replace(tzinfo=None)
+
+                if time_elapsed.days > 0:
+                    return f"{time_elapsed.days}d {time_elapsed.seconds//3600}h"
+
+                hours = time_elapsed.seconds // 3600
+                minutes = (time_elapsed.seconds % 3600) // 60
+                return f"{hours}h {minutes}min"
+
+            return "Tiempo desconocido"
+        except:
+            return "Tiempo desconocido"
+
     def _get_attachments_info(self, email_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extrae información de attachments"""
         attachments = []
@@ -463,15 +640,16 @@ class GmailToMedicalTransformer:
 
         return attachments
 
-    def _calculate_urgency_score(self, priority: str, text: str) -> float:
+    def _calculate_urgency_score(self, priority: str, text: str, context: Optional[AnalysisContext] = None) -> float:
         """Calcula el score de urgencia"""
         base_scores = {'Alta': 8.0, 'Media': 5.0, 'Baja': 2.0}
         score = base_scores.get(priority, 5.0)
 
         # Ajustar basado en palabras clave críticas
+        text_lower = self._lower(text, context)
         critical_keywords = ['emergencia', 'crítico', 'grave', 'urgente', 'inmediato']
         for keyword in critical_keywords:
-            if keyword in text.lower():
+            if keyword in text_lower:
                 score += 1.0
 
         return min(10.0, score)
@@ -500,24 +678,26 @@ class GmailToMedicalTransformer:
             }
         }
 
-    def transform_all_medical_emails(self) -> List[Dict[str, Any]]:
+    def transform_all_medical_emails(self, incremental: bool = False) -> List[Dict[str, Any]]:
         """
         Transforma todos los emails médicos en casos para el frontend
 
+        Args:
+            incremental: Solo lee y transforma registros nuevos o modificados
+                         desde la última ejecución (ver _transform_incremental)
+
         Returns:
             List[Dict]: Lista de casos médicos
         """
-        try:
-            # Cargar emails procesados
-            all_emails = self.load_processed_emails()
-            logger.info(f"Processing {len(all_emails)} emails for medical content")
+        if incremental:
+            return self._transform_incremental()
 
-            # Filtrar emails médicos y transformar
+        try:
+            # Recorrer los emails médicos de uno en uno y transformar
             medical_cases = []
-            for email_data in all_emails:
-                if self.is_medical_email(email_data):
-                    medical_case = self.transform_email_to_medical_case(email_data)
-                    medical_cases.append(medical_case)
+            for email_data in self.iter_processed_emails(fields=CASE_FIELDS, medical_only=True):
+                medical_case = self.transform_email_to_medical_case(email_data)
+                medical_cases.append(medical_case)
 
             logger.info(f"Transformed {len(medical_cases)} medical emails into cases")
             return medical_cases
@@ -526,6 +706,111 @@ class GmailToMedicalTransformer:
             logger.error(f"Error transforming medical emails: {str(e)}")
             return []
 
+    def _transform_incremental(self) -> List[Dict[str, Any]]:
+        """
+        Transforma solo los registros nuevos o modificados y los une a los casos previos
+
+        El manifiesto guarda, por archivo de registro, su mtime y tamaño junto
+        con el caso generado (o None si el email no es médico). Los registros
+        sin cambios no se leen ni se transforman: se reutiliza su caso y solo
+        se recalcula timeElapsed. Los registros eliminados salen del manifiesto.
+
+        Returns:
+            List[Dict]: Lista de casos médicos, en el mismo orden que el modo completo
+        """
+        try:
+            previous = self._load_manifest()
+            entries = {}
+            medical_cases = []
+            stats = {'records': 0, 'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0, 'errors': 0}
+
+            for record_file, source_type, email_folder_path in self._list_record_files():
+                stats['records'] += 1
+
+                try:
+                    file_stat = os.stat(record_file)
+                    entry = previous.get(record_file)
+
+                    if entry and entry['mtime_ns'] == file_stat.st_mtime_ns and entry['size'] == file_stat.st_size:
+                        stats['unchanged'] += 1
+                        medical_case = entry['case']
+                        if medical_case is not None:
+                            medical_case['timeElapsed'] = self._format_time_elapsed(medical_case.get('receivedAt', ''))
+                    else:
+                        stats['changed' if entry else 'new'] += 1
+                        email_data = self._load_record(record_file, source_type, email_folder_path, CASE_FIELDS)
+                        medical_case = None
+                        if self.is_medical_email(email_data):
+                            medical_case = self.transform_email_to_medical_case(email_data)
+
+                    entries[record_file] = {
+                        'mtime_ns': file_stat.st_mtime_ns,
+                        'size': file_stat.st_size,
+                        'case': medical_case
+                    }
+
+                    if medical_case is not None:
+                        medical_cases.append(medical_case)
+
+                except Exception as e:
+                    # Sin entrada en el manifiesto: se reintenta en la próxima ejecución
+                    logger.error(f"Error transforming record {record_file}: {str(e)}")
+                    stats['errors'] += 1
+
+            stats['removed'] = len(set(previous) - set(entries))
+            self._save_manifest(entries)
+            self.incremental_stats = stats
+
+            logger.info(
+                f"Incremental transform: {stats['new']} new, {stats['changed']} changed, "
+                f"{stats['unchanged']} unchanged, {stats['removed']} removed -> {len(medical_cases)} cases"
+            )
+            return medical_cases
+
+        except Exception as e:
+            logger.error(f"Error in incremental medical transform: {str(e)}")
+            return []
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Carga las entradas del manifiesto incremental ({} si no existe, es de otra versión o de otra clave de detección)"""
+        try:
+            if not os.path.exists(self.manifest_path):
+                return {}
+
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            if manifest.get('version') != MANIFEST_VERSION:
+                logger.info("Medical cases manifest version changed, rebuilding all cases")
+                return {}
+
+            # Los casos guardados dependen de las palabras clave y el umbral con que se evaluaron
+            if manifest.get('screening_key') != self._get_screening_key():
+                logger.info("Medical keywords or threshold changed, rebuilding all cases")
+                return {}
+
+            return manifest.get('records', {})
+
+        except Exception as e:
+            logger.warning(f"Discarding unreadable medical cases manifest: {str(e)}")
+            return {}
+
+    def _save_manifest(self, entries: Dict[str, Any]):
+        """Guarda el manifiesto incremental de forma atómica"""
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'version': MANIFEST_VERSION, 'screening_key': self._get_screening_key(), 'records': entries},
+                    f, ensure_ascii=False
+                )
+            os.replace(tmp_path, self.manifest_path)
+
+        except Exception as e:
+            logger.warning(f"Could not save medical cases manifest: {str(e)}")
+
     def save_medical_cases_json(self, medical_cases: List[Dict[str, Any]], output_path: str = None) -> str:
         """
         Guarda los casos médicos en un archivo JSON para el frontend
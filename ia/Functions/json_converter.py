@@ -5,6 +5,7 @@ Converts all extracted content to structured JSON format
 
 import json
 import os
+import tempfile
 from typing import Dict, List, Any, Optional
 import datetime
 import logging
@@ -226,38 +227,41 @@ class JSONConverter:
         except Exception as e:
             logger.error(f"Error saving statistics JSON: {str(e)}")
     
-    def create_summary_json(self, processed_emails: List[Dict[str, Any]]) -> str:
+    def create_summary_json(self, processed_emails, summary_path: Optional[str] = None) -> str:
         """
         Create summary JSON for all processed emails
         
         Args:
-            processed_emails: List of processed email summaries
+            processed_emails: Iterable of processed email summaries (a list or a
+                              generator; it is consumed once and not kept in memory)
+            summary_path: Output path (defaults to Json/processing_summary.json)
             
         Returns:
             str: Path to summary JSON file
         """
+        accumulator = ProcessingSummaryAccumulator()
         try:
-            summary_data = {
-                "processing_summary": {
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "total_emails_processed": len(processed_emails),
-                    "successful_extractions": sum(1 for email in processed_emails if email.get('success', False)),
-                    "failed_extractions": sum(1 for email in processed_emails if not email.get('success', False))
-                },
-                "statistics": {
-                    "total_attachments": sum(email.get('attachment_count', 0) for email in processed_emails),
-                    "total_size_bytes": sum(email.get('total_size_bytes', 0) for email in processed_emails),
-                    "date_range": self.get_date_range(processed_emails),
-                    "sender_distribution": self.get_sender_distribution(processed_emails),
-                    "attachment_types": self.get_attachment_type_distribution(processed_emails)
-                },
-                "emails": processed_emails
-            }
-            
-            summary_path = os.path.join(self.json_path, "processing_summary.json")
+            for processed_email in processed_emails:
+                accumulator.add(processed_email)
+            return self.write_summary_json(accumulator, summary_path)
+        finally:
+            accumulator.close()
+    
+    def write_summary_json(self, accumulator: 'ProcessingSummaryAccumulator',
+                           summary_path: Optional[str] = None) -> str:
+        """
+        Write the summary JSON from incrementally accumulated results
+        
+        Args:
+            accumulator: Accumulator fed with each result as it completed
+            summary_path: Output path (defaults to Json/processing_summary.json)
             
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(summary_data, f, indent=2, ensure_ascii=False, default=str)
+        Returns:
+            str: Path to summary JSON file
+        """
+        try:
+            summary_path = summary_path or os.path.join(self.json_path, "processing_summary.json")
+            accumulator.write(summary_path)
             
             logger.info(f"Created processing summary: {summary_path}")
             return summary_path
@@ -266,42 +270,6 @@ class JSONConverter:
             logger.error(f"Error creating summary JSON: {str(e)}")
             return ""
     
-    def get_date_range(self, processed_emails: List[Dict[str, Any]]) -> Dict[str, str]:
-        """Get date range of processed emails"""
-        dates = []
-        for email in processed_emails:
-            if email.get('date'):
-                try:
-                    if isinstance(email['date'], str):
-                        date_obj = datetime.datetime.fromisoformat(email['date'].replace('Z', '+00:00'))
-                        dates.append(date_obj)
-                except:
-                    continue
-        
-        if dates:
-            return {
-                "earliest": min(dates).isoformat(),
-                "latest": max(dates).isoformat(),
-                "span_days": (max(dates) - min(dates)).days
-            }
-        return {"earliest": None, "latest": None, "span_days": 0}
-    
-    def get_sender_distribution(self, processed_emails: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Get distribution of email senders"""
-        senders = {}
-        for email in processed_emails:
-            sender = email.get('sender', 'Unknown')
-            senders[sender] = senders.get(sender, 0) + 1
-        return dict(sorted(senders.items(), key=lambda x: x[1], reverse=True)[:10])  # Top 10
-    
-    def get_attachment_type_distribution(self, processed_emails: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Get distribution of attachment types"""
-        types = {}
-        for email in processed_emails:
-            for att_type in email.get('attachment_types', []):
-                types[att_type] = types.get(att_type, 0) + 1
-        return dict(sorted(types.items(), key=lambda x: x[1], reverse=True))
-    
     def validate_json_schema(self, email_data: Dict[str, Any]) -> List[str]:
         """
         Validate JSON schema for completeness
@@ -713,3 +681,114 @@ class JSONConverter:
             logger.error(f"Error saving professional email record: {str(e)}")
             # Fallback to regular JSON save
             return self.save_email_json(unique_id, professional_record)
+
+
+class ProcessingSummaryAccumulator:
+    """
+    Running aggregates for the processing summary
+
+    Results are folded in one at a time and spooled to a temporary file,
+    so memory stays flat regardless of how many emails a run covers.
+    """
+    
+    def __init__(self):
+        self.total_emails = 0
+        self.successful = 0
+        self.failed = 0
+        self.total_attachments = 0
+        self.total_size_bytes = 0
+        self.earliest_date = None
+        self.latest_date = None
+        self.senders = {}
+        self.attachment_types = {}
+        self._spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+    
+    def add(self, result: Dict[str, Any]):
+        """
+        Fold one processing result into the aggregates
+        
+        Args:
+            result: Per-email processing result
+        """
+        self.total_emails += 1
+        if result.get('success', False):
+            self.successful += 1
+        else:
+            self.failed += 1
+        
+        self.total_attachments += result.get('attachment_count', 0)
+        self.total_size_bytes += result.get('total_size_bytes', 0)
+        
+        if isinstance(result.get('date'), str):
+            try:
+                date_obj = datetime.datetime.fromisoformat(result['date'].replace('Z', '+00:00'))
+                if self.earliest_date is None or date_obj < self.earliest_date:
+                    self.earliest_date = date_obj
+                if self.latest_date is None or date_obj > self.latest_date:
+                    self.latest_date = date_obj
+            except (ValueError, TypeError):
+                pass
+        
+        sender = result.get('sender', 'Unknown')
+        self.senders[sender] = self.senders.get(sender, 0) + 1
+        
+        for att_type in result.get('attachment_types', []):
+            self.attachment_types[att_type] = self.attachment_types.get(att_type, 0) + 1
+        
+        self._spool.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Get the aggregated summary (without the per-email list)"""
+        if self.earliest_date and self.latest_date:
+            date_range = {
+                "earliest": self.earliest_date.isoformat(),
+                "latest": self.latest_date.isoformat(),
+                "span_days": (self.latest_date - self.earliest_date).days
+            }
+        else:
+            date_range = {"earliest": None, "latest": None, "span_days": 0}
+        
+        return {
+            "processing_summary": {
+                "timestamp": datetime.datetime.now().isoformat(),
+                "total_emails_processed": self.total_emails,
+                "successful_extractions": self.successful,
+                "failed_extractions": self.failed
+            },
+            "statistics": {
+                "total_attachments": self.total_attachments,
+                "total_size_bytes": self.total_size_bytes,
+                "date_range": date_range,
+                "sender_distribution": dict(sorted(self.senders.items(), key=lambda x: x[1], reverse=True)[:10]),
+                "attachment_types": dict(sorted(self.attachment_types.items(), key=lambda x: x[1], reverse=True))
+            }
+        }
+    
+    def write(self, summary_path: str):
+        """
+        Write the summary, streaming the spooled per-email results into it
+        
+        Args:
+            summary_path: Output path
+        """
+        summary = self.get_summary()
+        self._spool.flush()
+        self._spool.seek(0)
+        
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write("{\n")
+            for key, value in summary.items():
+                body = json.dumps(value, indent=2, ensure_ascii=False, default=str).replace("\n", "\n  ")
+                f.write(f'  "{key}": {body},\n')
+            
+            f.write('  "emails": [')
+            first = True
+            for line in self._spool:
+                email_json = json.dumps(json.loads(line), indent=2, ensure_ascii=False).replace("\n", "\n    ")
+                f.write(("\n    " if first else ",\n    ") + email_json)
+                first = False
+            f.write("\n  ]\n}\n" if not first else "]\n}\n")
+    
+    def close(self):
+        """Discard the spool file"""
+        self._spool.close()
@@ -0,0 +1,142 @@
+"""
+Keyword Automaton Module
+Aho-Corasick matcher that finds keywords of several categories in one pass
+"""
+
+import logging
+from collections import deque
+from typing import Dict, List, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+class KeywordAutomaton:
+    """
+    Multi-category substring matcher
+
+    All keywords of all categories are compiled once into a single
+    Aho-Corasick automaton; scanning a text is one linear pass no matter how
+    many keywords there are. Matching is case-insensitive substring matching
+    (the same semantics as ``keyword.lower() in text.lower()``). Uses the
+    pyahocorasick C extension when installed and a pure-Python automaton otherwise.
+    """
+
+    def __init__(self, keyword_sets: Dict[str, List[str]]):
+        """
+        Build the automaton
+
+        Args:
+            keyword_sets: Keywords per category, e.g. {'urgency': ['urgente', ...]}
+        """
+        self.keyword_sets = {category: list(keywords) for category, keywords in keyword_sets.items()}
+
+        # Lowercased keyword -> [(category, index in its category list)]
+        self._payloads = {}
+        for category, keywords in self.keyword_sets.items():
+            for index, keyword in enumerate(keywords):
+                lowered = keyword.lower()
+                if lowered:
+                    self._payloads.setdefault(lowered, []).append((category, index))
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for lowered, payload in self._payloads.items():
+                self._automaton.add_word(lowered, tuple(payload))
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build_automaton()
+
+    def _build_automaton(self):
+        """Build goto, failure and output tables (pure-Python fallback)"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        # Trie of all keywords
+        for lowered, payload in self._payloads.items():
+            state = 0
+            for char in lowered:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = tuple(payload)
+
+        # Breadth-first failure links; outputs inherit those of their failure state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+                if fail_state == next_state:
+                    fail_state = 0
+
+                self._fail[next_state] = fail_state
+                self._output[next_state] = self._output[next_state] + self._output[fail_state]
+
+    def scan(self, text: str) -> Set[Tuple[str, int]]:
+        """
+        Find every keyword occurring in a text
+
+        Args:
+            text: Text to scan (lowercased here if it is not already)
+
+        Returns:
+            Set[Tuple[str, int]]: (category, keyword index) pairs found
+        """
+        hits = set()
+        if not text:
+            return hits
+
+        text = text.lower()
+
+        if self._automaton is not None:
+            for _, payload in self._automaton.iter(text):
+                hits.update(payload)
+            return hits
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+
+        return hits
+
+    def find_all(self, text: str) -> Dict[str, List[str]]:
+        """
+        Keywords found per category
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Dict[str, List[str]]: Found keywords per category, in the order of
+            the category's keyword list
+        """
+        hits = self.scan(text)
+
+        return {
+            category: [keywords[index] for index in range(len(keywords)) if (category, index) in hits]
+            for category, keywords in self.keyword_sets.items()
+        }
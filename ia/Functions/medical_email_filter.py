@@ -11,6 +11,8 @@ from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
 import hashlib
 
+from keyword_automaton import KeywordAutomaton
+
 logger = logging.getLogger(__name__)
 
 class MedicalEmailFilter:
@@ -86,6 +88,15 @@ class MedicalEmailFilter:
             r'\b(?:número de historia|numero de historia)[\s:]*(\d{6,12})\b',
             r'\b(?:expediente|file)[\s:]*(\d{6,12})\b'
         ]
+        
+        # All keyword categories compiled once; content is scanned in a single pass
+        # (medical_keywords is the class-level list defined at the end of this module)
+        self.keyword_automaton = KeywordAutomaton({
+            'medical': self.medical_keywords,
+            'referral': self.referral_keywords,
+            'urgency': self.urgency_keywords,
+            'specialty': self.medical_specialties
+        })
     
     def _load_filter_config(self, config_path: str = None) -> Dict[str, Any]:
         """Load filter configuration"""
@@ -172,8 +183,9 @@ class MedicalEmailFilter:
             # Extract patient information
             analysis['detected_patient_info'] = self._extract_patient_info(text_content)
             
-            # Detect medical specialty
-            analysis['detected_specialty'] = self._detect_specialty(text_content)
+            # Detect medical specialty (first listed specialty found by the content scan)
+            specialties_found = content_analysis['specialty_keywords_found']
+            analysis['detected_specialty'] = specialties_found[0] if specialties_found else None
             
             # Compile indicators
             analysis['medical_indicators'] = content_analysis['medical_keywords_found']
@@ -278,28 +290,17 @@ class MedicalEmailFilter:
         }
         
         try:
-            # Count medical keywords
-            for keyword in self.medical_keywords:
-                if keyword.lower() in text_content:
-                    analysis['medical_score'] += 1
-                    analysis['medical_keywords_found'].append(keyword)
-            
-            # Count referral keywords
-            for keyword in self.referral_keywords:
-                if keyword.lower() in text_content:
-                    analysis['referral_score'] += 1
-                    analysis['referral_keywords_found'].append(keyword)
-            
-            # Count urgency keywords
-            for keyword in self.urgency_keywords:
-                if keyword.lower() in text_content:
-                    analysis['urgency_score'] += 1
-                    analysis['urgency_keywords_found'].append(keyword)
-            
-            # Count specialty keywords
-            for specialty in self.medical_specialties:
-                if specialty.lower() in text_content:
-                    analysis['specialty_keywords_found'].append(specialty)
+            # One pass over the text finds the keywords of every category
+            found = self.keyword_automaton.find_all(text_content)
+            
+            analysis['medical_keywords_found'] = found['medical']
+            analysis['referral_keywords_found'] = found['referral']
+            analysis['urgency_keywords_found'] = found['urgency']
+            analysis['specialty_keywords_found'] = found['specialty']
+            
+            analysis['medical_score'] = len(found['medical'])
+            analysis['referral_score'] = len(found['referral'])
+            analysis['urgency_score'] = len(found['urgency'])
             
             return analysis
             
@@ -429,10 +430,8 @@ class MedicalEmailFilter:
     def _detect_specialty(self, text_content: str) -> Optional[str]:
         """Detect medical specialty from content"""
         try:
-            for specialty in self.medical_specialties:
-                if specialty.lower() in text_content:
-                    return specialty
-            return None
+            specialties_found = self.keyword_automaton.find_all(text_content)['specialty']
+            return specialties_found[0] if specialties_found else None
             
         except Exception as e:
             logger.warning(f"Error detecting specialty: {str(e)}")
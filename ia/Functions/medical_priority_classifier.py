@@ -10,6 +10,7 @@ import numpy as np
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
 from enhanced_medical_analyzer import EnhancedMedicalAnalyzer
+from analysis_context import AnalysisContext
 
 logger = logging.getLogger(__name__)
 
@@ -173,31 +174,36 @@ class MedicalPriorityClassifier:
             }
         }
     
-    def classify_priority(self, medical_case_data: Dict[str, Any]) -> Dict[str, Any]:
+    def classify_priority(self, medical_case_data: Dict[str, Any], context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """
         Classify medical case priority using comprehensive algorithm
         
         Args:
             medical_case_data: Medical case data from analyzer
+            context: Shared analysis context of the email; its text and any
+                     medical analysis already run on it are reused
             
         Returns:
             Dict: Priority classification results
         """
         try:
             # Extract text for analysis
-            text_content = self._extract_text_content(medical_case_data)
+            if context is not None:
+                text_content = context.lower
+            else:
+                text_content = self._extract_text_content(medical_case_data)
             
-            # Perform medical analysis
-            medical_analysis = self.medical_analyzer.analyze_medical_text(text_content)
+            # Perform medical analysis (reused from the context when available)
+            medical_analysis = self.medical_analyzer.analyze_medical_text(text_content, context)
             
             # Calculate individual scores
             scores = {
-                'urgency_keywords': self._score_urgency_keywords(text_content),
+                'urgency_keywords': self._score_urgency_keywords(text_content, context),
                 'vital_signs': self._score_vital_signs(medical_analysis.get('vital_signs', {})),
                 'clinical_severity': self._score_clinical_severity(text_content),
                 'age_factor': self._score_age_factor(medical_analysis.get('patient_info', {})),
                 'specialty_urgency': self._score_specialty_urgency(medical_analysis.get('specialty')),
-                'temporal_urgency': self._score_temporal_urgency(text_content)
+                'temporal_urgency': self._score_temporal_urgency(text_content, context)
             }
             
             # Calculate weighted final score
@@ -233,6 +239,220 @@ class MedicalPriorityClassifier:
                 'classification_timestamp': datetime.now().isoformat()
             }
     
+    def classify_priorities(
+        self,
+        cases: List[Dict[str, Any]],
+        contexts: Optional[List[Optional[AnalysisContext]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify the priority of many cases in one call
+        
+        Text analysis still runs per case, but the numeric part (vital-sign and
+        age scoring, specialty lookup, weighting, thresholds and confidence)
+        runs on NumPy feature columns for the whole batch. Results are the same
+        as calling classify_priority on each case.
+        
+        Args:
+            cases: Medical case data, as accepted by classify_priority
+            contexts: Optional shared analysis context per case
+            
+        Returns:
+            List[Dict]: Priority classification results, in input order
+        """
+        cases = list(cases)
+        contexts = list(contexts) if contexts is not None else [None] * len(cases)
+        logger.info(f"Starting batch priority classification of {len(cases)} cases")
+        
+        results = [None] * len(cases)
+        positions = []
+        analyses = []
+        text_scores = []
+        
+        # Per-case text analysis
+        for position, (case, context) in enumerate(zip(cases, contexts)):
+            try:
+                if context is not None:
+                    text_content = context.lower
+                else:
+                    text_content = self._extract_text_content(case)
+                
+                medical_analysis = self.medical_analyzer.analyze_medical_text(text_content, context)
+                
+                text_scores.append((
+                    self._score_urgency_keywords(text_content, context),
+                    self._score_clinical_severity(text_content),
+                    self._score_temporal_urgency(text_content, context)
+                ))
+                analyses.append(medical_analysis)
+                positions.append(position)
+                
+            except Exception as e:
+                logger.error(f"Error in priority classification: {str(e)}")
+                results[position] = {
+                    'priority_level': 'Media',
+                    'urgency_score': 50.0,
+                    'error': str(e),
+                    'classification_timestamp': datetime.now().isoformat()
+                }
+        
+        if positions:
+            # Feature columns for the whole batch
+            text_columns = np.array(text_scores, dtype=np.float64).reshape(-1, 3)
+            specialties = [analysis.get('specialty') for analysis in analyses]
+            columns = {
+                'urgency_keywords': text_columns[:, 0],
+                'vital_signs': self._score_vital_signs_batch([analysis.get('vital_signs', {}) for analysis in analyses]),
+                'clinical_severity': text_columns[:, 1],
+                'age_factor': self._score_age_factor_batch([analysis.get('patient_info', {}) for analysis in analyses]),
+                'specialty_urgency': np.array(
+                    [self.specialty_urgency.get(specialty, 0.5) * 100 if specialty else 50.0 for specialty in specialties],
+                    dtype=np.float64
+                ),
+                'temporal_urgency': text_columns[:, 2]
+            }
+            
+            # Weighted score, accumulated column by column in the same order as _calculate_weighted_score
+            final_scores = np.zeros(len(positions), dtype=np.float64)
+            for score_type, column in columns.items():
+                final_scores += column * self.scoring_weights.get(score_type, 0.0)
+            final_scores = np.minimum(final_scores, 100.0)
+            
+            priority_levels = np.select([final_scores >= 70, final_scores >= 40], ['Alta', 'Media'], 'Baja')
+            
+            data_points = (
+                (columns['urgency_keywords'] > 0).astype(np.int64)
+                + (columns['vital_signs'] > 0)
+                + (columns['clinical_severity'] > 0)
+                + (columns['age_factor'] > 0)
+                + np.array([bool(specialty) for specialty in specialties], dtype=bool)
+            )
+            confidence_levels = np.select([data_points >= 4, data_points >= 2], ['Alta', 'Media'], 'Baja')
+            
+            timestamp = datetime.now().isoformat()
+            for row, (position, medical_analysis) in enumerate(zip(positions, analyses)):
+                scores = {score_type: float(column[row]) for score_type, column in columns.items()}
+                results[position] = {
+                    'priority_level': str(priority_levels[row]),
+                    'urgency_score': round(float(final_scores[row]), 2),
+                    'individual_scores': scores,
+                    'criteria_explanation': self._generate_criteria_explanation(scores, medical_analysis),
+                    'medical_analysis': medical_analysis,
+                    'classification_timestamp': timestamp,
+                    'confidence_level': str(confidence_levels[row])
+                }
+        
+        logger.info(f"Batch priority classification complete: {len(positions)} of {len(cases)} cases scored")
+        
+        return results
+    
+    def _score_vital_signs_batch(self, vital_signs_list: List[Dict[str, Any]]) -> np.ndarray:
+        """Vectorized _score_vital_signs over many cases"""
+        count = len(vital_signs_list)
+        fields = ['heart_rate', 'blood_pressure_systolic', 'blood_pressure_diastolic',
+                  'temperature', 'oxygen_saturation', 'respiratory_rate', 'glasgow_scale']
+        
+        # Missing or falsy values become NaN. Rows holding anything other than
+        # plain numbers go through the scalar path, whose comparisons may or may
+        # not reach (and fail on) such a value
+        values = {field: np.full(count, np.nan) for field in fields}
+        scalar_rows = []
+        for row, vital_signs in enumerate(vital_signs_list):
+            if vital_signs and not isinstance(vital_signs, dict):
+                scalar_rows.append(row)
+                continue
+            for field in fields:
+                value = (vital_signs or {}).get(field)
+                if not value:
+                    continue
+                if field == 'glasgow_scale':
+                    try:
+                        values[field][row] = int(value)
+                    except ValueError:
+                        pass
+                    except Exception:
+                        scalar_rows.append(row)
+                        break
+                elif isinstance(value, (int, float)):
+                    values[field][row] = value
+                else:
+                    scalar_rows.append(row)
+                    break
+        
+        score = np.zeros(count, dtype=np.float64)
+        abnormal_count = np.zeros(count, dtype=np.int64)
+        
+        def add(severe, moderate, severe_points, moderate_points):
+            nonlocal score, abnormal_count
+            moderate = moderate & ~severe
+            score = score + np.where(severe, severe_points, np.where(moderate, moderate_points, 0))
+            abnormal_count = abnormal_count + (severe | moderate)
+        
+        with np.errstate(invalid='ignore'):
+            hr = values['heart_rate']
+            add((hr < 50) | (hr > 120), (hr < 60) | (hr > 100), 30, 15)
+            
+            systolic = values['blood_pressure_systolic']
+            diastolic = values['blood_pressure_diastolic']
+            both = ~np.isnan(systolic) & ~np.isnan(diastolic)
+            add(both & ((systolic < 90) | (systolic > 180) | (diastolic > 110)),
+                both & ((systolic < 100) | (systolic > 160) | (diastolic > 90)), 35, 20)
+            
+            temp = values['temperature']
+            add((temp > 39.0) | (temp < 35.0), (temp > 38.5) | (temp < 36.0), 25, 15)
+            
+            spo2 = values['oxygen_saturation']
+            add(spo2 < 90, spo2 < 95, 40, 25)
+            
+            rr = values['respiratory_rate']
+            add((rr < 8) | (rr > 30), (rr < 12) | (rr > 24), 30, 15)
+            
+            glasgow = values['glasgow_scale']
+            add(glasgow <= 8, glasgow <= 12, 50, 30)
+        
+        # Bonus for multiple abnormal vital signs
+        score = score * np.select([abnormal_count >= 3, abnormal_count >= 2], [1.3, 1.2], 1.0)
+        score = np.minimum(score, 100.0)
+        
+        for row in scalar_rows:
+            score[row] = self._score_vital_signs(vital_signs_list[row])
+        
+        return score
+    
+    def _score_age_factor_batch(self, patient_infos: List[Dict[str, Any]]) -> np.ndarray:
+        """Vectorized _score_age_factor over many cases"""
+        ages = np.full(len(patient_infos), np.nan)
+        scalar_rows = []
+        for row, patient_info in enumerate(patient_infos):
+            if patient_info and not isinstance(patient_info, dict):
+                scalar_rows.append(row)
+                continue
+            age = (patient_info or {}).get('age')
+            if not age:
+                continue
+            if isinstance(age, (int, float)):
+                ages[row] = age
+            else:
+                scalar_rows.append(row)
+        
+        known = ~np.isnan(ages)
+        base_score = np.zeros(len(ages), dtype=np.float64)
+        
+        with np.errstate(invalid='ignore'):
+            # The first matching risk category wins, so apply them in reverse
+            for risk_data in reversed(list(self.age_risk_factors.values())):
+                in_range = (risk_data['min_age'] <= ages) & (ages <= risk_data['max_age'])
+                base_score = np.where(in_range, 30 * risk_data['multiplier'], base_score)
+            
+            # Additional scoring for extreme ages
+            base_score = np.where(ages < 1, 50.0, np.where(ages > 90, 45.0, base_score))
+        
+        score = np.where(known, np.minimum(base_score, 100.0), 0.0)
+        
+        for row in scalar_rows:
+            score[row] = self._score_age_factor(patient_infos[row])
+        
+        return score
+    
     def _extract_text_content(self, medical_case_data: Dict[str, Any]) -> str:
         """Extract all text content for analysis"""
         try:
@@ -268,7 +488,13 @@ class MedicalPriorityClassifier:
             logger.warning(f"Error extracting text content: {str(e)}")
             return ""
     
-    def _score_urgency_keywords(self, text: str) -> float:
+    def _search(self, pattern: str, text: str, context: Optional[AnalysisContext] = None):
+        """re.search with IGNORECASE, memoized in the analysis context when one is given"""
+        if context is not None:
+            return context.search(pattern, text)
+        return re.search(pattern, text, re.IGNORECASE)
+    
+    def _score_urgency_keywords(self, text: str, context: Optional[AnalysisContext] = None) -> float:
         """Score based on urgency keywords"""
         try:
             score = 0.0
@@ -276,7 +502,7 @@ class MedicalPriorityClassifier:
             # Check for critical conditions
             for condition_type, condition_data in self.critical_conditions.items():
                 for pattern in condition_data['patterns']:
-                    if re.search(pattern, text, re.IGNORECASE):
+                    if self._search(pattern, text, context):
                         score = max(score, condition_data['score'])
                         logger.debug(f"Critical condition detected: {pattern} (Score: {condition_data['score']})")
             
@@ -465,14 +691,14 @@ class MedicalPriorityClassifier:
             logger.warning(f"Error scoring specialty urgency: {str(e)}")
             return 50.0
     
-    def _score_temporal_urgency(self, text: str) -> float:
+    def _score_temporal_urgency(self, text: str, context: Optional[AnalysisContext] = None) -> float:
         """Score based on temporal urgency indicators"""
         try:
             score = 0.0
             
             for urgency_level, urgency_data in self.temporal_indicators.items():
                 for pattern in urgency_data['patterns']:
-                    if re.search(pattern, text, re.IGNORECASE):
+                    if self._search(pattern, text, context):
                         score = max(score, urgency_data['score'] * 100)
                         break
             
@@ -0,0 +1,85 @@
+"""
+NLP Model Registry Module
+Process-wide, lazily loaded spaCy pipelines shared by all analyzers
+"""
+
+import threading
+import logging
+from typing import Dict, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default Spanish pipeline used by the medical analyzers
+SPANISH_MODEL = "es_core_news_sm"
+
+# Components shipped with each known pipeline (senter is disabled by default)
+MODEL_COMPONENTS = {
+    SPANISH_MODEL: ('tok2vec', 'morphologizer', 'parser', 'attribute_ruler', 'lemmatizer', 'ner', 'senter')
+}
+
+_lock = threading.Lock()
+
+# Model name -> list of (loaded component set, pipeline or None if unavailable)
+_pipelines = {}
+
+def get_spacy_model(name: str = SPANISH_MODEL, components: Optional[Iterable[str]] = None):
+    """
+    Get a shared spaCy pipeline, loading it on first use
+
+    Components a caller does not ask for are excluded at load time, so their
+    weights are never read. A pipeline that is already loaded is reused by
+    any caller whose components it covers, so each model is normally loaded
+    once per process no matter how many classifiers use it.
+
+    Args:
+        name: spaCy package name
+        components: Pipeline components the caller needs (None loads the full
+                    default pipeline, an empty tuple only tokenizer and vocab)
+
+    Returns:
+        spacy.Language or None if spaCy or the model is not installed
+    """
+    known = MODEL_COMPONENTS.get(name)
+    if components is None or known is None:
+        needed = set(known or ())
+        full = True
+    else:
+        needed = set(components)
+        full = False
+
+    with _lock:
+        for loaded, nlp in _pipelines.get(name, []):
+            if nlp is None or needed <= loaded:
+                return nlp
+
+        exclude = [] if full else [component for component in known if component not in needed]
+        nlp = _load_pipeline(name, exclude)
+
+        loaded = set(known or ()) - set(exclude)
+        _pipelines.setdefault(name, []).append((loaded, nlp))
+
+        return nlp
+
+def _load_pipeline(name: str, exclude):
+    """Load a spaCy pipeline without the excluded components (None on failure)"""
+    try:
+        import spacy
+    except ImportError:
+        logger.warning("spaCy not installed, using basic patterns")
+        return None
+
+    try:
+        nlp = spacy.load(name, exclude=exclude)
+        logger.info(f"Loaded spaCy model {name} with components: {', '.join(nlp.pipe_names) or 'tokenizer only'}")
+        return nlp
+    except OSError:
+        logger.warning(f"spaCy model {name} not found, using basic patterns")
+        return None
+
+def get_loaded_models() -> Dict[str, Any]:
+    """Get the pipelines loaded so far and their components"""
+    with _lock:
+        return {
+            name: [sorted(loaded) if nlp is not None else None for loaded, nlp in entries]
+            for name, entries in _pipelines.items()
+        }
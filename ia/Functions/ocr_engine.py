@@ -0,0 +1,459 @@
+"""
+OCR Engine Module
+Per-page OCR for scanned PDFs and images with a preprocessing cache
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever preprocessing changes so cached page images are regenerated
+PREPROCESS_VERSION = "1"
+
+# Per-process engine reused by pool workers (see ocr_pdf_page_in_worker)
+_worker_engine = None
+
+class PageOCREngine:
+    """
+    OCR engine working one page at a time
+
+    Scanned PDF pages are rasterized individually, preprocessed (grayscale,
+    deskewed, binarized) and OCR'd on a process pool. Preprocessed pages are
+    cached as PNG files keyed by the document hash, page, DPI and
+    preprocessing version, so re-running OCR on the same document skips
+    rasterization and cleanup. When the cache grows past max_cache_mb the
+    least recently used pages (by file mtime) are evicted. Pages whose text
+    layer is already good enough are never OCR'd.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        language: str = 'eng',
+        dpi: int = 300,
+        max_workers: int = 0,
+        min_text_chars: int = 50,
+        cache_dir: Optional[str] = None,
+        max_cache_mb: int = 1024
+    ):
+        """
+        Initialize OCR engine
+
+        Args:
+            base_path: Base path for the ia folder
+            language: Tesseract language(s), e.g. 'spa+eng'
+            dpi: Rasterization resolution for PDF pages
+            max_workers: OCR processes (0 runs OCR inline in the calling process)
+            min_text_chars: Minimum text-layer characters for a page to skip OCR
+            cache_dir: Preprocessed page cache (defaults to <base_path>/cache/ocr_pages)
+            max_cache_mb: Maximum total size of the page cache in MB
+        """
+        self.base_path = base_path
+        self.language = language
+        self.dpi = dpi
+        self.max_workers = max_workers
+        self.min_text_chars = min_text_chars
+        self.cache_dir = cache_dir or os.path.join(base_path, "cache", "ocr_pages")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_cache_bytes = max_cache_mb * 1024 * 1024
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        # Size of the page cache as last scanned plus pages stored since (None until scanned)
+        self._cache_bytes = None
+        self._cache_lock = threading.Lock()
+
+        self.stats = {
+            'pages_ocr': 0,
+            'pages_text_layer': 0,
+            'preprocess_cache_hits': 0,
+            'preprocess_cache_evictions': 0,
+            'ocr_errors': 0
+        }
+        self._stats_lock = threading.Lock()
+
+    def get_settings(self) -> Dict[str, Any]:
+        """Settings needed to rebuild an equivalent engine in another process"""
+        return {
+            'language': self.language,
+            'dpi': self.dpi,
+            'min_text_chars': self.min_text_chars,
+            'cache_dir': self.cache_dir,
+            'max_cache_mb': self.max_cache_bytes // (1024 * 1024)
+        }
+
+    def get_cache_tag(self) -> str:
+        """Tag of every setting that changes OCR output, for text caches keyed by it"""
+        return f"ocr:{self.language}:{self.dpi}:{self.min_text_chars}:{PREPROCESS_VERSION}"
+
+    def text_layer_is_sufficient(self, text: str) -> bool:
+        """
+        Decide whether a page's embedded text makes OCR unnecessary
+
+        Args:
+            text: Text-layer content of the page
+
+        Returns:
+            bool: True if the text is long enough and mostly real characters
+        """
+        stripped = re.sub(r'\s+', '', text or '')
+        if len(stripped) < self.min_text_chars:
+            return False
+
+        alnum_ratio = sum(1 for c in stripped if c.isalnum()) / len(stripped)
+        return alnum_ratio >= 0.6
+
+    def ocr_pdf_pages(self, pdf_path: str, page_numbers: List[int], content_hash: Optional[str] = None) -> Dict[int, str]:
+        """
+        OCR selected pages of a PDF, in parallel when a pool is configured
+
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: Pages to OCR (starting at 1)
+            content_hash: SHA-256 of the PDF (computed when omitted)
+
+        Returns:
+            Dict[int, str]: OCR text per page number ("" on failure)
+        """
+        if not page_numbers:
+            return {}
+
+        content_hash = content_hash or self._hash_file(pdf_path)
+        executor = self._get_executor() if len(page_numbers) > 1 else None
+
+        if executor is None:
+            texts = {
+                page_number: self._ocr_pdf_page(pdf_path, page_number, content_hash)
+                for page_number in page_numbers
+            }
+        else:
+            settings = self.get_settings()
+            futures = {
+                page_number: executor.submit(ocr_pdf_page_in_worker, settings, pdf_path, page_number, content_hash)
+                for page_number in page_numbers
+            }
+
+            texts = {}
+            for page_number, future in futures.items():
+                try:
+                    texts[page_number] = future.result()
+                except Exception as e:
+                    logger.error(f"Error in OCR worker for page {page_number} of {pdf_path}: {str(e)}")
+                    self._count('ocr_errors')
+                    texts[page_number] = ""
+
+        self._count('pages_ocr', len(page_numbers))
+        return texts
+
+    def ocr_image(self, image_path: str, content_hash: Optional[str] = None) -> str:
+        """
+        OCR an image file after preprocessing (cached)
+
+        Args:
+            image_path: Path to image file
+            content_hash: SHA-256 of the image (computed when omitted)
+
+        Returns:
+            str: OCR text
+        """
+        try:
+            from PIL import Image
+
+            content_hash = content_hash or self._hash_file(image_path)
+            cache_path = self._get_cache_path(content_hash, 0)
+
+            image = self._load_cached_page(cache_path)
+            if image is None:
+                with Image.open(image_path) as original:
+                    image = self._preprocess(original)
+                self._store_cached_page(image, cache_path)
+
+            self._count('pages_ocr')
+            return self._run_tesseract(image)
+
+        except ImportError:
+            logger.warning(f"OCR libraries not available for {image_path}")
+            return ""
+        except Exception as e:
+            logger.error(f"Error running OCR on image {image_path}: {str(e)}")
+            self._count('ocr_errors')
+            return ""
+
+    def _ocr_pdf_page(self, pdf_path: str, page_number: int, content_hash: str) -> str:
+        """Rasterize (or load from cache), preprocess and OCR one PDF page"""
+        try:
+            cache_path = self._get_cache_path(content_hash, page_number)
+
+            image = self._load_cached_page(cache_path)
+            if image is None:
+                raw_image = self._rasterize_pdf_page(pdf_path, page_number)
+                if raw_image is None:
+                    return ""
+                image = self._preprocess(raw_image)
+                self._store_cached_page(image, cache_path)
+
+            return self._run_tesseract(image)
+
+        except ImportError:
+            logger.warning(f"OCR libraries not available for {pdf_path}")
+            return ""
+        except Exception as e:
+            logger.error(f"Error running OCR on page {page_number} of {pdf_path}: {str(e)}")
+            self._count('ocr_errors')
+            return ""
+
+    def _rasterize_pdf_page(self, pdf_path: str, page_number: int):
+        """Render a single PDF page to a grayscale PIL image (PyMuPDF, or pdf2image as fallback)"""
+        from PIL import Image
+
+        try:
+            import fitz
+            with fitz.open(pdf_path) as pdf:
+                pixmap = pdf.load_page(page_number - 1).get_pixmap(dpi=self.dpi, colorspace=fitz.csGRAY)
+                return Image.frombytes('L', (pixmap.width, pixmap.height), pixmap.samples)
+        except ImportError:
+            pass
+
+        try:
+            from pdf2image import convert_from_path
+            images = convert_from_path(
+                pdf_path, dpi=self.dpi, first_page=page_number, last_page=page_number, grayscale=True
+            )
+            return images[0] if images else None
+        except ImportError:
+            logger.warning(f"No PDF rasterizer available (PyMuPDF or pdf2image) for {pdf_path}")
+            return None
+
+    def _preprocess(self, image):
+        """Grayscale, deskew and binarize an image for OCR"""
+        image = image.convert('L')
+
+        try:
+            import numpy as np
+        except ImportError:
+            # Without NumPy: fixed threshold, no deskew
+            return image.point(lambda value: 255 if value > 128 else 0, mode='1')
+
+        angle = self._estimate_skew(image, np)
+        if angle:
+            image = image.rotate(angle, expand=True, fillcolor=255)
+
+        pixels = np.asarray(image)
+        threshold = self._otsu_threshold(pixels, np)
+        binary = ((pixels > threshold) * 255).astype(np.uint8)
+
+        from PIL import Image
+        return Image.fromarray(binary).convert('1')
+
+    @staticmethod
+    def _otsu_threshold(pixels, np) -> int:
+        """Otsu's global threshold for a grayscale array"""
+        histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+        total = histogram.sum()
+        if total == 0:
+            return 128
+
+        levels = np.arange(256)
+        weight_background = np.cumsum(histogram)
+        weight_foreground = total - weight_background
+        cumulative_mean = np.cumsum(histogram * levels)
+        mean_total = cumulative_mean[-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            between_variance = (
+                (mean_total * weight_background - total * cumulative_mean) ** 2
+                / (weight_background * weight_foreground)
+            )
+
+        return int(np.nanargmax(between_variance))
+
+    @staticmethod
+    def _estimate_skew(image, np, max_angle: float = 5.0, step: float = 0.5) -> float:
+        """
+        Estimate page skew by maximizing the variance of the row ink profile
+
+        Runs on a downscaled copy; text lines produce the sharpest profile
+        when they are horizontal.
+        """
+        small = image.copy()
+        small.thumbnail((800, 800))
+
+        best_angle = 0.0
+        best_score = -1.0
+
+        for angle in np.arange(-max_angle, max_angle + step / 2, step):
+            rotated = small.rotate(float(angle), expand=False, fillcolor=255)
+            ink = (np.asarray(rotated) < 128).sum(axis=1).astype(np.float64)
+            score = float(ink.var())
+            if score > best_score:
+                best_score = score
+                best_angle = float(angle)
+
+        return best_angle
+
+    def _run_tesseract(self, image) -> str:
+        """Run Tesseract on a preprocessed image"""
+        import pytesseract
+        return pytesseract.image_to_string(image, lang=self.language)
+
+    def _get_cache_path(self, content_hash: str, page_number: int) -> str:
+        """Cache file of a preprocessed page (page 0 is a standalone image)"""
+        key = f"{content_hash}_{page_number}_{self.dpi}_{PREPROCESS_VERSION}"
+        return os.path.join(self.cache_dir, content_hash[:2], f"{key}.png")
+
+    def _load_cached_page(self, cache_path: str):
+        """Load a preprocessed page from the cache, or None"""
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            from PIL import Image
+            with Image.open(cache_path) as cached:
+                image = cached.copy()
+            # Mark the page recently used for eviction
+            os.utime(cache_path)
+            self._count('preprocess_cache_hits')
+            return image
+        except Exception as e:
+            logger.warning(f"Discarding unreadable OCR cache entry {cache_path}: {str(e)}")
+            return None
+
+    def _store_cached_page(self, image, cache_path: str):
+        """Write a preprocessed page to the cache atomically"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            image.save(tmp_path, format='PNG')
+            os.replace(tmp_path, cache_path)
+            self._track_cache_growth(os.path.getsize(cache_path))
+        except Exception as e:
+            logger.warning(f"Could not cache preprocessed page {cache_path}: {str(e)}")
+
+    def _track_cache_growth(self, size_bytes: int):
+        """Account a stored page and evict when the cache is over budget"""
+        with self._cache_lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = self._scan_cache()[1]
+            else:
+                self._cache_bytes += size_bytes
+
+            if self._cache_bytes > self.max_cache_bytes:
+                self._evict_cache()
+
+    def _scan_cache(self):
+        """List cached pages as (mtime, size, path) and their total size"""
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.png'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        return entries, sum(entry[1] for entry in entries)
+
+    def _evict_cache(self):
+        """
+        Drop least recently used pages until the cache is under budget (cache lock held)
+
+        The cache is rescanned first, so pages stored by OCR worker processes
+        (each tracking only its own writes) are accounted too.
+        """
+        entries, total_bytes = self._scan_cache()
+
+        # Evict down to 90% so the next few stores do not trigger another pass
+        target_bytes = self.max_cache_bytes * 0.9
+        evicted = 0
+        for _, size_bytes, path in sorted(entries):
+            if total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size_bytes
+            evicted += 1
+
+        self._cache_bytes = total_bytes
+        self._count('preprocess_cache_evictions', evicted)
+        if evicted:
+            logger.info(f"Evicted {evicted} pages from the OCR page cache")
+
+    def _count(self, key: str, amount: int = 1):
+        """Increment a statistic (engines are shared by extraction worker threads)"""
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """SHA-256 of a file, streamed"""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Create the OCR process pool on first use"""
+        if self.max_workers <= 0:
+            return None
+
+        # Extraction worker threads may ask for the pool concurrently
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                logger.info(f"OCR process pool: {self.max_workers} processes")
+
+            return self._executor
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get OCR statistics"""
+        with self._stats_lock:
+            return self.stats.copy()
+
+    def close(self):
+        """Shut down the OCR process pool"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def ocr_pdf_page_in_worker(settings: Dict[str, Any], pdf_path: str, page_number: int, content_hash: str) -> str:
+    """
+    Process-pool entry point for OCR of one PDF page
+
+    Args:
+        settings: PageOCREngine.get_settings() of the submitting engine
+        pdf_path: Path to PDF file
+        page_number: Page to OCR (starting at 1)
+        content_hash: SHA-256 of the PDF
+
+    Returns:
+        str: OCR text
+    """
+    global _worker_engine
+
+    if _worker_engine is None or _worker_engine.get_settings() != settings:
+        _worker_engine = PageOCREngine(
+            os.path.dirname(settings['cache_dir']),
+            language=settings['language'],
+            dpi=settings['dpi'],
+            min_text_chars=settings['min_text_chars'],
+            cache_dir=settings['cache_dir'],
+            max_cache_mb=settings['max_cache_mb']
+        )
+
+    return _worker_engine._ocr_pdf_page(pdf_path, page_number, content_hash)
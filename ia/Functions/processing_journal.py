@@ -0,0 +1,195 @@
+"""
+Processing Journal Module
+Durable per-UID progress journal for resumable batch runs
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ProcessingJournal:
+    """
+    SQLite journal of per-email processing state
+
+    States progress fetched -> extracted -> saved; any stage can end in
+    failed (with the reason). A rerun skips saved emails, retries the rest
+    and reuses each email's original unique_id so outputs are not duplicated.
+    """
+    
+    STATE_FETCHED = 'fetched'
+    STATE_EXTRACTED = 'extracted'
+    STATE_SAVED = 'saved'
+    STATE_FAILED = 'failed'
+    
+    def __init__(self, db_path: str, folder: str = "INBOX", uid_validity: Optional[int] = None):
+        """
+        Initialize processing journal
+        
+        Args:
+            db_path: Path of the SQLite journal file
+            folder: Folder the UIDs belong to
+            uid_validity: Folder UIDVALIDITY (UIDs from another validity are ignored)
+        """
+        self.db_path = db_path
+        self.folder = folder
+        self.uid_validity = uid_validity or 0
+        self.lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_database()
+    
+    def _init_database(self):
+        """Create the journal table"""
+        with self.lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS email_progress (
+                    folder TEXT NOT NULL,
+                    uid_validity INTEGER NOT NULL,
+                    uid TEXT NOT NULL,
+                    unique_id TEXT,
+                    state TEXT NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    error TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (folder, uid_validity, uid)
+                )
+            ''')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_progress_unique_id ON email_progress (unique_id)'
+            )
+            self._connection.commit()
+    
+    def filter_pending(self, email_ids: List[str]) -> List[str]:
+        """
+        Drop emails that were already saved by an earlier run
+        
+        Args:
+            email_ids: Candidate email UIDs
+            
+        Returns:
+            List[str]: UIDs still to process, in input order
+        """
+        with self.lock:
+            rows = self._connection.execute(
+                'SELECT uid FROM email_progress WHERE folder = ? AND uid_validity = ? AND state = ?',
+                (self.folder, self.uid_validity, self.STATE_SAVED)
+            ).fetchall()
+        
+        saved = {row[0] for row in rows}
+        return [email_id for email_id in email_ids if str(email_id) not in saved]
+    
+    def get_unique_id(self, email_id: str) -> Optional[str]:
+        """
+        Get the unique_id minted for an email on an earlier attempt
+        
+        Args:
+            email_id: Email UID
+            
+        Returns:
+            Optional[str]: Previously assigned unique_id, if any
+        """
+        with self.lock:
+            row = self._connection.execute(
+                'SELECT unique_id FROM email_progress WHERE folder = ? AND uid_validity = ? AND uid = ?',
+                (self.folder, self.uid_validity, str(email_id))
+            ).fetchone()
+        
+        return row[0] if row else None
+    
+    def mark(self, email_id: str, state: str, unique_id: Optional[str] = None, error: Optional[str] = None):
+        """
+        Record the state of an email
+        
+        Args:
+            email_id: Email UID
+            state: One of fetched, extracted, saved, failed
+            unique_id: unique_id assigned to the email
+            error: Failure reason (for the failed state)
+        """
+        now = datetime.now().isoformat()
+        attempt_increment = 1 if state == self.STATE_FETCHED else 0
+        
+        with self.lock:
+            self._connection.execute('''
+                INSERT INTO email_progress (folder, uid_validity, uid, unique_id, state, attempts, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (folder, uid_validity, uid) DO UPDATE SET
+                    unique_id = COALESCE(excluded.unique_id, email_progress.unique_id),
+                    state = excluded.state,
+                    attempts = email_progress.attempts + ?,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+            ''', (
+                self.folder, self.uid_validity, str(email_id), unique_id, state,
+                attempt_increment, error, now, attempt_increment
+            ))
+            self._connection.commit()
+    
+    def mark_by_unique_id(self, unique_id: str, state: str, error: Optional[str] = None):
+        """
+        Record the state of an email known only by its unique_id
+        
+        Args:
+            unique_id: unique_id assigned to the email
+            state: One of fetched, extracted, saved, failed
+            error: Failure reason (for the failed state)
+        """
+        with self.lock:
+            self._connection.execute(
+                'UPDATE email_progress SET state = ?, error = ?, updated_at = ? WHERE unique_id = ?',
+                (state, error, datetime.now().isoformat(), unique_id)
+            )
+            self._connection.commit()
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Get per-state counts for the current folder"""
+        with self.lock:
+            rows = self._connection.execute(
+                'SELECT state, COUNT(*) FROM email_progress WHERE folder = ? AND uid_validity = ? GROUP BY state',
+                (self.folder, self.uid_validity)
+            ).fetchall()
+        
+        summary = {state: 0 for state in (self.STATE_FETCHED, self.STATE_EXTRACTED, self.STATE_SAVED, self.STATE_FAILED)}
+        summary.update({state: count for state, count in rows})
+        return summary
+    
+    def get_failures(self) -> List[Dict[str, Any]]:
+        """Get failed emails with their reasons"""
+        with self.lock:
+            rows = self._connection.execute(
+                'SELECT uid, unique_id, attempts, error, updated_at FROM email_progress '
+                'WHERE folder = ? AND uid_validity = ? AND state = ?',
+                (self.folder, self.uid_validity, self.STATE_FAILED)
+            ).fetchall()
+        
+        return [
+            {'uid': uid, 'unique_id': unique_id, 'attempts': attempts, 'error': error, 'updated_at': updated_at}
+            for uid, unique_id, attempts, error, updated_at in rows
+        ]
+    
+    def close(self):
+        """Close the journal database"""
+        if self._connection:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+    
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
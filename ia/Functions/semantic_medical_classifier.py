@@ -9,26 +9,37 @@ import logging
 import numpy as np
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
-import spacy
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from pattern_bank import RegexPatternBank, benchmark_pattern_bank
+from nlp_models import get_spacy_model, SPANISH_MODEL
+
 logger = logging.getLogger(__name__)
 
+# Representative referral texts for benchmark_pattern_matching
+BENCHMARK_SAMPLE_TEXTS = [
+    "Paciente masculino de 58 años con dolor toracico intenso de 2 horas de evolucion, "
+    "ECG con elevacion del ST compatible con infarto del miocardio. TA 90/60, FC 110. "
+    "Requiere atencion inmediata, se solicita traslado a UCI.",
+    "Niña de 4 años con fiebre alta persistente, nauseas y vomitos desde hace 3 dias. "
+    "Sin antecedentes relevantes. Se solicita valoracion por pediatria esta semana.",
+    "Gestante con embarazo de 34 semanas, cefalea y TA 160/110, sospecha de preeclampsia. "
+    "Remitida desde hospital local para manejo hoy mismo.",
+    "Paciente con diabetes mellitus descompensada e insuficiencia renal cronica en seguimiento "
+    "por medicina interna. Solicitud de control ambulatorio con RX de torax y TAC abdominal."
+]
+
 class SemanticMedicalClassifier:
     """
     Advanced semantic classifier for medical requests using NLP and ML techniques
     """
     
+    # spaCy components needed for entities, noun chunks and sentences
+    NLP_COMPONENTS = ('tok2vec', 'morphologizer', 'parser', 'attribute_ruler', 'ner')
+    
     def __init__(self):
         """Initialize the semantic medical classifier"""
-        try:
-            # Load Spanish language model
-            self.nlp = spacy.load("es_core_news_sm")
-        except OSError:
-            logger.warning("Spanish spaCy model not found, using basic patterns")
-            self.nlp = None
-        
         # Initialize TF-IDF vectorizer for semantic similarity
         self.vectorizer = TfidfVectorizer(
             max_features=1000,
@@ -208,6 +219,36 @@ class SemanticMedicalClassifier:
                 ]
             }
         }
+        
+        # Medical abbreviations expanded during preprocessing
+        self.medical_abbreviations = {
+            'fc': 'frecuencia cardiaca',
+            'fr': 'frecuencia respiratoria',
+            'ta': 'tension arterial',
+            'spo2': 'saturacion oxigeno',
+            'ecg': 'electrocardiograma',
+            'rx': 'radiografia',
+            'tac': 'tomografia',
+            'rm': 'resonancia magnetica'
+        }
+        
+        # Compile every pattern once. Preprocessed text is already lowercase, so
+        # the bank matches case-sensitively and can gate patterns on their literals
+        self._whitespace_regex = re.compile(r'\s+')
+        self._special_chars_regex = re.compile(r'[^\w\s\-\+\%\/\(\)\.]')
+        self._abbreviation_regex = re.compile(
+            r'\b(' + '|'.join(re.escape(abbrev) for abbrev in self.medical_abbreviations) + r')\b'
+        )
+        self.pattern_bank = RegexPatternBank({
+            **{f"specialty:{name}": data['patterns'] for name, data in self.specialty_patterns.items()},
+            **{f"urgency:{name}": data['patterns'] for name, data in self.urgency_indicators.items()},
+            **{f"temporal:{name}": data['patterns'] for name, data in self.temporal_patterns.items()}
+        })
+    
+    @property
+    def nlp(self):
+        """Shared Spanish spaCy pipeline, loaded on first use (None if unavailable)"""
+        return get_spacy_model(SPANISH_MODEL, self.NLP_COMPONENTS)
     
     def classify_medical_request(self, text_content: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -226,25 +267,9 @@ class SemanticMedicalClassifier:
             # Preprocess text
             processed_text = self._preprocess_text(text_content)
             
-            # Perform different types of classification
-            classification_results = {
-                'specialty_classification': self._classify_specialty(processed_text),
-                'urgency_classification': self._classify_urgency(processed_text),
-                'semantic_analysis': self._perform_semantic_analysis(processed_text),
-                'clinical_entities': self._extract_clinical_entities(processed_text),
-                'temporal_analysis': self._analyze_temporal_urgency(processed_text),
-                'confidence_metrics': {}
-            }
-            
-            # Calculate overall confidence
-            classification_results['confidence_metrics'] = self._calculate_confidence_metrics(
-                classification_results
-            )
-            
-            # Generate final classification
-            final_classification = self._generate_final_classification(classification_results)
-            classification_results['final_classification'] = final_classification
+            classification_results = self._classify_processed_text(processed_text)
             
+            final_classification = classification_results['final_classification']
             logger.info(f"Classification completed with confidence: {final_classification.get('overall_confidence', 0):.2f}")
             
             return classification_results
@@ -256,6 +281,101 @@ class SemanticMedicalClassifier:
                 'classification_timestamp': datetime.now().isoformat()
             }
     
+    def classify_medical_requests(self, texts: List[str], batch_size: int = 64, n_process: int = 1) -> List[Dict[str, Any]]:
+        """
+        Classify many medical requests, streaming them through spaCy in batches
+        
+        Produces the same per-document results as classify_medical_request, but
+        the spaCy pipeline runs through nlp.pipe, which batches documents and can
+        spread them over several processes. Meant for archive reclassification
+        and backfills.
+        
+        Args:
+            texts: Full text content of each request
+            batch_size: Documents per spaCy batch
+            n_process: spaCy worker processes (1 runs in this process)
+            
+        Returns:
+            List[Dict]: Classification results, in input order
+        """
+        texts = list(texts)
+        logger.info(f"Starting batch semantic classification of {len(texts)} requests")
+        
+        processed_texts = [self._preprocess_text(text) if isinstance(text, str) else None for text in texts]
+        
+        # Only valid texts go through spaCy; docs come back in input order
+        nlp = self.nlp
+        valid_texts = [text for text in processed_texts if text is not None]
+        docs = nlp.pipe(valid_texts, batch_size=batch_size, n_process=n_process) if nlp and valid_texts else None
+        
+        results = []
+        errors = 0
+        for processed_text in processed_texts:
+            if processed_text is None:
+                results.append({
+                    'error': 'Request text is not a string',
+                    'classification_timestamp': datetime.now().isoformat()
+                })
+                errors += 1
+                continue
+            
+            doc = None
+            if docs is not None:
+                try:
+                    doc = next(docs)
+                except Exception as e:
+                    # Without a doc each remaining request is parsed on its own
+                    logger.error(f"Error in batched spaCy processing, continuing per document: {str(e)}")
+                    docs = None
+            
+            try:
+                results.append(self._classify_processed_text(processed_text, doc))
+            except Exception as e:
+                logger.error(f"Error in semantic classification: {str(e)}")
+                results.append({
+                    'error': str(e),
+                    'classification_timestamp': datetime.now().isoformat()
+                })
+                errors += 1
+        
+        logger.info(f"Batch classification completed: {len(results)} requests, {errors} errors")
+        
+        return results
+    
+    def _classify_processed_text(self, processed_text: str, doc=None) -> Dict[str, Any]:
+        """
+        Run every classification step on preprocessed text
+        
+        Args:
+            processed_text: Output of _preprocess_text
+            doc: spaCy Doc of processed_text, when already parsed
+            
+        Returns:
+            Dict: Classification results including the final classification
+        """
+        # One scan of the pattern bank serves specialty, urgency and temporal analysis
+        pattern_hits = self.pattern_bank.scan(processed_text)
+        
+        # Perform different types of classification
+        classification_results = {
+            'specialty_classification': self._classify_specialty(processed_text, pattern_hits),
+            'urgency_classification': self._classify_urgency(processed_text, pattern_hits),
+            'semantic_analysis': self._perform_semantic_analysis(processed_text, doc),
+            'clinical_entities': self._extract_clinical_entities(processed_text),
+            'temporal_analysis': self._analyze_temporal_urgency(processed_text, pattern_hits),
+            'confidence_metrics': {}
+        }
+        
+        # Calculate overall confidence
+        classification_results['confidence_metrics'] = self._calculate_confidence_metrics(
+            classification_results
+        )
+        
+        # Generate final classification
+        classification_results['final_classification'] = self._generate_final_classification(classification_results)
+        
+        return classification_results
+    
     def _preprocess_text(self, text: str) -> str:
         """Preprocess text for analysis"""
         try:
@@ -263,25 +383,15 @@ class SemanticMedicalClassifier:
             text = text.lower()
             
             # Remove extra whitespace
-            text = re.sub(r'\s+', ' ', text)
+            text = self._whitespace_regex.sub(' ', text)
             
             # Remove special characters but keep medical symbols
-            text = re.sub(r'[^\w\s\-\+\%\/\(\)\.]', ' ', text)
-            
-            # Normalize medical abbreviations
-            medical_abbrevs = {
-                'fc': 'frecuencia cardiaca',
-                'fr': 'frecuencia respiratoria',
-                'ta': 'tension arterial',
-                'spo2': 'saturacion oxigeno',
-                'ecg': 'electrocardiograma',
-                'rx': 'radiografia',
-                'tac': 'tomografia',
-                'rm': 'resonancia magnetica'
-            }
+            text = self._special_chars_regex.sub(' ', text)
             
-            for abbrev, full_form in medical_abbrevs.items():
-                text = re.sub(rf'\b{abbrev}\b', full_form, text)
+            # Normalize medical abbreviations (all of them in one pass)
+            text = self._abbreviation_regex.sub(
+                lambda match: self.medical_abbreviations[match.group(1)], text
+            )
             
             return text.strip()
             
@@ -289,14 +399,18 @@ class SemanticMedicalClassifier:
             logger.warning(f"Error preprocessing text: {str(e)}")
             return text
     
-    def _classify_specialty(self, text: str) -> Dict[str, Any]:
+    def _classify_specialty(self, text: str, pattern_hits: Optional[Dict[str, Dict[int, List[Any]]]] = None) -> Dict[str, Any]:
         """Classify medical specialty based on content"""
         try:
+            if pattern_hits is None:
+                pattern_hits = self.pattern_bank.scan(text)
+            
             specialty_scores = {}
             
             for specialty, data in self.specialty_patterns.items():
                 score = 0
                 matches = []
+                pattern_matches = pattern_hits[f"specialty:{specialty}"]
                 
                 # Check keywords
                 for keyword in data['keywords']:
@@ -305,8 +419,8 @@ class SemanticMedicalClassifier:
                         matches.append(f"keyword: {keyword}")
                 
                 # Check patterns
-                for pattern in data['patterns']:
-                    if re.search(pattern, text, re.IGNORECASE):
+                for index, pattern in enumerate(data['patterns']):
+                    if index in pattern_matches:
                         score += 2  # Patterns have higher weight
                         matches.append(f"pattern: {pattern}")
                 
@@ -338,14 +452,18 @@ class SemanticMedicalClassifier:
             logger.error(f"Error in specialty classification: {str(e)}")
             return {'error': str(e)}
     
-    def _classify_urgency(self, text: str) -> Dict[str, Any]:
+    def _classify_urgency(self, text: str, pattern_hits: Optional[Dict[str, Dict[int, List[Any]]]] = None) -> Dict[str, Any]:
         """Classify urgency level based on content"""
         try:
+            if pattern_hits is None:
+                pattern_hits = self.pattern_bank.scan(text)
+            
             urgency_scores = []
             
             for urgency_level, data in self.urgency_indicators.items():
-                for pattern in data['patterns']:
-                    matches = re.findall(pattern, text, re.IGNORECASE)
+                pattern_matches = pattern_hits[f"urgency:{urgency_level}"]
+                for index, pattern in enumerate(data['patterns']):
+                    matches = pattern_matches.get(index)
                     if matches:
                         urgency_scores.append({
                             'level': urgency_level,
@@ -359,7 +477,7 @@ class SemanticMedicalClassifier:
                 best_urgency = max(urgency_scores, key=lambda x: x['score'])
                 
                 # Apply temporal multipliers
-                temporal_multiplier = self._get_temporal_multiplier(text)
+                temporal_multiplier = self._get_temporal_multiplier(text, pattern_hits)
                 final_score = min(best_urgency['score'] * temporal_multiplier, 100)
                 
                 return {
@@ -382,13 +500,15 @@ class SemanticMedicalClassifier:
             logger.error(f"Error in urgency classification: {str(e)}")
             return {'error': str(e)}
     
-    def _get_temporal_multiplier(self, text: str) -> float:
+    def _get_temporal_multiplier(self, text: str, pattern_hits: Optional[Dict[str, Dict[int, List[Any]]]] = None) -> float:
         """Calculate temporal urgency multiplier"""
         try:
+            if pattern_hits is None:
+                pattern_hits = self.pattern_bank.scan(text)
+            
             for temporal_type, data in self.temporal_patterns.items():
-                for pattern in data['patterns']:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        return data['multiplier']
+                if pattern_hits[f"temporal:{temporal_type}"]:
+                    return data['multiplier']
             
             return 1.0  # No temporal urgency detected
             
@@ -396,13 +516,14 @@ class SemanticMedicalClassifier:
             logger.warning(f"Error calculating temporal multiplier: {str(e)}")
             return 1.0
     
-    def _perform_semantic_analysis(self, text: str) -> Dict[str, Any]:
-        """Perform semantic analysis using NLP"""
+    def _perform_semantic_analysis(self, text: str, doc=None) -> Dict[str, Any]:
+        """Perform semantic analysis using NLP (doc: the text already parsed by nlp.pipe)"""
         try:
-            if not self.nlp:
-                return {'error': 'spaCy model not available'}
-            
-            doc = self.nlp(text)
+            if doc is None:
+                if not self.nlp:
+                    return {'error': 'spaCy model not available'}
+                
+                doc = self.nlp(text)
             
             # Extract entities
             entities = []
@@ -521,14 +642,18 @@ class SemanticMedicalClassifier:
             logger.error(f"Error extracting clinical entities: {str(e)}")
             return {}
     
-    def _analyze_temporal_urgency(self, text: str) -> Dict[str, Any]:
+    def _analyze_temporal_urgency(self, text: str, pattern_hits: Optional[Dict[str, Dict[int, List[Any]]]] = None) -> Dict[str, Any]:
         """Analyze temporal urgency indicators"""
         try:
+            if pattern_hits is None:
+                pattern_hits = self.pattern_bank.scan(text)
+            
             temporal_indicators = []
             
             for temporal_type, data in self.temporal_patterns.items():
-                for pattern in data['patterns']:
-                    matches = re.findall(pattern, text, re.IGNORECASE)
+                pattern_matches = pattern_hits[f"temporal:{temporal_type}"]
+                for index, pattern in enumerate(data['patterns']):
+                    matches = pattern_matches.get(index)
                     if matches:
                         temporal_indicators.append({
                             'type': temporal_type,
@@ -688,6 +813,27 @@ class SemanticMedicalClassifier:
             logger.warning(f"Error generating explanation: {str(e)}")
             return "Explicación no disponible"
     
+    def benchmark_pattern_matching(self, texts: Optional[List[str]] = None, iterations: int = 200) -> Dict[str, Any]:
+        """
+        Measure the per-email cost of the pattern bank against per-pattern re calls
+        
+        Args:
+            texts: Raw email texts (defaults to BENCHMARK_SAMPLE_TEXTS)
+            iterations: Passes over the texts
+            
+        Returns:
+            Dict: Per-email microseconds of both approaches, speedup and whether
+                  the matches were identical
+        """
+        processed_texts = [self._preprocess_text(text) for text in (texts or BENCHMARK_SAMPLE_TEXTS)]
+        
+        return benchmark_pattern_bank(
+            self.pattern_bank.pattern_sets,
+            processed_texts,
+            iterations=iterations,
+            bank=self.pattern_bank
+        )
+    
     def _get_spanish_stopwords(self) -> List[str]:
         """Get Spanish stopwords for TF-IDF"""
         return [
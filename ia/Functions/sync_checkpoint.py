@@ -0,0 +1,112 @@
+"""
+Sync Checkpoint Module
+Persists per-folder IMAP UIDVALIDITY / last-UID high-water marks
+so incremental syncs resume exactly where they stopped
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class SyncCheckpointStore:
+    """
+    JSON-backed store of per-folder sync checkpoints
+    """
+    
+    def __init__(self, checkpoint_file: str):
+        """
+        Initialize checkpoint store
+        
+        Args:
+            checkpoint_file: Path of the JSON file holding the checkpoints
+        """
+        self.checkpoint_file = checkpoint_file
+        self.lock = threading.Lock()
+        self.checkpoints = self._load()
+    
+    def _load(self) -> Dict[str, Any]:
+        """Load checkpoints from disk"""
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading sync checkpoints, starting fresh: {str(e)}")
+            return {}
+    
+    def _save(self):
+        """Write checkpoints atomically (temp file + rename)"""
+        directory = os.path.dirname(self.checkpoint_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        temp_file = f"{self.checkpoint_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoints, f, indent=2)
+        os.replace(temp_file, self.checkpoint_file)
+    
+    def get_last_uid(self, folder: str, uid_validity: int) -> Optional[int]:
+        """
+        Get the last processed UID for a folder
+        
+        Args:
+            folder: Folder name
+            uid_validity: Current UIDVALIDITY reported by the server
+            
+        Returns:
+            Optional[int]: Last processed UID, or None when there is no usable
+            checkpoint (never synced, or UIDVALIDITY changed and UIDs were reset)
+        """
+        with self.lock:
+            checkpoint = self.checkpoints.get(folder)
+        
+        if not checkpoint:
+            return None
+        
+        if checkpoint.get('uid_validity') != uid_validity:
+            logger.warning(
+                f"UIDVALIDITY changed for {folder} "
+                f"({checkpoint.get('uid_validity')} -> {uid_validity}), discarding checkpoint"
+            )
+            return None
+        
+        return checkpoint.get('last_uid')
+    
+    def update(self, folder: str, uid_validity: int, last_uid: int):
+        """
+        Advance the high-water mark for a folder and persist it
+        
+        Args:
+            folder: Folder name
+            uid_validity: UIDVALIDITY the UID belongs to
+            last_uid: Highest UID fully handled
+        """
+        with self.lock:
+            checkpoint = self.checkpoints.get(folder, {})
+            
+            # Never move the mark backwards within the same UIDVALIDITY
+            if checkpoint.get('uid_validity') == uid_validity and checkpoint.get('last_uid', 0) >= last_uid:
+                return
+            
+            self.checkpoints[folder] = {
+                'uid_validity': uid_validity,
+                'last_uid': last_uid,
+                'updated_at': datetime.now().isoformat()
+            }
+            
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"Error saving sync checkpoint for {folder}: {str(e)}")
+    
+    def get_checkpoint(self, folder: str) -> Dict[str, Any]:
+        """Get the raw checkpoint for a folder"""
+        with self.lock:
+            return dict(self.checkpoints.get(folder, {}))
@@ -0,0 +1,184 @@
+"""
+Extracted Text Cache Module
+Persistent cache of attachment text keyed by content hash and extractor version
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ExtractedTextCache:
+    """
+    SQLite-backed, size-bounded LRU cache of extracted text
+
+    Entries are keyed by the SHA-256 of the attachment bytes plus an
+    extractor version, so identical attachments are only OCR'd or parsed
+    once and a change in extraction logic invalidates old entries. When the
+    stored text exceeds max_size_mb the least recently used entries are evicted.
+    """
+
+    def __init__(self, db_path: str, max_size_mb: int = 512):
+        """
+        Initialize text cache
+
+        Args:
+            db_path: Path of the SQLite cache file
+            max_size_mb: Maximum total size of cached text in MB
+        """
+        self.db_path = db_path
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Pool worker processes open the same file; WAL lets them read while one writes
+        self._connection = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._init_database()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    def _init_database(self):
+        """Create the cache table"""
+        with self.lock:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS extracted_text (
+                    content_hash TEXT,
+                    extractor_version TEXT,
+                    text TEXT,
+                    size_bytes INTEGER,
+                    last_access REAL,
+                    PRIMARY KEY (content_hash, extractor_version)
+                )
+            ''')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_text_last_access ON extracted_text(last_access)'
+            )
+            self._connection.commit()
+
+    def get(self, content_hash: str, extractor_version: str) -> Optional[str]:
+        """
+        Look up cached text
+
+        Args:
+            content_hash: SHA-256 of the attachment bytes
+            extractor_version: Version tag of the extraction logic
+
+        Returns:
+            Optional[str]: Cached text, or None on a miss
+        """
+        try:
+            with self.lock:
+                row = self._connection.execute(
+                    'SELECT text FROM extracted_text WHERE content_hash = ? AND extractor_version = ?',
+                    (content_hash, extractor_version)
+                ).fetchone()
+
+                if row is None:
+                    self.stats['misses'] += 1
+                    return None
+
+                self._connection.execute(
+                    'UPDATE extracted_text SET last_access = ? WHERE content_hash = ? AND extractor_version = ?',
+                    (time.time(), content_hash, extractor_version)
+                )
+                self._connection.commit()
+                self.stats['hits'] += 1
+                return row[0]
+
+        except Exception as e:
+            logger.warning(f"Error reading text cache: {str(e)}")
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, content_hash: str, extractor_version: str, text: str):
+        """
+        Store extracted text, evicting least recently used entries when over budget
+
+        Args:
+            content_hash: SHA-256 of the attachment bytes
+            extractor_version: Version tag of the extraction logic
+            text: Extracted text
+        """
+        size_bytes = len(text.encode('utf-8', errors='replace'))
+        if size_bytes > self.max_size_bytes:
+            return
+
+        try:
+            with self.lock:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO extracted_text VALUES (?, ?, ?, ?, ?)',
+                    (content_hash, extractor_version, text, size_bytes, time.time())
+                )
+                self.stats['stores'] += 1
+                self._evict()
+                self._connection.commit()
+
+        except Exception as e:
+            logger.warning(f"Error writing text cache: {str(e)}")
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is under budget (lock held)"""
+        total_bytes = self._connection.execute(
+            'SELECT COALESCE(SUM(size_bytes), 0) FROM extracted_text'
+        ).fetchone()[0]
+
+        if total_bytes <= self.max_size_bytes:
+            return
+
+        # Evict down to 90% so the next few stores do not trigger another pass
+        target_bytes = self.max_size_bytes * 0.9
+        rows = self._connection.execute(
+            'SELECT content_hash, extractor_version, size_bytes FROM extracted_text ORDER BY last_access'
+        )
+
+        victims = []
+        for content_hash, extractor_version, size_bytes in rows:
+            if total_bytes <= target_bytes:
+                break
+            victims.append((content_hash, extractor_version))
+            total_bytes -= size_bytes
+
+        self._connection.executemany(
+            'DELETE FROM extracted_text WHERE content_hash = ? AND extractor_version = ?',
+            victims
+        )
+        self.stats['evictions'] += len(victims)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics (hits, misses, hit rate, size)"""
+        with self.lock:
+            entries, total_bytes = self._connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM extracted_text'
+            ).fetchone()
+
+        lookups = self.stats['hits'] + self.stats['misses']
+
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': total_bytes,
+            'max_size_bytes': self.max_size_bytes
+        }
+
+    def close(self):
+        """Close the cache database"""
+        if self._connection:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
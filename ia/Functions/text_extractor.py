@@ -6,27 +6,51 @@ Extracts text from various file formats and email bodies
 import email
 import os
 import re
+import hashlib
 import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Callable
 from email.message import Message
 import logging
 import mimetypes
 
 logger = logging.getLogger(__name__)
 
+# Per-process extractor reused by pool workers (see extract_text_in_worker)
+_worker_extractor = None
+
+# Bump whenever extraction output changes so cached text is not reused
+EXTRACTOR_VERSION = "2"
+
 class TextExtractor:
     """
     Extracts text from various sources including email bodies and attachments
     """
     
-    def __init__(self, base_path: str):
+    def __init__(
+        self,
+        base_path: str,
+        text_cache=None,
+        pdf_max_pages: int = 0,
+        pdf_max_chars: int = 0,
+        ocr_engine=None
+    ):
         """
         Initialize text extractor
         
         Args:
             base_path: Base path for the ia folder
+            text_cache: Optional ExtractedTextCache consulted before extracting
+                        attachment text
+            pdf_max_pages: Default page budget for PDF extraction (0 = unlimited)
+            pdf_max_chars: Default character budget for PDF extraction (0 = unlimited)
+            ocr_engine: Optional PageOCREngine; enables per-page OCR of scanned
+                        PDF pages and preprocessed OCR of images
         """
         self.base_path = base_path
+        self.text_cache = text_cache
+        self.pdf_max_pages = pdf_max_pages
+        self.pdf_max_chars = pdf_max_chars
+        self.ocr_engine = ocr_engine
         self.text_path = os.path.join(base_path, "Text")
         os.makedirs(self.text_path, exist_ok=True)
     
@@ -248,48 +272,179 @@ class TextExtractor:
             logger.error(f"Error converting HTML to text: {str(e)}")
             return ""
     
-    def extract_from_pdf(self, file_path: str) -> str:
+    def iter_pdf_pages(self, file_path: Optional[str] = None, pdf_reader=None) -> Iterator[Tuple[int, int, str]]:
         """
-        Extract text from PDF file
+        Lazily extract a PDF one page at a time
+        
+        Pages are only parsed when the consumer asks for them, so stopping
+        the iteration skips the remaining pages entirely.
+        
+        Args:
+            file_path: Path to PDF file (opened with PyPDF2, or pdfplumber as fallback)
+            pdf_reader: Already parsed PyPDF2 reader, used instead of file_path
+            
+        Yields:
+            Tuple[int, int, str]: (page number starting at 1, total pages, raw page text)
+        """
+        if pdf_reader is not None:
+            total_pages = len(pdf_reader.pages)
+            for page_index, page in enumerate(pdf_reader.pages):
+                yield page_index + 1, total_pages, page.extract_text() or ""
+            return
+        
+        # Try PyPDF2 first
+        try:
+            import PyPDF2
+        except ImportError:
+            PyPDF2 = None
+        
+        if PyPDF2 is not None:
+            with open(file_path, 'rb') as file:
+                for page in self.iter_pdf_pages(pdf_reader=PyPDF2.PdfReader(file)):
+                    yield page
+            return
+        
+        # Try pdfplumber as alternative
+        try:
+            import pdfplumber
+        except ImportError:
+            logger.warning(f"No PDF extraction library available for {file_path}")
+            return
+        
+        with pdfplumber.open(file_path) as pdf:
+            total_pages = len(pdf.pages)
+            for page_index, page in enumerate(pdf.pages):
+                yield page_index + 1, total_pages, page.extract_text() or ""
+    
+    def extract_pdf_pages(
+        self,
+        file_path: Optional[str] = None,
+        pdf_reader=None,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        should_stop: Optional[Callable[[int, str], bool]] = None,
+        content_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract PDF text page by page within page and character budgets
+        
+        Each page is cleaned on its own and collected in a list that is
+        joined once at the end. With an OCR engine, pages within the budget
+        whose text layer is not good enough are OCR'd afterwards in parallel.
         
         Args:
             file_path: Path to PDF file
+            pdf_reader: Already parsed PyPDF2 reader, used instead of file_path
+            max_pages: Maximum pages to read (defaults to the extractor's
+                       pdf_max_pages; 0 means no limit)
+            max_chars: Maximum characters to collect (defaults to pdf_max_chars;
+                       0 means no limit)
+            should_stop: Early-exit hook called as should_stop(page_number, page_text)
+                         after each page with its text-layer content; returning
+                         True stops extraction
+            content_hash: SHA-256 of the PDF, keys the OCR preprocessing cache
             
         Returns:
-            str: Extracted text
+            Dict: text, pages_total, pages_read, pages_skipped, pages_ocr,
+                  truncated (a budget was hit) and stopped_early (the hook stopped it)
         """
+        max_pages = self.pdf_max_pages if max_pages is None else max_pages
+        max_chars = self.pdf_max_chars if max_chars is None else max_chars
+        
+        result = {
+            'text': '',
+            'pages_total': 0,
+            'pages_read': 0,
+            'pages_skipped': 0,
+            'pages_ocr': 0,
+            'truncated': False,
+            'stopped_early': False
+        }
+        
+        page_texts = []
+        ocr_pages = []
+        char_count = 0
+        can_ocr = self.ocr_engine is not None and bool(file_path)
+        
         try:
-            # Try PyPDF2 first
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
-                    return self.clean_text(text)
-            except ImportError:
-                pass
-            
-            # Try pdfplumber as alternative
-            try:
-                import pdfplumber
-                with pdfplumber.open(file_path) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                    return self.clean_text(text)
-            except ImportError:
-                pass
-            
-            logger.warning(f"No PDF extraction library available for {file_path}")
-            return ""
+            for page_number, total_pages, raw_text in self.iter_pdf_pages(file_path, pdf_reader):
+                result['pages_total'] = total_pages
+                result['pages_read'] += 1
+                
+                page_text = self.clean_text(raw_text)
+                if can_ocr and not self.ocr_engine.text_layer_is_sufficient(page_text):
+                    # Placeholder, filled in by OCR once the page budget is known
+                    ocr_pages.append(len(page_texts))
+                    page_texts.append((page_number, page_text))
+                else:
+                    if max_chars and char_count + len(page_text) > max_chars:
+                        page_text = page_text[:max(0, max_chars - char_count)]
+                        result['truncated'] = True
+                    
+                    if page_text:
+                        page_texts.append((page_number, page_text))
+                        char_count += len(page_text) + 1
+                
+                if result['truncated']:
+                    break
+                
+                if max_pages and result['pages_read'] >= max_pages and page_number < total_pages:
+                    result['truncated'] = True
+                    break
+                
+                if should_stop is not None and should_stop(page_number, page_text):
+                    result['stopped_early'] = page_number < total_pages
+                    break
             
         except Exception as e:
-            logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
-            return ""
+            logger.error(f"Error extracting text from PDF {file_path or 'document'}: {str(e)}")
+        
+        if ocr_pages:
+            ocr_texts = self.ocr_engine.ocr_pdf_pages(
+                file_path, [page_texts[index][0] for index in ocr_pages], content_hash=content_hash
+            )
+            for index in ocr_pages:
+                page_number, layer_text = page_texts[index]
+                ocr_text = self.clean_text(ocr_texts.get(page_number, ''))
+                page_texts[index] = (page_number, ocr_text if len(ocr_text) > len(layer_text) else layer_text)
+            result['pages_ocr'] = len(ocr_pages)
+        
+        result['text'] = "\n".join(text for _, text in page_texts if text)
+        if max_chars and len(result['text']) > max_chars:
+            result['text'] = result['text'][:max_chars]
+            result['truncated'] = True
+        result['pages_skipped'] = max(0, result['pages_total'] - result['pages_read'])
+        
+        if result['pages_skipped']:
+            logger.info(
+                f"PDF extraction read {result['pages_read']}/{result['pages_total']} pages "
+                f"({result['pages_skipped']} skipped)"
+            )
+        
+        return result
+    
+    def extract_from_pdf(
+        self,
+        file_path: str,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        should_stop: Optional[Callable[[int, str], bool]] = None
+    ) -> str:
+        """
+        Extract text from PDF file
+        
+        Args:
+            file_path: Path to PDF file
+            max_pages: Page budget (see extract_pdf_pages)
+            max_chars: Character budget (see extract_pdf_pages)
+            should_stop: Early-exit hook (see extract_pdf_pages)
+            
+        Returns:
+            str: Extracted text
+        """
+        return self.extract_pdf_pages(
+            file_path, max_pages=max_pages, max_chars=max_chars, should_stop=should_stop
+        )['text']
     
     def extract_from_docx(self, file_path: str) -> str:
         """
@@ -363,6 +518,9 @@ class TextExtractor:
         Returns:
             str: Extracted text
         """
+        if self.ocr_engine is not None:
+            return self.clean_text(self.ocr_engine.ocr_image(file_path))
+        
         try:
             import pytesseract
             from PIL import Image
@@ -382,6 +540,8 @@ class TextExtractor:
         """
         Extract text from file based on its type
         
+        The text cache, when configured, is consulted first.
+        
         Args:
             file_path: Path to file
             
@@ -391,6 +551,56 @@ class TextExtractor:
         if not os.path.exists(file_path):
             return ""
         
+        if self.text_cache is None:
+            return self._extract_file_by_type(file_path)
+        
+        content_hash = self._hash_file(file_path)
+        cached = self._get_cached_text(content_hash, file_path)
+        if cached is not None:
+            return cached
+        
+        text = self._extract_file_by_type(file_path)
+        self._cache_text(content_hash, file_path, text)
+        return text
+    
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """SHA-256 of a file, streamed"""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+    
+    def _cache_version(self, file_path: str) -> str:
+        """Cache version tag: extractor version, the extension that selects the extractor, PDF budgets and OCR settings"""
+        ext = os.path.splitext(file_path.lower())[1]
+        ocr = self.ocr_engine.get_cache_tag() if self.ocr_engine is not None else "ocr0"
+        if ext == '.pdf':
+            return f"{EXTRACTOR_VERSION}:{ext}:{self.pdf_max_pages}:{self.pdf_max_chars}:{ocr}"
+        if ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif']:
+            return f"{EXTRACTOR_VERSION}:{ext}:{ocr}"
+        return f"{EXTRACTOR_VERSION}:{ext}"
+    
+    def _get_cached_text(self, content_hash: str, file_path: str) -> Optional[str]:
+        """Look up cached text for a file's content"""
+        if self.text_cache is None:
+            return None
+        return self.text_cache.get(content_hash, self._cache_version(file_path))
+    
+    def _cache_text(self, content_hash: str, file_path: str, text: str):
+        """Cache extracted text (empty results are not cached so failures get retried)"""
+        if self.text_cache is not None and text:
+            self.text_cache.put(content_hash, self._cache_version(file_path), text)
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Get text cache hit/miss statistics (empty when no cache is configured)"""
+        if self.text_cache is None:
+            return {}
+        return self.text_cache.get_statistics()
+    
+    def _extract_file_by_type(self, file_path: str) -> str:
+        """Extract text from a file, dispatching on its extension"""
         # Get file extension
         _, ext = os.path.splitext(file_path.lower())
         
@@ -414,6 +624,109 @@ class TextExtractor:
             logger.info(f"Unsupported file type for text extraction: {ext}")
             return ""
     
+    def extract_from_document(self, document) -> str:
+        """
+        Extract text from an AttachmentDocument
+        
+        Reuses the representations the document already parsed (PDF reader,
+        image, DOCX) instead of reopening the file.
+        
+        Args:
+            document: AttachmentDocument with the attachment bytes
+            
+        Returns:
+            str: Extracted text
+        """
+        try:
+            ext = document.extension
+            
+            cached = self._get_cached_text(document.sha256, document.filename)
+            if cached is not None:
+                document.text = cached
+                return cached
+            
+            text = None
+            
+            if ext == '.pdf' and document.pdf_reader is not None:
+                document.pdf_stats = self.extract_pdf_pages(
+                    file_path=document.file_path, pdf_reader=document.pdf_reader, content_hash=document.sha256
+                )
+                text = document.pdf_stats['text']
+            elif ext == '.docx' and document.docx_document is not None:
+                text = self.clean_text("\n".join(p.text for p in document.docx_document.paragraphs))
+            elif ext in ['.txt', '.log', '.csv']:
+                text = self.clean_text(document.data.decode('utf-8', errors='ignore'))
+            elif ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif'] and self.ocr_engine is not None and document.file_path:
+                text = self.clean_text(self.ocr_engine.ocr_image(document.file_path, document.sha256))
+            elif ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif'] and document.image is not None:
+                try:
+                    import pytesseract
+                    text = self.clean_text(pytesseract.image_to_string(document.image))
+                except ImportError:
+                    logger.warning(f"OCR libraries not available for {document.filename}")
+                    text = ""
+            
+            # Formats (or missing parsers) without an in-memory path fall back to the saved file
+            if text is None:
+                text = ""
+                if document.file_path and os.path.exists(document.file_path):
+                    text = self._extract_file_by_type(document.file_path)
+            
+            self._cache_text(document.sha256, document.filename, text)
+            document.text = text
+            return text
+            
+        except Exception as e:
+            logger.error(f"Error extracting text from {document.filename}: {str(e)}")
+            return ""
+    
+    def extract_from_files(self, file_paths: List[str], executor=None) -> List[str]:
+        """
+        Extract text from several files, optionally on a process pool
+        
+        PDF parsing, OCR and spreadsheet reading are CPU-bound and serialized
+        by the GIL under threads; a ProcessPoolExecutor runs them on separate
+        cores. Only the file paths are shipped to the workers; the text cache
+        is checked here first so cached files never reach the pool.
+        
+        Args:
+            file_paths: Paths of the files to extract
+            executor: Optional ProcessPoolExecutor; extraction runs inline when None
+            
+        Returns:
+            List[str]: Extracted text per file, in input order ("" on failure)
+        """
+        if executor is None:
+            return [self.extract_from_file(file_path) for file_path in file_paths]
+        
+        texts = [""] * len(file_paths)
+        pending = []
+        
+        for index, file_path in enumerate(file_paths):
+            if not os.path.exists(file_path):
+                continue
+            
+            content_hash = self._hash_file(file_path) if self.text_cache is not None else None
+            cached = self._get_cached_text(content_hash, file_path) if content_hash else None
+            if cached is not None:
+                texts[index] = cached
+            else:
+                future = executor.submit(
+                    extract_text_in_worker, self.base_path, file_path, self.pdf_max_pages, self.pdf_max_chars,
+                    self.ocr_engine.get_settings() if self.ocr_engine is not None else None
+                )
+                pending.append((index, file_path, content_hash, future))
+        
+        for index, file_path, content_hash, future in pending:
+            try:
+                texts[index] = future.result()
+                if content_hash:
+                    self._cache_text(content_hash, file_path, texts[index])
+            except Exception as e:
+                logger.error(f"Error extracting text from {file_path} in worker process: {str(e)}")
+        
+        return texts
+    
     def save_extracted_text(self, unique_id: str, content: Dict[str, Any]) -> str:
         """
         Save extracted text content to professionally formatted file
@@ -809,3 +1122,40 @@ class TextExtractor:
             result['extraction_time'] = time.time() - start_time
 
         return result
+
+
+def extract_text_in_worker(
+    base_path: str,
+    file_path: str,
+    pdf_max_pages: int = 0,
+    pdf_max_chars: int = 0,
+    ocr_settings: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Process-pool entry point for text extraction
+
+    Args:
+        base_path: Base path for the ia folder
+        file_path: Path to the file to extract
+        pdf_max_pages: PDF page budget (0 = unlimited)
+        pdf_max_chars: PDF character budget (0 = unlimited)
+        ocr_settings: PageOCREngine settings; OCR then runs inline in this worker
+
+    Returns:
+        str: Extracted text
+    """
+    global _worker_extractor
+
+    if _worker_extractor is None or _worker_extractor.base_path != base_path:
+        _worker_extractor = TextExtractor(base_path)
+
+    _worker_extractor.pdf_max_pages = pdf_max_pages
+    _worker_extractor.pdf_max_chars = pdf_max_chars
+
+    if ocr_settings is None:
+        _worker_extractor.ocr_engine = None
+    elif _worker_extractor.ocr_engine is None or _worker_extractor.ocr_engine.get_settings() != ocr_settings:
+        from ocr_engine import PageOCREngine
+        _worker_extractor.ocr_engine = PageOCREngine(base_path, max_workers=0, **ocr_settings)
+
+    return _worker_extractor.extract_from_file(file_path)
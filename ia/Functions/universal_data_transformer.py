@@ -7,12 +7,17 @@ import os
 import json
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable
 import logging
-from gmail_to_medical_transformer import GmailToMedicalTransformer
+from gmail_to_medical_transformer import GmailToMedicalTransformer, CASE_FIELDS
+from keyword_automaton import KeywordAutomaton
+from analysis_context import AnalysisContext
 
 logger = logging.getLogger(__name__)
 
+# Views built by route_emails, in dispatch order
+ROUTED_VIEWS = ('medical', 'admin', 'patient', 'urgency', 'hospitalization')
+
 class UniversalDataTransformer:
     """
     Transforms Gmail data into multiple data types for different application views
@@ -44,18 +49,104 @@ class UniversalDataTransformer:
             'hospitalización', 'hospitalization', 'ingreso', 'admission', 'alta', 'discharge',
             'cama', 'bed', 'habitación', 'room', 'piso', 'floor', 'unidad', 'unit'
         ]
+        
+        # Keywords for record categories within a view
+        self.category_keywords = {
+            'admin_financial': ['facturación', 'billing', 'presupuesto', 'budget'],
+            'admin_staff': ['personal', 'staff', 'recursos', 'resources'],
+            'admin_reports': ['reporte', 'report', 'estadística', 'statistics'],
+            'patient_followup': ['seguimiento', 'follow-up', 'control'],
+            'patient_appointment': ['cita', 'appointment'],
+            'patient_medication': ['medicamento', 'medication'],
+            'urgency_critical': ['crítico', 'critical', 'paro', 'arrest'],
+            'urgency_urgent': ['urgente', 'urgent', 'emergencia', 'emergency']
+        }
+        
+        # Every keyword set matched in a single scan per email
+        self.keyword_automaton = KeywordAutomaton({
+            'medical': self.medical_transformer.medical_keywords,
+            'admin': self.admin_keywords,
+            'patient': self.patient_keywords,
+            'urgency': self.urgency_keywords,
+            'hospitalization': self.hospitalization_keywords,
+            **self.category_keywords
+        })
+    
+    def route_emails(self, emails: Iterable[Dict[str, Any]], views: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Build the records of several views in a single pass over the emails
+        
+        Each email's text is extracted and lowercased once, and all keyword
+        sets (view routing, medical detection and record categories) are
+        matched in one automaton scan. The email is then handed to the record
+        builder of every view it belongs to.
+        
+        Args:
+            emails: Processed emails (a list or a lazy iterator, consumed once)
+            views: Views to build (defaults to ROUTED_VIEWS)
+            
+        Returns:
+            Dict[str, List]: Records per view, in email order ('medical' holds medical cases)
+        """
+        views = ROUTED_VIEWS if views is None else [view for view in ROUTED_VIEWS if view in views]
+        routed = {view: [] for view in views}
+        
+        builders = {
+            'medical': lambda email, context, found: self.medical_transformer.transform_email_to_medical_case(email, context),
+            'admin': self._transform_to_admin_record,
+            'patient': self._transform_to_patient_record,
+            'urgency': self._transform_to_urgency_record,
+            'hospitalization': self._transform_to_hospitalization_record
+        }
+        
+        total = 0
+        for email in emails:
+            total += 1
+            try:
+                context = AnalysisContext(self._get_email_text(email))
+                found = self._match_categories(context.lower)
+                
+                for view in views:
+                    if view == 'medical':
+                        applies = found.get('medical', 0) >= self.medical_transformer.min_medical_keywords
+                    else:
+                        applies = view in found
+                    
+                    if applies:
+                        routed[view].append(builders[view](email, context, found))
+                        
+            except Exception as e:
+                logger.error(f"Error routing email {email.get('source_path', 'unknown')}: {str(e)}")
+        
+        logger.info(f"Routed {total} emails: " + ", ".join(f"{view}={len(records)}" for view, records in routed.items()))
+        return routed
     
-    def extract_admin_data(self, emails: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _match_categories(self, text: str) -> Dict[str, int]:
+        """
+        Match every keyword set against a text
+        
+        Args:
+            text: Email text
+            
+        Returns:
+            Dict[str, int]: Number of matching keywords per category (categories without matches are omitted)
+        """
+        found = {}
+        for category, _ in self.keyword_automaton.scan(text):
+            found[category] = found.get(category, 0) + 1
+        return found
+    
+    def extract_admin_data(self, emails: List[Dict[str, Any]], records: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Extract administrative data from emails for admin dashboard
+        
+        Args:
+            emails: Processed emails
+            records: Admin records already built by route_emails (skips the scan)
         """
         try:
-            admin_emails = []
-            
-            for email in emails:
-                if self._is_admin_email(email):
-                    admin_data = self._transform_to_admin_record(email)
-                    admin_emails.append(admin_data)
+            # Records already built by route_emails, or a single-view pass
+            admin_emails = records if records is not None else self.route_emails(emails, ['admin'])['admin']
             
             # Generate admin statistics
             admin_stats = self._calculate_admin_statistics(admin_emails)
@@ -75,17 +166,17 @@ class UniversalDataTransformer:
             logger.error(f"Error extracting admin data: {str(e)}")
             return self._get_empty_admin_data()
     
-    def extract_patient_data(self, emails: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def extract_patient_data(self, emails: List[Dict[str, Any]], records: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Extract patient-related data from emails
+        
+        Args:
+            emails: Processed emails
+            records: Patient records already built by route_emails (skips the scan)
         """
         try:
-            patient_emails = []
-            
-            for email in emails:
-                if self._is_patient_email(email):
-                    patient_data = self._transform_to_patient_record(email)
-                    patient_emails.append(patient_data)
+            # Records already built by route_emails, or a single-view pass
+            patient_emails = records if records is not None else self.route_emails(emails, ['patient'])['patient']
             
             # Generate patient statistics
             patient_stats = self._calculate_patient_statistics(patient_emails)
@@ -105,17 +196,17 @@ class UniversalDataTransformer:
             logger.error(f"Error extracting patient data: {str(e)}")
             return self._get_empty_patient_data()
     
-    def extract_urgency_data(self, emails: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def extract_urgency_data(self, emails: List[Dict[str, Any]], records: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Extract urgency/emergency data from emails
+        
+        Args:
+            emails: Processed emails
+            records: Urgency records already built by route_emails (skips the scan)
         """
         try:
-            urgency_emails = []
-            
-            for email in emails:
-                if self._is_urgency_email(email):
-                    urgency_data = self._transform_to_urgency_record(email)
-                    urgency_emails.append(urgency_data)
+            # Records already built by route_emails, or a single-view pass
+            urgency_emails = records if records is not None else self.route_emails(emails, ['urgency'])['urgency']
             
             # Generate urgency statistics
             urgency_stats = self._calculate_urgency_statistics(urgency_emails)
@@ -135,17 +226,17 @@ class UniversalDataTransformer:
             logger.error(f"Error extracting urgency data: {str(e)}")
             return self._get_empty_urgency_data()
     
-    def extract_hospitalization_data(self, emails: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def extract_hospitalization_data(self, emails: List[Dict[str, Any]], records: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Extract hospitalization data from emails
+        
+        Args:
+            emails: Processed emails
+            records: Hospitalization records already built by route_emails (skips the scan)
         """
         try:
-            hospitalization_emails = []
-            
-            for email in emails:
-                if self._is_hospitalization_email(email):
-                    hosp_data = self._transform_to_hospitalization_record(email)
-                    hospitalization_emails.append(hosp_data)
+            # Records already built by route_emails, or a single-view pass
+            hospitalization_emails = records if records is not None else self.route_emails(emails, ['hospitalization'])['hospitalization']
             
             # Generate hospitalization statistics
             hosp_stats = self._calculate_hospitalization_statistics(hospitalization_emails)
@@ -165,13 +256,19 @@ class UniversalDataTransformer:
             logger.error(f"Error extracting hospitalization data: {str(e)}")
             return self._get_empty_hospitalization_data()
     
-    def extract_historical_data(self, emails: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def extract_historical_data(self, emails: List[Dict[str, Any]], medical_cases: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Extract historical data for reports and analytics
+        
+        Args:
+            emails: Processed emails
+            medical_cases: Medical cases already built by route_emails
+                           (reloaded and transformed from disk when omitted)
         """
         try:
             # Get all medical cases first
-            medical_cases = self.medical_transformer.transform_all_medical_emails()
+            if medical_cases is None:
+                medical_cases = self.medical_transformer.transform_all_medical_emails()
             
             # Transform to historical records
             historical_records = []
@@ -199,23 +296,19 @@ class UniversalDataTransformer:
     
     def _is_admin_email(self, email: Dict[str, Any]) -> bool:
         """Check if email contains administrative content"""
-        text_content = self._get_email_text(email)
-        return any(keyword in text_content.lower() for keyword in self.admin_keywords)
+        return 'admin' in self._match_categories(self._get_email_text(email))
     
     def _is_patient_email(self, email: Dict[str, Any]) -> bool:
         """Check if email contains patient-related content"""
-        text_content = self._get_email_text(email)
-        return any(keyword in text_content.lower() for keyword in self.patient_keywords)
+        return 'patient' in self._match_categories(self._get_email_text(email))
     
     def _is_urgency_email(self, email: Dict[str, Any]) -> bool:
         """Check if email contains urgency/emergency content"""
-        text_content = self._get_email_text(email)
-        return any(keyword in text_content.lower() for keyword in self.urgency_keywords)
+        return 'urgency' in self._match_categories(self._get_email_text(email))
     
     def _is_hospitalization_email(self, email: Dict[str, Any]) -> bool:
         """Check if email contains hospitalization content"""
-        text_content = self._get_email_text(email)
-        return any(keyword in text_content.lower() for keyword in self.hospitalization_keywords)
+        return 'hospitalization' in self._match_categories(self._get_email_text(email))
     
     def _get_email_text(self, email: Dict[str, Any]) -> str:
         """Extract text content from email regardless of schema type"""
@@ -234,9 +327,14 @@ class UniversalDataTransformer:
         except Exception:
             return ""
     
-    def _transform_to_admin_record(self, email: Dict[str, Any]) -> Dict[str, Any]:
-        """Transform email to admin record"""
-        text_content = self._get_email_text(email)
+    def _transform_to_admin_record(
+        self,
+        email: Dict[str, Any],
+        context: Optional[AnalysisContext] = None,
+        found: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Transform email to admin record (context and keyword matches are reused from route_emails)"""
+        text_content = context.text if context is not None else self._get_email_text(email)
         
         return {
             'id': f"ADM-{email.get('document_identification', {}).get('unique_identifier', 'unknown')[-8:]}",
@@ -244,8 +342,8 @@ class UniversalDataTransformer:
             'subject': self._extract_subject(email),
             'sender': self._extract_sender(email),
             'date': self._extract_date(email),
-            'category': self._determine_admin_category(text_content),
-            'priority': self._determine_priority(text_content),
+            'category': self._determine_admin_category(text_content, found),
+            'priority': self._determine_priority(text_content, context),
             'status': 'Pendiente',
             'summary': text_content[:200] + '...' if len(text_content) > 200 else text_content,
             'emailSource': {
@@ -255,50 +353,65 @@ class UniversalDataTransformer:
             }
         }
     
-    def _transform_to_patient_record(self, email: Dict[str, Any]) -> Dict[str, Any]:
-        """Transform email to patient record"""
-        text_content = self._get_email_text(email)
+    def _transform_to_patient_record(
+        self,
+        email: Dict[str, Any],
+        context: Optional[AnalysisContext] = None,
+        found: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Transform email to patient record (context and keyword matches are reused from route_emails)"""
+        text_content = context.text if context is not None else self._get_email_text(email)
         
         return {
             'id': f"PAT-{email.get('document_identification', {}).get('unique_identifier', 'unknown')[-8:]}",
-            'patientName': self._extract_patient_name(text_content),
-            'patientId': self._extract_patient_id(text_content),
+            'patientName': self._extract_patient_name(text_content, context),
+            'patientId': self._extract_patient_id(text_content, context),
             'type': 'patient_communication',
             'subject': self._extract_subject(email),
             'sender': self._extract_sender(email),
             'date': self._extract_date(email),
-            'category': self._determine_patient_category(text_content),
+            'category': self._determine_patient_category(text_content, found),
             'status': 'Activo',
             'summary': text_content[:200] + '...' if len(text_content) > 200 else text_content
         }
     
-    def _transform_to_urgency_record(self, email: Dict[str, Any]) -> Dict[str, Any]:
-        """Transform email to urgency record"""
-        text_content = self._get_email_text(email)
+    def _transform_to_urgency_record(
+        self,
+        email: Dict[str, Any],
+        context: Optional[AnalysisContext] = None,
+        found: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Transform email to urgency record (context and keyword matches are reused from route_emails)"""
+        text_content = context.text if context is not None else self._get_email_text(email)
         
         return {
             'id': f"URG-{email.get('document_identification', {}).get('unique_identifier', 'unknown')[-8:]}",
-            'patientName': self._extract_patient_name(text_content),
-            'urgencyLevel': self._determine_urgency_level(text_content),
-            'condition': self._extract_condition(text_content),
+            'patientName': self._extract_patient_name(text_content, context),
+            'urgencyLevel': self._determine_urgency_level(text_content, found),
+            'condition': self._extract_condition(text_content, context),
             'arrivalTime': self._extract_date(email),
-            'triageCategory': self._determine_triage_category(text_content),
+            'triageCategory': self._determine_triage_category(text_content, found),
             'status': 'En Triaje',
             'location': self._extract_location(text_content),
             'summary': text_content[:200] + '...' if len(text_content) > 200 else text_content
         }
     
-    def _transform_to_hospitalization_record(self, email: Dict[str, Any]) -> Dict[str, Any]:
-        """Transform email to hospitalization record"""
-        text_content = self._get_email_text(email)
+    def _transform_to_hospitalization_record(
+        self,
+        email: Dict[str, Any],
+        context: Optional[AnalysisContext] = None,
+        found: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Transform email to hospitalization record (context and keyword matches are reused from route_emails)"""
+        text_content = context.text if context is not None else self._get_email_text(email)
         
         return {
             'id': f"HOSP-{email.get('document_identification', {}).get('unique_identifier', 'unknown')[-8:]}",
-            'patientName': self._extract_patient_name(text_content),
+            'patientName': self._extract_patient_name(text_content, context),
             'admissionDate': self._extract_date(email),
             'ward': self._extract_ward(text_content),
             'bedNumber': self._extract_bed_number(text_content),
-            'condition': self._extract_condition(text_content),
+            'condition': self._extract_condition(text_content, context),
             'status': 'Hospitalizado',
             'expectedDischarge': self._calculate_expected_discharge(self._extract_date(email)),
             'summary': text_content[:200] + '...' if len(text_content) > 200 else text_content
@@ -346,17 +459,17 @@ class UniversalDataTransformer:
         else:
             return email.get('metadata', {}).get('date', '')
     
-    def _extract_patient_name(self, text: str) -> str:
+    def _extract_patient_name(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extract patient name from text"""
-        return self.medical_transformer._extract_patient_name(text)
+        return self.medical_transformer._extract_patient_name(text, context)
     
-    def _extract_patient_id(self, text: str) -> str:
+    def _extract_patient_id(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extract patient ID from text"""
-        return self.medical_transformer._extract_patient_id(text)
+        return self.medical_transformer._extract_patient_id(text, context)
     
-    def _extract_condition(self, text: str) -> str:
+    def _extract_condition(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Extract medical condition from text"""
-        return self.medical_transformer._extract_diagnosis(text)
+        return self.medical_transformer._extract_diagnosis(text, context)
     
     def _extract_location(self, text: str) -> str:
         """Extract location from text"""
@@ -416,46 +529,46 @@ class UniversalDataTransformer:
         return (datetime.now() + timedelta(days=5)).isoformat()
     
     # Category determination methods
-    def _determine_admin_category(self, text: str) -> str:
+    def _determine_admin_category(self, text: str, found: Optional[Dict[str, int]] = None) -> str:
         """Determine administrative category"""
-        text_lower = text.lower()
+        found = self._match_categories(text) if found is None else found
         
-        if any(word in text_lower for word in ['facturación', 'billing', 'presupuesto', 'budget']):
+        if 'admin_financial' in found:
             return 'Financiero'
-        elif any(word in text_lower for word in ['personal', 'staff', 'recursos', 'resources']):
+        elif 'admin_staff' in found:
             return 'Recursos Humanos'
-        elif any(word in text_lower for word in ['reporte', 'report', 'estadística', 'statistics']):
+        elif 'admin_reports' in found:
             return 'Reportes'
         else:
             return 'General'
     
-    def _determine_patient_category(self, text: str) -> str:
+    def _determine_patient_category(self, text: str, found: Optional[Dict[str, int]] = None) -> str:
         """Determine patient category"""
-        text_lower = text.lower()
+        found = self._match_categories(text) if found is None else found
         
-        if any(word in text_lower for word in ['seguimiento', 'follow-up', 'control']):
+        if 'patient_followup' in found:
             return 'Seguimiento'
-        elif any(word in text_lower for word in ['cita', 'appointment']):
+        elif 'patient_appointment' in found:
             return 'Citas'
-        elif any(word in text_lower for word in ['medicamento', 'medication']):
+        elif 'patient_medication' in found:
             return 'Medicamentos'
         else:
             return 'General'
     
-    def _determine_urgency_level(self, text: str) -> str:
+    def _determine_urgency_level(self, text: str, found: Optional[Dict[str, int]] = None) -> str:
         """Determine urgency level"""
-        text_lower = text.lower()
+        found = self._match_categories(text) if found is None else found
         
-        if any(word in text_lower for word in ['crítico', 'critical', 'paro', 'arrest']):
+        if 'urgency_critical' in found:
             return 'Crítico'
-        elif any(word in text_lower for word in ['urgente', 'urgent', 'emergencia', 'emergency']):
+        elif 'urgency_urgent' in found:
             return 'Urgente'
         else:
             return 'Moderado'
     
-    def _determine_triage_category(self, text: str) -> str:
+    def _determine_triage_category(self, text: str, found: Optional[Dict[str, int]] = None) -> str:
         """Determine triage category"""
-        urgency_level = self._determine_urgency_level(text)
+        urgency_level = self._determine_urgency_level(text, found)
         
         if urgency_level == 'Crítico':
             return 'Rojo'
@@ -464,9 +577,9 @@ class UniversalDataTransformer:
         else:
             return 'Verde'
     
-    def _determine_priority(self, text: str) -> str:
+    def _determine_priority(self, text: str, context: Optional[AnalysisContext] = None) -> str:
         """Determine priority level"""
-        return self.medical_transformer.determine_priority(text)
+        return self.medical_transformer.determine_priority(text, context)
     
     # Statistics calculation methods
     def _calculate_admin_statistics(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -626,17 +739,19 @@ class UniversalDataTransformer:
             Dict containing all data types for different views
         """
         try:
-            # Load processed emails
-            emails = self.medical_transformer.load_processed_emails()
+            # Stream processed emails (only the fields the views use) and build
+            # the records of every view in one traversal
+            emails = self.medical_transformer.iter_processed_emails(fields=CASE_FIELDS)
+            routed = self.route_emails(emails)
             
-            # Extract all data types
+            # Extract all data types (records are already routed, no email list needed)
             all_data = {
-                'medical_cases': self.medical_transformer.transform_all_medical_emails(),
-                'admin_data': self.extract_admin_data(emails),
-                'patient_data': self.extract_patient_data(emails),
-                'urgency_data': self.extract_urgency_data(emails),
-                'hospitalization_data': self.extract_hospitalization_data(emails),
-                'historical_data': self.extract_historical_data(emails)
+                'medical_cases': routed['medical'],
+                'admin_data': self.extract_admin_data([], routed['admin']),
+                'patient_data': self.extract_patient_data([], routed['patient']),
+                'urgency_data': self.extract_urgency_data([], routed['urgency']),
+                'hospitalization_data': self.extract_hospitalization_data([], routed['hospitalization']),
+                'historical_data': self.extract_historical_data([], routed['medical'])
             }
             
             return all_data
@@ -14,15 +14,18 @@ class GmailConfig:
     IMAP_SERVER = "imap.gmail.com"
     IMAP_PORT = 993
     IMAP_USE_SSL = True
+    IMAP_IDLE_TIMEOUT = 300  # seconds before a pooled session is health-checked
     
     # Processing settings
     DEFAULT_FOLDER = "INBOX"
     DEFAULT_SEARCH_CRITERIA = "ALL"
     MAX_EMAILS_PER_BATCH = 100
+    FETCH_CHUNK_SIZE = 200  # messages per multi-message FETCH command
     PROCESSING_TIMEOUT = 300  # 5 minutes per email
     
     # File processing settings
     MAX_ATTACHMENT_SIZE = 50 * 1024 * 1024  # 50MB
+    ATTACHMENT_DEDUP = True  # store identical attachments once, hardlinked per email
     SUPPORTED_TEXT_FORMATS = [
         '.pdf', '.docx', '.doc', '.xlsx', '.xls', 
         '.txt', '.csv', '.log', '.rtf'
@@ -34,6 +37,15 @@ class GmailConfig:
     
     # Text extraction settings
     OCR_LANGUAGE = 'eng'  # Tesseract language
+    TEXT_CACHE_ENABLED = True  # reuse text extracted from identical attachments
+    TEXT_CACHE_MAX_MB = 512
+    PDF_MAX_PAGES = 100  # pages read per PDF attachment (0 = unlimited)
+    PDF_MAX_CHARS = 500000  # characters kept per PDF attachment (0 = unlimited)
+    OCR_ENABLED = True  # OCR scanned PDF pages and images (needs Tesseract)
+    OCR_DPI = 300
+    OCR_PROCESSES = 2  # parallel OCR processes (0 = inline)
+    OCR_MIN_TEXT_CHARS = 50  # text-layer characters that make OCR unnecessary
+    OCR_CACHE_MAX_MB = 1024  # preprocessed page cache, least recently used pages evicted
     MAX_TEXT_LENGTH = 1000000  # 1MB of text
     HTML_TO_TEXT_OPTIONS = {
         'ignore_links': True,
@@ -82,15 +94,27 @@ class GmailConfig:
         config['password'] = os.getenv('GMAIL_PASSWORD') or os.getenv('GMAIL_APP_PASSWORD')
         config['imap_server'] = os.getenv('GMAIL_IMAP_SERVER', cls.IMAP_SERVER)
         config['imap_port'] = int(os.getenv('GMAIL_IMAP_PORT', cls.IMAP_PORT))
+        config['imap_idle_timeout'] = int(os.getenv('GMAIL_IMAP_IDLE_TIMEOUT', cls.IMAP_IDLE_TIMEOUT))
         
         # Processing settings
         config['default_folder'] = os.getenv('GMAIL_DEFAULT_FOLDER', cls.DEFAULT_FOLDER)
         config['max_emails'] = int(os.getenv('MAX_EMAILS_PER_BATCH', cls.MAX_EMAILS_PER_BATCH))
         config['processing_timeout'] = int(os.getenv('PROCESSING_TIMEOUT', cls.PROCESSING_TIMEOUT))
+        config['fetch_chunk_size'] = int(os.getenv('FETCH_CHUNK_SIZE', cls.FETCH_CHUNK_SIZE))
         
         # File settings
         config['max_attachment_size'] = int(os.getenv('MAX_ATTACHMENT_SIZE', cls.MAX_ATTACHMENT_SIZE))
+        config['attachment_dedup'] = os.getenv('ENABLE_ATTACHMENT_DEDUP', str(cls.ATTACHMENT_DEDUP)).lower() == 'true'
         config['ocr_language'] = os.getenv('OCR_LANGUAGE', cls.OCR_LANGUAGE)
+        config['text_cache_enabled'] = os.getenv('TEXT_CACHE_ENABLED', str(cls.TEXT_CACHE_ENABLED)).lower() == 'true'
+        config['text_cache_max_mb'] = int(os.getenv('TEXT_CACHE_MAX_MB', cls.TEXT_CACHE_MAX_MB))
+        config['pdf_max_pages'] = int(os.getenv('PDF_MAX_PAGES', cls.PDF_MAX_PAGES))
+        config['pdf_max_chars'] = int(os.getenv('PDF_MAX_CHARS', cls.PDF_MAX_CHARS))
+        config['ocr_enabled'] = os.getenv('OCR_ENABLED', str(cls.OCR_ENABLED)).lower() == 'true'
+        config['ocr_dpi'] = int(os.getenv('OCR_DPI', cls.OCR_DPI))
+        config['ocr_processes'] = int(os.getenv('OCR_PROCESSES', cls.OCR_PROCESSES))
+        config['ocr_min_text_chars'] = int(os.getenv('OCR_MIN_TEXT_CHARS', cls.OCR_MIN_TEXT_CHARS))
+        config['ocr_cache_max_mb'] = int(os.getenv('OCR_CACHE_MAX_MB', cls.OCR_CACHE_MAX_MB))
         
         # Paths
         config['base_path'] = os.getenv('GMAIL_BASE_PATH', os.getcwd())
@@ -324,6 +348,8 @@ class AdvancedConfig:
         config['enable_parallel_processing'] = os.getenv('ENABLE_PARALLEL_PROCESSING', 'false').lower() == 'true'
         config['max_worker_threads'] = int(os.getenv('MAX_WORKER_THREADS', cls.MAX_WORKER_THREADS))
 
+        config['extraction_processes'] = int(os.getenv('EXTRACTION_PROCESSES', cls.PROCESS_POOL_SIZE if config['enable_parallel_processing'] else 0))
+
         # Memory management
         config['max_memory_usage_mb'] = int(os.getenv('MAX_MEMORY_USAGE_MB', cls.MAX_MEMORY_USAGE_MB))
 
@@ -11,7 +11,7 @@ import json
 import logging
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 import schedule
 
 # Add Functions directory to path
@@ -25,6 +25,11 @@ from text_extractor import TextExtractor
 from json_converter import JSONConverter
 from monitoring import PerformanceMonitor
 from data_validator import QualityAssurance
+from sync_checkpoint import SyncCheckpointStore
+from email_dedup_index import ProcessedEmailIndex
+from attachment_blob_store import AttachmentBlobStore
+from text_cache import ExtractedTextCache
+from ocr_engine import PageOCREngine
 import requests
 
 # Configure logging
@@ -60,11 +65,36 @@ class ContinuousGmailProcessor:
         self.gmail_connector = None
         self.medical_transformer = GmailToMedicalTransformer(self.base_path)
         self.metadata_extractor = MetadataExtractor()
-        self.attachment_processor = AttachmentProcessor(self.base_path)
-        self.text_extractor = TextExtractor(self.base_path)
+        self.attachment_processor = AttachmentProcessor(
+            self.base_path,
+            blob_store=AttachmentBlobStore(self.base_path) if self.config['attachment_dedup'] else None
+        )
+        self.text_extractor = TextExtractor(
+            self.base_path,
+            text_cache=ExtractedTextCache(
+                os.path.join(self.base_path, 'cache', 'extracted_text.db'),
+                max_size_mb=self.config['text_cache_max_mb']
+            ) if self.config['text_cache_enabled'] else None,
+            pdf_max_pages=self.config['pdf_max_pages'],
+            pdf_max_chars=self.config['pdf_max_chars'],
+            ocr_engine=PageOCREngine(
+                self.base_path,
+                language=self.config['ocr_language'],
+                dpi=self.config['ocr_dpi'],
+                max_workers=self.config['ocr_processes'],
+                min_text_chars=self.config['ocr_min_text_chars'],
+                max_cache_mb=self.config['ocr_cache_max_mb']
+            ) if self.config['ocr_enabled'] else None
+        )
         self.json_converter = JSONConverter(self.base_path)
         self.performance_monitor = PerformanceMonitor()
         self.qa_system = QualityAssurance()
+        self.checkpoint_store = SyncCheckpointStore(
+            self.config.get('sync_checkpoint_file') or os.path.join(self.base_path, 'sync_checkpoints.json')
+        )
+        self.dedup_index = ProcessedEmailIndex(
+            self.config.get('dedup_index_file') or os.path.join(self.base_path, 'processed_emails_index.db')
+        )
         
         # Processing statistics
         self.stats = {
@@ -72,8 +102,10 @@ class ContinuousGmailProcessor:
             'medical_emails_found': 0,
             'emails_processed': 0,
             'processing_errors': 0,
+            'duplicates_skipped': 0,
             'last_check_time': None,
-            'uptime_start': datetime.now()
+            'uptime_start': datetime.now(),
+            'mode': None
         }
         
         # Laravel API configuration
@@ -87,6 +119,28 @@ class ContinuousGmailProcessor:
             'gmail_password': os.getenv('GMAIL_APP_PASSWORD'),
             'check_interval_minutes': int(os.getenv('CHECK_INTERVAL_MINUTES', '5')),
             'max_emails_per_check': int(os.getenv('MAX_EMAILS_PER_CHECK', '50')),
+            'fetch_chunk_size': int(os.getenv('FETCH_CHUNK_SIZE', '200')),
+            'imap_server': os.getenv('GMAIL_IMAP_SERVER', 'imap.gmail.com'),
+            'imap_port': int(os.getenv('GMAIL_IMAP_PORT', '993')),
+            'imap_use_ssl': os.getenv('GMAIL_IMAP_USE_SSL', 'true').lower() == 'true',
+            'enable_idle': os.getenv('ENABLE_IMAP_IDLE', 'true').lower() == 'true',
+            'idle_refresh_seconds': int(os.getenv('IMAP_IDLE_REFRESH_SECONDS', '300')),
+            'max_idle_failures': int(os.getenv('MAX_IMAP_IDLE_FAILURES', '3')),
+            'gmail_folder': os.getenv('GMAIL_DEFAULT_FOLDER', 'INBOX'),
+            'quick_check_preview_bytes': int(os.getenv('QUICK_CHECK_PREVIEW_BYTES', '0')),
+            'sync_checkpoint_file': os.getenv('SYNC_CHECKPOINT_FILE', ''),
+            'dedup_index_file': os.getenv('DEDUP_INDEX_FILE', ''),
+            'attachment_dedup': os.getenv('ENABLE_ATTACHMENT_DEDUP', 'true').lower() == 'true',
+            'text_cache_enabled': os.getenv('TEXT_CACHE_ENABLED', 'true').lower() == 'true',
+            'text_cache_max_mb': int(os.getenv('TEXT_CACHE_MAX_MB', '512')),
+            'pdf_max_pages': int(os.getenv('PDF_MAX_PAGES', '100')),
+            'pdf_max_chars': int(os.getenv('PDF_MAX_CHARS', '500000')),
+            'ocr_enabled': os.getenv('OCR_ENABLED', 'true').lower() == 'true',
+            'ocr_language': os.getenv('OCR_LANGUAGE', 'eng'),
+            'ocr_dpi': int(os.getenv('OCR_DPI', '300')),
+            'ocr_processes': int(os.getenv('OCR_PROCESSES', '2')),
+            'ocr_min_text_chars': int(os.getenv('OCR_MIN_TEXT_CHARS', '50')),
+            'ocr_cache_max_mb': int(os.getenv('OCR_CACHE_MAX_MB', '1024')),
             'laravel_api_url': os.getenv('LARAVEL_API_URL', 'http://localhost:8000/api'),
             'laravel_api_token': os.getenv('LARAVEL_API_TOKEN', ''),
             'medical_keywords_threshold': int(os.getenv('MEDICAL_KEYWORDS_THRESHOLD', '2')),
@@ -112,19 +166,76 @@ class ContinuousGmailProcessor:
         try:
             self.gmail_connector = GmailConnector(
                 self.config['gmail_email'], 
-                self.config['gmail_password']
+                self.config['gmail_password'],
+                imap_server=self.config['imap_server'],
+                port=self.config['imap_port'],
+                use_ssl=self.config['imap_use_ssl']
             )
+            if not self.gmail_connector.connect():
+                raise ConnectionError("Failed to connect to Gmail")
             logger.info("Gmail connection established successfully")
         except Exception as e:
             logger.error(f"Failed to establish Gmail connection: {str(e)}")
             return False
         
-        # Schedule periodic checks
-        schedule.every(self.config['check_interval_minutes']).minutes.do(self._check_for_new_emails)
-        
         # Start performance monitoring
         self.performance_monitor.start_monitoring()
         
+        # Push mode: the server wakes us as soon as new mail lands
+        if self.config['enable_idle'] and self.gmail_connector.supports_idle():
+            try:
+                self._run_idle_loop()
+            except KeyboardInterrupt:
+                logger.info("Received interrupt signal, stopping monitoring...")
+                self.stop_monitoring()
+                return
+            
+            if not self.is_running:
+                return
+            logger.warning("IMAP IDLE unavailable, falling back to polling")
+        
+        self._run_polling_loop()
+    
+    def _run_idle_loop(self):
+        """
+        Process new mail whenever IDLE reports a mailbox change
+        
+        Each IDLE wait is capped at idle_refresh_seconds, after which a normal
+        check runs anyway, so a missed push costs at most one refresh period.
+        Returns when stopped or after max_idle_failures consecutive failures.
+        """
+        logger.info(f"Using IMAP IDLE push mode (refresh every {self.config['idle_refresh_seconds']}s)")
+        self.stats['mode'] = 'idle'
+        failures = 0
+        
+        while self.is_running:
+            self._check_for_new_emails()
+            
+            try:
+                if self.gmail_connector.selected_folder != self.config['gmail_folder']:
+                    self.gmail_connector.select_folder(self.config['gmail_folder'])
+                
+                updates = self.gmail_connector.idle(timeout=self.config['idle_refresh_seconds'])
+                failures = 0
+                if updates:
+                    logger.info(f"IDLE update received: {', '.join(updates)}")
+                    
+            except ConnectionError as e:
+                if not self.is_running:
+                    return
+                failures += 1
+                logger.warning(f"IDLE failed ({failures}/{self.config['max_idle_failures']}): {str(e)}")
+                
+                if failures >= self.config['max_idle_failures'] or not self.gmail_connector.reconnect():
+                    return
+    
+    def _run_polling_loop(self):
+        """Check for new mail every check_interval_minutes"""
+        self.stats['mode'] = 'polling'
+        
+        # Schedule periodic checks
+        schedule.every(self.config['check_interval_minutes']).minutes.do(self._check_for_new_emails)
+        
         # Main monitoring loop
         try:
             while self.is_running:
@@ -148,6 +259,9 @@ class ContinuousGmailProcessor:
         
         self.performance_monitor.stop_monitoring()
         
+        if self.text_extractor.ocr_engine is not None:
+            self.text_extractor.ocr_engine.close()
+        
         # Log final statistics
         uptime = datetime.now() - self.stats['uptime_start']
         logger.info(f"Final statistics:")
@@ -156,47 +270,86 @@ class ContinuousGmailProcessor:
         logger.info(f"  Medical emails found: {self.stats['medical_emails_found']}")
         logger.info(f"  Emails processed: {self.stats['emails_processed']}")
         logger.info(f"  Processing errors: {self.stats['processing_errors']}")
+        logger.info(f"  Duplicates skipped: {self.stats['duplicates_skipped']}")
     
     def _check_for_new_emails(self):
-        """Check for new emails since last check"""
+        """Check for emails newer than the persisted UID high-water mark"""
         try:
             logger.info("Checking for new medical emails...")
             
-            # Calculate time range for search
-            since_time = self.last_check
+            folder = self.config['gmail_folder']
             current_time = datetime.now()
             
-            # Search for emails received since last check
-            search_criteria = f'SINCE "{since_time.strftime("%d-%b-%Y")}"'
+            uid_validity = self.gmail_connector.get_uid_validity(folder)
+            if uid_validity is None:
+                logger.error(f"Could not read UIDVALIDITY for {folder}")
+                self.stats['processing_errors'] += 1
+                return
             
-            # Get email IDs
-            email_ids = self.gmail_connector.search_emails(
-                criteria=search_criteria,
-                folder_name="INBOX"
-            )
+            last_uid = self.checkpoint_store.get_last_uid(folder, uid_validity)
+            
+            if last_uid is not None:
+                # Incremental sync: only UIDs above the checkpoint
+                email_ids = self.gmail_connector.search_uids_after(last_uid, folder)
+            else:
+                # No usable checkpoint yet: bootstrap from the date window.
+                # UIDNEXT is read first so mail arriving during the search is not skipped.
+                baseline_uid = self.gmail_connector.get_folder_status(folder).get('uid_next', 0) - 1
+                search_criteria = f'SINCE "{self.last_check.strftime("%d-%b-%Y")}"'
+                email_ids = self.gmail_connector.search_uids(search_criteria, folder)
             
             if not email_ids:
                 logger.info("No new emails found")
+                if last_uid is None and baseline_uid > 0:
+                    self.checkpoint_store.update(folder, uid_validity, baseline_uid)
                 self.last_check = current_time
+                self.stats['last_check_time'] = current_time
                 return
             
-            # Limit emails to process
+            # Limit emails to process; the oldest go first so the rest are picked up next cycle
             email_ids = email_ids[:self.config['max_emails_per_check']]
             self.stats['total_emails_checked'] += len(email_ids)
             
             logger.info(f"Found {len(email_ids)} new emails to check")
             
-            # Process each email
+            # Phase 1: headers and MIME structure only, to run the quick medical check
+            candidate_ids, screened_ids = self._prefilter_medical_candidates(email_ids)
+            logger.info(f"{len(candidate_ids)} of {len(email_ids)} emails passed the header check")
+            
+            # Screened emails that are not candidates are fully handled; emails whose
+            # header fetch failed are not, so the checkpoint stops before them
+            done_ids = screened_ids - set(candidate_ids)
+            self._advance_checkpoint(folder, uid_validity, email_ids, done_ids)
+            
+            # Phase 2: full download only for candidates, with pipelined UID FETCH commands
             medical_emails_found = 0
-            for email_id in email_ids:
+            fetched = self.gmail_connector.fetch_emails_bulk(
+                candidate_ids, chunk=self.config['fetch_chunk_size'], by_uid=True
+            )
+            for email_id, email_message in fetched:
                 try:
-                    if self._process_single_email(email_id):
-                        medical_emails_found += 1
-                        self.stats['medical_emails_found'] += 1
-                        
+                    processed = self._process_single_email(email_id, email_message, prefiltered=True)
                 except Exception as e:
                     logger.error(f"Error processing email {email_id}: {str(e)}")
                     self.stats['processing_errors'] += 1
+                    processed = None
+                
+                if processed is None:
+                    # Failed: leave it out of done_ids so the checkpoint stays below it
+                    continue
+                
+                if processed:
+                    medical_emails_found += 1
+                    self.stats['medical_emails_found'] += 1
+                
+                # Persist progress per message so a restart resumes right after it;
+                # a candidate the server did not return keeps the checkpoint below it
+                done_ids.add(str(email_id))
+                self._advance_checkpoint(folder, uid_validity, email_ids, done_ids)
+            
+            not_done = len(candidate_ids) - len(done_ids & set(candidate_ids))
+            if not_done:
+                logger.warning(f"{not_done} candidate emails could not be fetched or processed, retrying next cycle")
             
             logger.info(f"Processed {medical_emails_found} medical emails out of {len(email_ids)} total emails")
             
@@ -207,21 +360,81 @@ class ContinuousGmailProcessor:
             logger.error(f"Error in email check cycle: {str(e)}")
             self.stats['processing_errors'] += 1
     
-    def _process_single_email(self, email_id: str) -> bool:
+    def _prefilter_medical_candidates(self, email_ids: List[str]) -> Tuple[List[str], Set[str]]:
+        """
+        Run the quick medical check on headers only
+        
+        Args:
+            email_ids: Email UIDs to screen
+            
+        Returns:
+            Tuple[List[str], Set[str]]: UIDs worth a full download (ascending), and
+            every UID whose headers were actually fetched and screened
+        """
+        candidate_ids = []
+        screened_ids = set()
+        headers = self.gmail_connector.fetch_headers_bulk(
+            email_ids,
+            chunk=self.config['fetch_chunk_size'],
+            by_uid=True,
+            preview_bytes=self.config['quick_check_preview_bytes']
+        )
+        
+        for email_id, header_message, info in headers:
+            screened_ids.add(str(email_id))
+            
+            # Already processed (e.g. the same message under another label)
+            if self.dedup_index.is_processed(header_message):
+                self.stats['duplicates_skipped'] += 1
+                continue
+            
+            metadata = {
+                'subject': MetadataExtractor.decode_mime_words(header_message.get('Subject', '')),
+                'from': MetadataExtractor.parse_email_addresses(
+                    MetadataExtractor.decode_mime_words(header_message.get('From', ''))
+                )
+            }
+            
+            if self._is_medical_email_quick_check(metadata, header_message, info.get('preview', '')):
+                candidate_ids.append(str(email_id))
+        
+        return sorted(candidate_ids, key=int), screened_ids
+    
+    def _advance_checkpoint(self, folder: str, uid_validity: int, email_ids: List[str], done_ids: Set[str]):
+        """
+        Move the high-water mark over the leading run of fully handled UIDs
+        
+        The mark stops right before the first UID that was not screened or
+        processed (e.g. its FETCH failed), so that UID is searched again next cycle.
+        """
+        last_done = None
+        for uid in sorted(email_ids, key=int):
+            if str(uid) not in done_ids:
+                break
+            last_done = int(uid)
+        
+        if last_done is not None:
+            self.checkpoint_store.update(folder, uid_validity, last_done)
+    
+    def _process_single_email(self, email_id: str, email_message=None, prefiltered: bool = False) -> Optional[bool]:
         """
         Process a single email and determine if it's medical
         
         Args:
             email_id: Email UID
+            email_message: Already fetched message (fetched here when omitted)
+            prefiltered: The header-only quick check already passed
             
         Returns:
-            bool: True if email was medical and processed
+            Optional[bool]: True if email was medical and processed, False if it
+            is not medical, None if it could not be fetched or processed
         """
         try:
             # Fetch email
-            email_message = self.gmail_connector.fetch_email(email_id)
+            if email_message is None:
+                email_message = self.gmail_connector.fetch_email(email_id)
             if not email_message:
-                return False
+                return None
             
             # Generate unique ID
             unique_id = self.gmail_connector.generate_unique_id(email_message)
@@ -230,23 +443,29 @@ class ContinuousGmailProcessor:
             metadata = self.metadata_extractor.extract_metadata(email_message, unique_id)
             
             # Quick check if email is medical-related
-            if not self._is_medical_email_quick_check(metadata, email_message):
+            if not prefiltered and not self._is_medical_email_quick_check(metadata, email_message):
                 return False
             
             logger.info(f"Medical email detected: {metadata.get('subject', 'No subject')}")
             
             # Full processing for medical emails
-            return self._process_medical_email(email_id, email_message, unique_id, metadata)
+            if not self._process_medical_email(email_id, email_message, unique_id, metadata):
+                return None
+            
+            self.dedup_index.add(email_message, unique_id)
+            return True
             
         except Exception as e:
             logger.error(f"Error processing email {email_id}: {str(e)}")
-            return False
+            return None
     
-    def _is_medical_email_quick_check(self, metadata: Dict[str, Any], email_message) -> bool:
+    def _is_medical_email_quick_check(self, metadata: Dict[str, Any], email_message, preview: str = '') -> bool:
         """Quick check to determine if email is medical-related"""
         try:
-            # Check subject line
+            # Check subject line (plus the body preview when one was prefetched)
             subject = metadata.get('subject', '').lower()
+            if preview:
+                subject = f"{subject} {preview.lower()}"
             
             # Check sender domain/email
             sender_email = ''
@@ -284,7 +503,10 @@ class ContinuousGmailProcessor:
             start_time = time.time()
             
             # Process attachments
-            attachments = self.attachment_processor.process_email_attachments(email_message, unique_id)
+            # Attachment text is extracted while each attachment is analyzed
+            attachments = self.attachment_processor.process_email_attachments(
+                email_message, unique_id, text_extractor=self.text_extractor
+            )
             
             # Extract text content
             body_content = self.text_extractor.extract_email_body(email_message)
@@ -297,13 +519,9 @@ class ContinuousGmailProcessor:
             
             for attachment in attachments:
                 if attachment.get('saved_successfully'):
-                    extracted_text = self.text_extractor.extract_text_from_file(
-                        attachment['file_path'], 
-                        attachment['original_filename']
-                    )
                     extracted_text_data['attachments'].append({
                         'filename': attachment['original_filename'],
-                        'text': extracted_text
+                        'text': attachment.get('extracted_text', '')
                     })
             
             # Create professional record
@@ -405,6 +623,8 @@ class ContinuousGmailProcessor:
             'uptime': str(datetime.now() - self.stats['uptime_start']),
             'last_check': self.stats['last_check_time'].isoformat() if self.stats['last_check_time'] else None,
             'statistics': self.stats,
+            'sync_checkpoint': self.checkpoint_store.get_checkpoint(self.config['gmail_folder']),
+            'text_cache': self.text_extractor.get_cache_statistics(),
             'configuration': {
                 'check_interval_minutes': self.config['check_interval_minutes'],
                 'max_emails_per_check': self.config['max_emails_per_check'],
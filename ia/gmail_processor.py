@@ -115,14 +115,10 @@ class GmailProcessor:
             # Extract email body content
             body_content = self.text_extractor.extract_email_body(email_message)
             
-            # Process attachments
-            attachments = self.attachment_processor.process_email_attachments(email_message, unique_id)
-            
-            # Extract text from attachments
-            for attachment in attachments:
-                if attachment.get('saved_successfully') and attachment.get('file_path'):
-                    extracted_text = self.text_extractor.extract_from_file(attachment['file_path'])
-                    attachment['extracted_text'] = extracted_text
+            # Process attachments, extracting their text in the same pass
+            attachments = self.attachment_processor.process_email_attachments(
+                email_message, unique_id, text_extractor=self.text_extractor
+            )
             
             # Prepare extracted text summary
             extracted_text = {
@@ -20,15 +20,20 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'Functions'))
 
 # Import all components
 from config import load_complete_config
-from gmail_connector import GmailConnector
+from gmail_connector import GmailConnector, GmailConnectionPool
 from metadata_extractor import MetadataExtractor
 from attachment_processor import AttachmentProcessor
+from attachment_blob_store import AttachmentBlobStore
 from text_extractor import TextExtractor
-from json_converter import JSONConverter
+from text_cache import ExtractedTextCache
+from ocr_engine import PageOCREngine
+from json_converter import JSONConverter, ProcessingSummaryAccumulator
 from monitoring import PerformanceMonitor, ProcessingLogger
 from backup_recovery import BackupManager
 from data_validator import QualityAssurance
 from batch_processor import BatchProcessor, ProgressTracker
+from processing_journal import ProcessingJournal
+from email_dedup_index import ProcessedEmailIndex
 from professional_json_schema import ProfessionalEmailSchema
 
 def setup_logging(config: Dict[str, Any]) -> logging.Logger:
@@ -56,23 +61,36 @@ def process_single_email(email_msg, unique_id: str, processors: Dict[str, Any],
         logger.info(f"Extracting metadata for email {unique_id}")
         metadata = processors['metadata_extractor'].extract_metadata(email_msg, unique_id)
         
-        # Step 2: Process attachments
+        # Step 2: Process attachments (text is extracted in the same pass unless a process pool does it)
         logger.info(f"Processing attachments for email {unique_id}")
-        attachments = processors['attachment_processor'].process_email_attachments(email_msg, unique_id)
+        extraction_pool = processors.get('extraction_pool')
+        attachments = processors['attachment_processor'].process_email_attachments(
+            email_msg,
+            unique_id,
+            text_extractor=None if extraction_pool else processors['text_extractor']
+        )
         
         # Step 3: Extract text content
         logger.info(f"Extracting text content for email {unique_id}")
         body_content = processors['text_extractor'].extract_email_body(email_msg)
         
-        # Extract text from attachments
-        for attachment in attachments:
-            if attachment['saved_successfully']:
-                try:
-                    extracted_text = processors['text_extractor'].extract_from_file(attachment['file_path'])
-                    attachment['extracted_text'] = extracted_text
-                except Exception as e:
-                    logger.warning(f"Failed to extract text from {attachment['original_filename']}: {e}")
-                    attachment['extracted_text'] = ""
+        # Extract text from attachments on the extraction process pool when one is configured
+        if extraction_pool:
+            saved_attachments = [att for att in attachments if att['saved_successfully']]
+            try:
+                extracted_texts = processors['text_extractor'].extract_from_files(
+                    [att['file_path'] for att in saved_attachments],
+                    executor=extraction_pool
+                )
+            except Exception as e:
+                logger.warning(f"Failed to extract text from attachments of {unique_id}: {e}")
+                extracted_texts = [""] * len(saved_attachments)
+            
+            for attachment, extracted_text in zip(saved_attachments, extracted_texts):
+                attachment['extracted_text'] = extracted_text
+        
+        if processors.get('progress_journal'):
+            processors['progress_journal'].mark_by_unique_id(unique_id, ProcessingJournal.STATE_EXTRACTED)
         
         # Step 4: Create extracted text summary
         extracted_text_data = {
@@ -168,10 +186,33 @@ def main():
         
         # Initialize all processors
         print("🔧 Initializing processors...")
+        blob_store = AttachmentBlobStore(config['base_path']) if config.get('attachment_dedup', True) else None
+        text_cache = None
+        if config.get('text_cache_enabled', True):
+            text_cache = ExtractedTextCache(
+                os.path.join(config['base_path'], 'cache', 'extracted_text.db'),
+                max_size_mb=config.get('text_cache_max_mb', 512)
+            )
+        ocr_engine = None
+        if config.get('ocr_enabled', True):
+            ocr_engine = PageOCREngine(
+                config['base_path'],
+                language=config.get('ocr_language', 'eng'),
+                dpi=config.get('ocr_dpi', 300),
+                max_workers=config.get('ocr_processes', 0),
+                min_text_chars=config.get('ocr_min_text_chars', 50),
+                max_cache_mb=config.get('ocr_cache_max_mb', 1024)
+            )
         processors = {
             'metadata_extractor': MetadataExtractor,
-            'attachment_processor': AttachmentProcessor(config['base_path']),
-            'text_extractor': TextExtractor(config['base_path']),
+            'attachment_processor': AttachmentProcessor(config['base_path'], blob_store=blob_store),
+            'text_extractor': TextExtractor(
+                config['base_path'],
+                text_cache=text_cache,
+                pdf_max_pages=config.get('pdf_max_pages', 0),
+                pdf_max_chars=config.get('pdf_max_chars', 0),
+                ocr_engine=ocr_engine
+            ),
             'json_converter': JSONConverter(config['base_path']),
             'qa_system': QualityAssurance()
         }
@@ -192,14 +233,33 @@ def main():
         
         print(f"✅ Connected to Gmail: {config['email_address']}")
         
-        # Search for emails
+        # Search for emails by UID, which stays stable across runs
         print("🔍 Searching for emails...")
-        email_ids = gmail_connector.search_emails()
+        folder = config.get('default_folder', 'INBOX')
+        email_ids = gmail_connector.search_uids(folder=folder)
         
         if not email_ids:
             print("📭 No emails found to process")
             return
         
+        # Resume: skip emails a previous run already saved
+        journal = ProcessingJournal(
+            os.path.join(config['base_path'], 'processing_journal.db'),
+            folder=folder,
+            uid_validity=gmail_connector.get_uid_validity(folder)
+        )
+        pending_ids = journal.filter_pending(email_ids)
+        if len(pending_ids) < len(email_ids):
+            print(f"⏩ Resuming: {len(email_ids) - len(pending_ids)} emails already processed in earlier runs")
+        email_ids = pending_ids
+        
+        if not email_ids:
+            print("✅ All emails already processed")
+            return
+        
+        # Messages already processed under any folder or UIDVALIDITY are skipped by Message-ID
+        dedup_index = ProcessedEmailIndex(os.path.join(config['base_path'], 'processed_emails_index.db'))
+        
         total_emails = len(email_ids)
         max_emails = config.get('max_emails', 0)
         
@@ -223,22 +283,41 @@ def main():
             batch_size=min(50, max(10, total_emails // 10)),  # Dynamic batch size
             max_workers=min(4, max(1, total_emails // 100)),   # Dynamic worker count
             memory_limit_mb=config.get('memory_limit_mb', 2048),
-            progress_callback=progress_callback
+            progress_callback=progress_callback,
+            fetch_chunk_size=config.get('fetch_chunk_size', 200),
+            extraction_processes=config.get('extraction_processes', 0),
+            use_uids=True,
+            journal=journal,
+            dedup_index=dedup_index
+        )
+
+        # One IMAP session per worker so fetches run in parallel
+        connection_pool = GmailConnectionPool.from_connector(
+            gmail_connector,
+            size=batch_processor.max_workers,
+            idle_timeout=config.get('imap_idle_timeout', 300)
         )
 
         # Process emails using batch processor
         print(f"🚀 Starting high-performance batch processing...")
         print(f"   Batch size: {batch_processor.batch_size}")
         print(f"   Workers: {batch_processor.max_workers}")
+        print(f"   IMAP connections: {connection_pool.size}")
+        print(f"   Extraction processes: {batch_processor.extraction_processes or 'disabled'}")
         print(f"   Memory limit: {batch_processor.memory_limit_mb}MB")
         print()
 
-        processed_emails = batch_processor.process_email_batch(
+        # Stream results into running aggregates instead of keeping them all in memory
+        summary_accumulator = ProcessingSummaryAccumulator()
+        batch_processor.process_email_batch(
             email_ids,
-            gmail_connector,
+            connection_pool,
             processors,
-            process_single_email
+            process_single_email,
+            result_callback=summary_accumulator.add,
+            collect_results=False
         )
+        connection_pool.close_all()
 
         # Get final statistics
         batch_stats = batch_processor.get_statistics()
@@ -255,14 +334,23 @@ def main():
         print(f"Total emails processed: {batch_stats['processed_emails']}")
         print(f"Successful: {successful_count}")
         print(f"Failed: {failed_count}")
+        print(f"Duplicates skipped: {batch_stats['duplicates_skipped']}")
         print(f"Success rate: {(successful_count/max(1,batch_stats['processed_emails'])*100):.1f}%")
         print(f"Processing efficiency: {(batch_stats['processed_emails']/total_emails*100):.1f}%")
 
         # Calculate totals
-        total_attachments = sum(r.get('attachment_count', 0) for r in processed_emails if r.get('success'))
+        total_attachments = batch_stats['total_attachments']
         total_processing_time = batch_stats['processing_time']
 
         print(f"Total attachments processed: {total_attachments}")
+        if blob_store is not None:
+            blob_stats = blob_store.get_statistics()
+            print(f"Attachment store: {blob_stats['blob_count']} unique files, "
+                  f"{blob_stats['saved_bytes'] / 1024 / 1024:.1f}MB saved by deduplication")
+        if text_cache is not None:
+            cache_stats = text_cache.get_statistics()
+            print(f"Text cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                  f"({cache_stats['hit_rate'] * 100:.1f}% hit rate)")
         print(f"Total processing time: {total_processing_time:.2f}s ({total_processing_time/60:.1f} minutes)")
         print(f"Average time per email: {batch_stats['average_time_per_email']:.2f}s")
         print(f"Peak memory usage: {batch_stats['peak_memory_mb']:.1f}MB")
@@ -307,7 +395,8 @@ def main():
         
         # Summary JSON
         summary_path = os.path.join(config['base_path'], "Json", "processing_summary.json")
-        processors['json_converter'].create_summary_json(processed_emails, summary_path)
+        processors['json_converter'].write_summary_json(summary_accumulator, summary_path)
+        summary_accumulator.close()
         print(f"✅ Summary saved: {summary_path}")
         
         print("\n🎉 Gmail processing completed successfully!")
@@ -321,6 +410,18 @@ def main():
     finally:
         # Cleanup
         try:
+            if 'connection_pool' in locals():
+                connection_pool.close_all()
+            if 'journal' in locals():
+                journal.close()
+            if 'dedup_index' in locals():
+                dedup_index.close()
+            if locals().get('blob_store') is not None:
+                blob_store.close()
+            if locals().get('text_cache') is not None:
+                text_cache.close()
+            if locals().get('ocr_engine') is not None:
+                ocr_engine.close()
             if 'gmail_connector' in locals():
                 gmail_connector.disconnect()
             if 'processing_logger' in locals():
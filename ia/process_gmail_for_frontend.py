@@ -49,7 +49,9 @@ def process_single_email(email_msg, unique_id, processors, logger):
         metadata = processors['metadata_extractor'].extract_metadata(email_msg, unique_id)
         
         # Procesar attachments
-        attachments = processors['attachment_processor'].process_email_attachments(email_msg, unique_id)
+        attachments = processors['attachment_processor'].process_email_attachments(
+            email_msg, unique_id, text_extractor=processors['text_extractor']
+        )
         
         # Extraer texto del cuerpo
         body_content = processors['text_extractor'].extract_email_body(email_msg)
@@ -62,13 +64,9 @@ def process_single_email(email_msg, unique_id, processors, logger):
         
         for attachment in attachments:
             if attachment.get('saved_successfully'):
-                extracted_text = processors['text_extractor'].extract_text_from_file(
-                    attachment['file_path'], 
-                    attachment['original_filename']
-                )
                 extracted_text_data['attachments'].append({
                     'filename': attachment['original_filename'],
-                    'text': extracted_text
+                    'text': attachment.get('extracted_text', '')
                 })
         
         # Guardar texto extraído
@@ -226,7 +224,7 @@ def main():
         print("🏥 Transformando emails en casos médicos...")
         
         transformer = GmailToMedicalTransformer(base_path)
-        medical_cases = transformer.transform_all_medical_emails()
+        medical_cases = transformer.transform_all_medical_emails(incremental=True)
         
         print(f"✅ Se identificaron {len(medical_cases)} casos médicos")
         
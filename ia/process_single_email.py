@@ -24,6 +24,7 @@ from json_converter import JSONConverter
 from medical_email_filter import MedicalEmailFilter
 from enhanced_medical_analyzer import EnhancedMedicalAnalyzer
 from medical_priority_classifier import MedicalPriorityClassifier
+from analysis_context import AnalysisContext
 import requests
 
 # Configure logging
@@ -171,7 +172,10 @@ class SingleEmailProcessor:
             metadata = self.metadata_extractor.extract_metadata(email_message, unique_id)
             
             # Process attachments
-            attachments = self.attachment_processor.process_email_attachments(email_message, unique_id)
+            # Attachment text is extracted while each attachment is analyzed
+            attachments = self.attachment_processor.process_email_attachments(
+                email_message, unique_id, text_extractor=self.text_extractor
+            )
             
             # Extract text content
             body_content = self.text_extractor.extract_email_body(email_message)
@@ -184,13 +188,9 @@ class SingleEmailProcessor:
             
             for attachment in attachments:
                 if attachment.get('saved_successfully'):
-                    extracted_text = self.text_extractor.extract_text_from_file(
-                        attachment['file_path'], 
-                        attachment['original_filename']
-                    )
                     extracted_text_data['attachments'].append({
                         'filename': attachment['original_filename'],
-                        'text': extracted_text
+                        'text': attachment.get('extracted_text', '')
                     })
             
             # Create professional record
@@ -253,15 +253,18 @@ class SingleEmailProcessor:
         try:
             logger.info("Performing comprehensive medical analysis")
             
+            # Text, lowercase form, regex hits and the enhanced analysis are
+            # computed once and shared by every analyzer below
+            context = AnalysisContext.from_record(professional_record)
+            
             # Enhanced medical text analysis
-            text_content = self._extract_all_text(professional_record)
-            enhanced_analysis = self.medical_analyzer.analyze_medical_text(text_content)
+            enhanced_analysis = self.medical_analyzer.analyze_medical_text(context.text, context)
             
             # Priority classification
-            priority_classification = self.priority_classifier.classify_priority(professional_record)
+            priority_classification = self.priority_classifier.classify_priority(professional_record, context)
             
             # Transform to medical case
-            medical_case = self.medical_transformer.transform_email_to_medical_case(professional_record)
+            medical_case = self.medical_transformer.transform_email_to_medical_case(professional_record, context)
             
             # Enhance medical case with analysis results
             if enhanced_analysis and not enhanced_analysis.get('error'):
@@ -301,38 +304,6 @@ class SingleEmailProcessor:
                 'medical_case': None
             }
     
-    def _extract_all_text(self, professional_record: Dict[str, Any]) -> str:
-        """Extract all text content from professional record"""
-        try:
-            text_parts = []
-            
-            # Subject
-            content_analysis = professional_record.get('content_analysis', {})
-            subject_info = content_analysis.get('subject_information', {})
-            if subject_info.get('subject_line'):
-                text_parts.append(subject_info['subject_line'])
-            
-            # Body content
-            body_content = content_analysis.get('body_content', {})
-            if body_content.get('plain_text_content'):
-                text_parts.append(body_content['plain_text_content'])
-            
-            # Attachment text
-            extracted_text = professional_record.get('extracted_text_data', {})
-            if extracted_text.get('email_body'):
-                text_parts.append(extracted_text['email_body'])
-            
-            if extracted_text.get('attachments'):
-                for att in extracted_text['attachments']:
-                    if att.get('text'):
-                        text_parts.append(att['text'])
-            
-            return ' '.join(filter(None, text_parts))
-            
-        except Exception as e:
-            logger.warning(f"Error extracting text: {str(e)}")
-            return ""
-    
     def _save_results(self, result: Dict[str, Any], unique_id: str) -> None:
         """Save processing results to file"""
         try:
@@ -0,0 +1,65 @@
+"""
+AttachmentBlobStore reference bookkeeping
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Functions'))
+
+from attachment_blob_store import AttachmentBlobStore
+from attachment_document import AttachmentDocument
+
+
+def _refcounts(blob_store):
+    return dict(blob_store._connection.execute('SELECT blob_hash, refcount FROM blobs').fetchall())
+
+
+def test_storing_same_bytes_at_same_path_keeps_one_reference(tmp_path):
+    blob_store = AttachmentBlobStore(str(tmp_path))
+    dest_path = str(tmp_path / 'informe.pdf')
+    document = AttachmentDocument(b'%PDF-1.4 informe', 'informe.pdf')
+
+    try:
+        blob_store.store(document, dest_path)
+        info = blob_store.store(document, dest_path)
+
+        assert not info['new_blob']
+        assert _refcounts(blob_store) == {document.sha256: 1}
+    finally:
+        blob_store.close()
+
+
+def test_repointing_a_path_releases_its_old_blob(tmp_path):
+    blob_store = AttachmentBlobStore(str(tmp_path))
+    dest_path = str(tmp_path / 'informe.pdf')
+    old_document = AttachmentDocument(b'%PDF-1.4 v1', 'informe.pdf')
+    new_document = AttachmentDocument(b'%PDF-1.4 v2', 'informe.pdf')
+
+    try:
+        blob_store.store(old_document, dest_path)
+        blob_store.store(new_document, dest_path)
+
+        assert _refcounts(blob_store) == {new_document.sha256: 1}
+        assert not os.path.exists(blob_store.get_blob_path(old_document.sha256))
+        with open(dest_path, 'rb') as f:
+            assert f.read() == b'%PDF-1.4 v2'
+    finally:
+        blob_store.close()
+
+
+def test_stale_file_at_path_is_replaced_by_a_link(tmp_path):
+    blob_store = AttachmentBlobStore(str(tmp_path))
+    dest_path = str(tmp_path / 'informe.pdf')
+    document = AttachmentDocument(b'%PDF-1.4 informe', 'informe.pdf')
+
+    with open(dest_path, 'wb') as f:
+        f.write(b'left over')
+
+    try:
+        info = blob_store.store(document, dest_path)
+
+        assert info['linked']
+        assert os.path.samefile(dest_path, blob_store.get_blob_path(document.sha256))
+    finally:
+        blob_store.close()
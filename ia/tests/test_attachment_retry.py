@@ -0,0 +1,62 @@
+"""
+Retrying a journaled email does not duplicate its attachments
+"""
+
+import os
+import sys
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Functions'))
+
+from attachment_blob_store import AttachmentBlobStore
+from attachment_processor import AttachmentProcessor
+from batch_processor import BatchProcessor
+from processing_journal import ProcessingJournal
+
+
+def _build_email():
+    message = MIMEMultipart()
+    message['Subject'] = 'Resultados de laboratorio'
+    message.attach(MIMEText('Adjunto informe', 'plain'))
+
+    for filename, payload in (('informe.pdf', b'%PDF-1.4 informe'), ('analitica.pdf', b'%PDF-1.4 analitica')):
+        part = MIMEApplication(payload, _subtype='pdf')
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        message.attach(part)
+
+    return message
+
+
+def test_retry_after_failure_keeps_one_file_per_attachment(tmp_path):
+    blob_store = AttachmentBlobStore(str(tmp_path))
+    journal = ProcessingJournal(str(tmp_path / 'journal.db'))
+    processors = {'attachment_processor': AttachmentProcessor(str(tmp_path), blob_store=blob_store)}
+    processor = BatchProcessor(str(tmp_path), journal=journal)
+    attempts = []
+
+    def process(email_msg, unique_id, processors, logger):
+        processors['attachment_processor'].process_email_attachments(email_msg, unique_id)
+        attempts.append(unique_id)
+        if len(attempts) == 1:
+            raise RuntimeError('text extraction failed')
+        return {'unique_id': unique_id, 'success': True}
+
+    try:
+        for _ in range(2):
+            result = processor._process_fetched_email_safe('42', _build_email(), processors, process)
+            processor._update_result_stats(result)
+
+        assert result['success']
+        assert attempts[0] == attempts[1]
+
+        email_folder = tmp_path / 'Archivos' / attempts[0]
+        assert sorted(os.listdir(email_folder)) == ['analitica.pdf', 'informe.pdf']
+
+        statistics = blob_store.get_statistics()
+        assert statistics['blob_count'] == 2
+        assert statistics['reference_count'] == 2
+    finally:
+        journal.close()
+        blob_store.close()
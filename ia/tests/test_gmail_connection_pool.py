@@ -0,0 +1,61 @@
+"""
+GmailConnectionPool.fetch_email retry behaviour
+"""
+
+import os
+import sys
+import time
+import imaplib
+from email.message import Message
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Functions'))
+
+from gmail_connector import GmailConnectionPool
+
+
+class FakeConnector:
+    """Pooled session stand-in returning scripted fetch outcomes"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.connection = object()
+        self.last_used = time.time()
+        self.fetch_calls = 0
+        self.reconnects = 0
+
+    def fetch_email(self, email_id, by_uid=False, raise_connection_errors=False):
+        self.fetch_calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def reconnect(self):
+        self.reconnects += 1
+        return True
+
+
+def _pool_with(connector):
+    pool = GmailConnectionPool('test@example.com', 'secret', size=1, max_retries=2)
+    pool._connectors.append(connector)
+    pool._available.put(connector)
+    return pool
+
+
+def test_connection_error_reconnects_and_retries():
+    message = Message()
+    connector = FakeConnector([imaplib.IMAP4.abort('socket error: EOF'), message])
+
+    assert _pool_with(connector).fetch_email('42', by_uid=True) is message
+    assert connector.fetch_calls == 2
+    assert connector.reconnects == 1
+
+
+def test_missing_message_is_not_retried():
+    connector = FakeConnector([None])
+    pool = _pool_with(connector)
+
+    assert pool.fetch_email('42', by_uid=True) is None
+    assert connector.fetch_calls == 1
+    assert connector.reconnects == 0
+    assert pool.stats['fetch_errors'] == 1
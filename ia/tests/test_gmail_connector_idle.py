@@ -0,0 +1,101 @@
+"""
+GmailConnector.idle against a local IMAP stand-in
+"""
+
+import os
+import sys
+import time
+import socket
+import imaplib
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Functions'))
+
+from gmail_connector import GmailConnector
+
+
+class FakeIdleServer:
+    """
+    Minimal IMAP server: greeting, CAPABILITY and one IDLE exchange
+
+    Args:
+        push_with_continuation: Send "* 3 EXISTS" in the same packet as "+ idling"
+        push_delay: Seconds to wait before pushing "* 3 EXISTS" (None never pushes)
+    """
+
+    def __init__(self, push_with_continuation: bool = False, push_delay: float = None):
+        self.push_with_continuation = push_with_continuation
+        self.push_delay = push_delay
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        client, _ = self.listener.accept()
+        reader = client.makefile('rb')
+        client.sendall(b'* OK IMAP4rev1 test server ready\r\n')
+
+        for line in reader:
+            tag, command = line.split(b' ', 1)
+            command = command.strip().upper()
+
+            if command == b'CAPABILITY':
+                client.sendall(b'* CAPABILITY IMAP4rev1 IDLE\r\n' + tag + b' OK CAPABILITY completed\r\n')
+            elif command == b'IDLE':
+                if self.push_with_continuation:
+                    client.sendall(b'+ idling\r\n* 3 EXISTS\r\n')
+                else:
+                    client.sendall(b'+ idling\r\n')
+                    if self.push_delay is not None:
+                        time.sleep(self.push_delay)
+                        client.sendall(b'* 3 EXISTS\r\n')
+
+                reader.readline()  # DONE
+                client.sendall(tag + b' OK IDLE terminated\r\n')
+            elif command == b'LOGOUT':
+                client.sendall(b'* BYE\r\n' + tag + b' OK LOGOUT completed\r\n')
+                break
+
+        client.close()
+        self.listener.close()
+
+
+def _idle_against(server: FakeIdleServer, timeout: float):
+    connector = GmailConnector('test@example.com', 'secret', imap_server='127.0.0.1', port=server.port, use_ssl=False)
+    connector.connection = imaplib.IMAP4('127.0.0.1', server.port)
+
+    try:
+        start = time.time()
+        updates = connector.idle(timeout=timeout)
+        elapsed = time.time() - start
+
+        # The IDLE tag must not linger among imaplib's pending commands
+        assert connector.connection.tagged_commands == {}
+        return updates, elapsed
+    finally:
+        connector.connection.logout()
+
+
+def test_idle_returns_push_buffered_with_continuation():
+    # "* 3 EXISTS" is read into imaplib's buffer together with "+ idling"
+    updates, elapsed = _idle_against(FakeIdleServer(push_with_continuation=True), timeout=5)
+
+    assert updates == ['3 EXISTS']
+    assert elapsed < 1
+
+
+def test_idle_returns_push_arriving_later():
+    updates, elapsed = _idle_against(FakeIdleServer(push_delay=0.2), timeout=5)
+
+    assert updates == ['3 EXISTS']
+    assert elapsed < 1
+
+
+def test_idle_times_out_without_push():
+    updates, elapsed = _idle_against(FakeIdleServer(), timeout=0.5)
+
+    assert updates == []
+    assert 0.4 < elapsed < 2
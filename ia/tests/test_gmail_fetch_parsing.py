@@ -0,0 +1,45 @@
+"""
+Parsing of imaplib FETCH responses
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Functions'))
+
+from gmail_connector import parse_fetch_response, parse_fetch_sections
+
+
+def test_uid_in_header_is_used():
+    msg_data = [(b'1 (UID 101 RFC822 {5}', b'first'), b')', (b'2 (UID 102 RFC822 {6}', b'second'), b')']
+
+    assert [(fetched_id, payload) for fetched_id, _, payload in parse_fetch_response(msg_data, by_uid=True)] == [
+        ('101', b'first'), ('102', b'second')
+    ]
+
+
+def test_uid_after_literal_is_used():
+    msg_data = [(b'1 (RFC822 {5}', b'first'), b' UID 101)', (b'2 (RFC822 {6}', b'second'), b' UID 102)']
+
+    assert [fetched_id for fetched_id, _, _ in parse_fetch_response(msg_data, by_uid=True)] == ['101', '102']
+
+
+def test_message_without_uid_is_skipped_when_uids_are_required():
+    msg_data = [(b'1 (RFC822 {5}', b'first'), b')', (b'2 (RFC822 {6}', b'second'), b' UID 102)']
+
+    assert [fetched_id for fetched_id, _, _ in parse_fetch_response(msg_data, by_uid=True)] == ['102']
+    assert [fetched_id for fetched_id, _, _ in parse_fetch_response(msg_data)] == ['1', '102']
+
+
+def test_sections_keep_every_literal():
+    msg_data = [
+        (b'7 (UID 42 BODY[HEADER] {9}', b'Subject: '),
+        (b' BODY[TEXT]<0> {4}', b'body'),
+        b' RFC822.SIZE 13)'
+    ]
+
+    message, = parse_fetch_sections(msg_data, by_uid=True)
+
+    assert message['id'] == '42'
+    assert message['sections'] == {'HEADER': b'Subject: ', 'TEXT': b'body'}
+    assert message['literals'] == [b'Subject: ', b'body']
@@ -0,0 +1,37 @@
+"""
+Size bound of the preprocessed OCR page cache
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Functions'))
+
+from ocr_engine import PageOCREngine
+
+PAGE_BYTES = 400 * 1024
+
+
+class FakePage:
+    """Preprocessed page stand-in writing a fixed number of bytes"""
+
+    def save(self, path, format=None):
+        with open(path, 'wb') as f:
+            f.write(b'\0' * PAGE_BYTES)
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    engine = PageOCREngine(str(tmp_path), max_cache_mb=1)
+    older, newer, latest = (engine._get_cache_path(f"{index:064x}", 1) for index in range(3))
+
+    engine._store_cached_page(FakePage(), newer)
+    engine._store_cached_page(FakePage(), older)
+    os.utime(older, (100, 100))
+    os.utime(newer, (200, 200))
+
+    # The third page pushes the cache past 1 MB; the least recently used one goes
+    engine._store_cached_page(FakePage(), latest)
+
+    assert not os.path.exists(older)
+    assert os.path.exists(newer) and os.path.exists(latest)
+    assert engine.get_statistics()['preprocess_cache_evictions'] == 1